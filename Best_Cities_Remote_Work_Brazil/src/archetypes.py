@@ -0,0 +1,148 @@
+"""
+Cluster municipalities into remote work archetypes.
+
+The IPS table is read in chunks: a first pass collects the Min-Max statistics,
+a second pass feeds the scaled chunks to MiniBatchKMeans.partial_fit, so memory
+is bounded by the chunk size. k is picked by silhouette score on a bounded
+random sample, and the labels and centroid profiles (thematic scores per
+archetype) are written next to the ranked outputs.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+from utils import DATA_DIR, NOTEBOOK_DIR, capitals_uf, themes, invert_cols, theme_columns, default_ips_path
+
+
+def column_stats(file_path, cols, chunksize=1000):
+    """First pass: min, max and mean of each column without loading the whole file."""
+    col_min = col_max = None
+    total = np.zeros(len(cols))
+    count = np.zeros(len(cols))
+
+    for chunk in pd.read_csv(file_path, usecols=cols, chunksize=chunksize, encoding="utf-8"):
+        values = chunk[cols].astype(float)
+        col_min = values.min() if col_min is None else np.fmin(col_min, values.min())
+        col_max = values.max() if col_max is None else np.fmax(col_max, values.max())
+        total += values.sum().to_numpy()
+        count += values.count().to_numpy()
+
+    mean = pd.Series(total / np.maximum(count, 1), index=cols)
+    return col_min, col_max, mean
+
+
+def iter_scaled_chunks(file_path, cols, stats, chunksize=1000, id_cols=('Município', 'UF')):
+    """Second pass: yield (ids, scaled matrix) per chunk with the global Min-Max scaling."""
+    col_min, col_max, mean = stats
+    col_range = (col_max - col_min).replace(0, 1)
+    inverted = [col for col in cols if col in invert_cols]
+
+    for chunk in pd.read_csv(file_path, usecols=list(id_cols) + cols, chunksize=chunksize, encoding="utf-8"):
+        values = chunk[cols].astype(float).fillna(mean)
+        scaled = (values - col_min) / col_range
+        scaled[inverted] = 1 - scaled[inverted]
+        yield chunk[list(id_cols)], scaled
+
+
+class ArchetypeClusterer:
+    def __init__(self, file_path, chunksize=1000, k_range=range(2, 9), sample_size=5000, random_state=42):
+        self.file_path = file_path
+        self.chunksize = chunksize
+        self.k_range = k_range
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self.cols = theme_columns()
+        self.stats = column_stats(file_path, self.cols, chunksize)
+        self.model = None
+        self.k = None
+
+    def _chunks(self):
+        return iter_scaled_chunks(self.file_path, self.cols, self.stats, self.chunksize)
+
+    def _sample(self):
+        """Uniform random sample of scaled rows (smallest random keys), used to score each candidate k."""
+        rng = np.random.default_rng(self.random_state)
+        sample = np.empty((0, len(self.cols)))
+        keys = np.empty(0)
+        for _, scaled in self._chunks():
+            sample = np.vstack([sample, scaled.to_numpy()])
+            keys = np.concatenate([keys, rng.random(len(scaled))])
+            if len(keys) > self.sample_size:
+                keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+                sample, keys = sample[keep], keys[keep]
+        return sample
+
+    def _fit_k(self, k, n_epochs=3):
+        model = MiniBatchKMeans(n_clusters=k, random_state=self.random_state, n_init=3)
+        for _ in range(n_epochs):
+            for _, scaled in self._chunks():
+                # partial_fit needs at least k rows in the first batch
+                if not hasattr(model, 'cluster_centers_') and len(scaled) < k:
+                    continue
+                model.partial_fit(scaled.to_numpy())
+        return model
+
+    def fit(self):
+        """Fit one model per candidate k and keep the one with the best silhouette score."""
+        sample = self._sample()
+        best_score = -1
+        for k in self.k_range:
+            if k >= len(sample):
+                break
+            model = self._fit_k(k)
+            labels = model.predict(sample)
+            if len(set(labels)) < 2:
+                continue
+            score = silhouette_score(sample, labels)
+            print(f"k={k}: silhouette={score:.4f}")
+            if score > best_score:
+                best_score, self.k, self.model = score, k, model
+        if self.model is None:
+            raise ValueError(f"No k in {list(self.k_range)} gave at least two clusters on {len(sample)} rows "
+                             f"(k must be below the number of rows)")
+        return self
+
+    def predict(self):
+        """Label every municipality chunk by chunk and build the centroid profiles."""
+        labelled = []
+        profile_sums = np.zeros((self.k, len(themes)))
+        counts = np.zeros(self.k)
+
+        for ids, scaled in self._chunks():
+            labels = self.model.predict(scaled.to_numpy())
+            scores = pd.DataFrame({score: scaled[cols].mean(axis=1) for score, cols in themes.items()})
+            np.add.at(profile_sums, labels, scores.to_numpy())
+            counts += np.bincount(labels, minlength=self.k)
+
+            out = ids.copy()
+            out['Archetype'] = labels
+            labelled.append(pd.concat([out.reset_index(drop=True), scores.reset_index(drop=True)], axis=1))
+
+        profiles = pd.DataFrame(profile_sums / np.maximum(counts, 1)[:, None], columns=list(themes))
+        profiles.insert(0, 'Archetype', np.arange(self.k))
+        profiles.insert(1, 'Municipalities', counts.astype(int))
+        return pd.concat(labelled, ignore_index=True), profiles
+
+
+if __name__ == "__main__":
+    clusterer = ArchetypeClusterer(default_ips_path()).fit()
+    print(f"Selected k = {clusterer.k}")
+
+    df_labels, df_profiles = clusterer.predict()
+    print(df_profiles.to_string(index=False))
+
+    df_labels.to_csv(os.path.join(DATA_DIR, "ips_archetypes.csv"), index=False, encoding="utf-8")
+    df_profiles.to_csv(os.path.join(DATA_DIR, "archetype_profiles.csv"), index=False, encoding="utf-8")
+
+    # Add the archetype of each capital to the ranked table
+    ranked_path = os.path.join(NOTEBOOK_DIR, "ranked_analysis.csv")
+    df_ranked = pd.read_csv(ranked_path, encoding="utf-8").drop(columns=['Archetype'], errors='ignore')
+    df_labels['City'] = df_labels['Município'].str.replace(r'\s*\([A-Z]{2}\)$', '', regex=True)
+    df_capitals = df_labels[df_labels['City'].map(capitals_uf) == df_labels['UF']]
+    df_ranked = df_ranked.merge(df_capitals[['City', 'Archetype']], on='City', how='left')
+    df_ranked.to_csv(ranked_path, index=False, encoding="utf-8")
+    print("Archetypes saved to data/ips_archetypes.csv, data/archetype_profiles.csv and notebook/ranked_analysis.csv")
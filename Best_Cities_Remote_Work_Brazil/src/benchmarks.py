@@ -0,0 +1,160 @@
+"""
+Scale benchmarks for the scoring and climate pipelines on synthetic data.
+
+Each scale generates (once, cached under data/synthetic) an IPS table and a set
+of hourly INMET station files with synthetic_data.py, then times:
+
+- scoring: load the IPS table, compute the thematic scores and the UF and
+  region rollups;
+- climate: summarize every station file with climate_analysis.py.
+
+Cases are measured as stages of a private profiling.Profiler. Time is the best
+of --repeat runs. Peak memory comes from a separate run under tracemalloc, so
+tracing does not inflate the timings; it covers Python and
+NumPy allocations, not Arrow buffers (pyarrow-backed string columns). Results
+are compared with the saved baseline, and a case is flagged when its time or
+peak memory grows by more than --tolerance. The exit status is 1 when any case
+regressed.
+
+Usage:
+    python benchmarks.py small medium --save-baseline
+    python benchmarks.py small medium
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from climate_analysis import cities, summarize_stations
+from profiling import Profiler
+from rollups import RollupEngine
+from synthetic_data import SYNTHETIC_DIR, write_inmet, write_ips
+from utils import DATA_DIR, add_theme_scores, load_ips, themes
+
+SCALES = {
+    "small": {"municipalities": 5_570, "years": 1},
+    "medium": {"municipalities": 55_700, "years": 5},
+    "large": {"municipalities": 557_000, "years": 20},
+}
+
+BENCHMARK_DIR = os.path.join(DATA_DIR, "benchmarks")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Differences below these are noise, whatever the relative change
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 1.0
+
+
+def prepare(scale):
+    """Generate the synthetic inputs of a scale if they are not cached yet."""
+    params = SCALES[scale]
+    ips_dir = os.path.join(SYNTHETIC_DIR, f"ips_{params['municipalities']}")
+    ips_path = os.path.join(ips_dir, "ips_brasil_municipios.csv")
+    if not os.path.exists(ips_path):
+        print(f"Generating IPS table with {params['municipalities']:,} municipalities...")
+        write_ips(params["municipalities"], ips_dir)
+
+    climate_dir = os.path.join(SYNTHETIC_DIR, f"inmet_{params['years']}y")
+    if not all(os.path.exists(os.path.join(climate_dir, f"data_{city}.csv")) for city in cities):
+        print(f"Generating {params['years']} year(s) of hourly readings for {len(cities)} stations...")
+        write_inmet(params["years"], climate_dir)
+    return ips_path, climate_dir
+
+
+def scoring(ips_path):
+    df_scores = add_theme_scores(load_ips(ips_path))
+    engine = RollupEngine(df_scores, list(themes))
+    equal_weights = {score: 1 for score in themes}
+    return engine.rollup('UF', equal_weights), engine.rollup('Region', equal_weights)
+
+
+def measure(func, repeat=1, memory=True):
+    """Best wall time of repeat runs and, optionally, the tracemalloc peak of one more run."""
+    bench = Profiler()
+    bench.start(memory=False)
+    try:
+        for _ in range(repeat):
+            with bench.stage("run"):
+                func()
+    finally:
+        bench.stop()
+    result = {"seconds": round(min(record["duration_s"] for record in bench.stages), 4)}
+
+    if memory:
+        bench.start(memory=True)
+        try:
+            with bench.stage("run"):
+                func()
+        finally:
+            bench.stop()
+        result["peak_mb"] = round(bench.stages[0]["peak_mb"], 2)
+    return result
+
+
+def run(scales, repeat=1, memory=True):
+    results = {}
+    for scale in scales:
+        ips_path, climate_dir = prepare(scale)
+        cases = {
+            "scoring": lambda: scoring(ips_path),
+            "climate": lambda: summarize_stations(climate_dir, cities),
+        }
+        results[scale] = {}
+        for name, func in cases.items():
+            results[scale][name] = measure(func, repeat, memory)
+            print(f"{scale:<8} {name:<10} {results[scale][name]}")
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """List of (scale, case, metric, baseline, current) that grew beyond the tolerance."""
+    floors = {"seconds": MIN_SECONDS, "peak_mb": MIN_PEAK_MB}
+    found = []
+    for scale, cases in results.items():
+        for name, metrics in cases.items():
+            reference = baseline.get(scale, {}).get(name, {})
+            for metric, value in metrics.items():
+                if metric not in reference:
+                    continue
+                before = reference[metric]
+                if value > before * (1 + tolerance) and value - before > floors[metric]:
+                    found.append((scale, name, metric, before, value))
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scoring and climate pipelines at several scales")
+    parser.add_argument("scales", nargs="*", default=["small"], choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per case (the best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative growth flagged as a regression")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.repeat, not args.no_memory)
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    with open(os.path.join(BENCHMARK_DIR, "latest.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        for scale, cases in results.items():
+            baseline.setdefault(scale, {}).update(cases)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+    else:
+        found = regressions(results, baseline, args.tolerance)
+        for scale, name, metric, before, value in found:
+            print(f"REGRESSION {scale}/{name} {metric}: {before} -> {value} (+{100 * (value / before - 1):.0f}%)")
+        if found:
+            sys.exit(1)
+        print(f"No regressions beyond {100 * args.tolerance:.0f}%.")
@@ -0,0 +1,127 @@
+"""
+Single command-line entry point for the data collection and scoring scripts.
+
+    python cli.py collect [--source numbeo|expatistan|coworking]
+    python cli.py internet | climate | ips | safety | score | report | api | sensitivity
+    python cli.py infomaz-report [--sem-relatorio | --listar | ...]
+    python cli.py check-startup
+
+report builds the per-city report cards; infomaz-report runs the Infomaz sales
+analysis (CSVs, charts and PDF) in the Peers Case folder.
+
+Each subcommand runs the existing script(s) as __main__ from the script's own
+folder, so the paths inside the scripts keep working from any directory (cron). Only the
+standard library is imported here: pandas, requests, bs4 and friends are loaded
+by the script of the subcommand that runs, never to parse arguments or print
+help. Arguments after the subcommand are passed on to the script.
+
+check-startup runs `cli.py --help` in a fresh interpreter with -X importtime
+and fails when a heavy package gets imported or the total import time goes
+over the budget, so the lazy loading stays in place.
+"""
+
+import argparse
+import os
+import runpy
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+INFOMAZ_DIR = os.path.normpath(os.path.join(SRC_DIR, "..", "..", "Peers Case"))
+
+# Subcommand -> (scripts run in order, relative to src, help)
+COMMANDS = {
+    "collect": (["scrape_all"], "scrape cost of living, safety and quality of life indexes"),
+    "internet": (["script_for_internet", "internet_json_csv"], "extract internet quality from the saved ranking page"),
+    "climate": (["climate_analysis"], "summarize the INMET station exports"),
+    "ips": (["ips_capitals"], "filter the IPS table to the capitals"),
+    "safety": (["safety_script"], "extract violent death rates and trends"),
+    "score": (["rollups"], "thematic scores and UF/region rollups"),
+    "report": (["report_cards"], "per-city report cards"),
+    "infomaz-report": ([os.path.join(INFOMAZ_DIR, "analise_infomaz")], "Infomaz sales analysis: CSVs, charts and PDF report"),
+    "api": (["ranking_api"], "serve the ranked table as a read-only JSON API"),
+    "sensitivity": (["feature_matrix"], "rank sensitivity to the weights over the shared feature matrix"),
+}
+
+# collect --source -> script
+COLLECT_SOURCES = {
+    "numbeo": "scrape_all",
+    "expatistan": "scrape_cost_of_living",
+    "coworking": "scrape_coworking",
+}
+
+# Packages that must not be imported just to start the CLI
+HEAVY_MODULES = {"pandas", "numpy", "matplotlib", "seaborn", "sklearn", "scipy", "requests", "bs4",
+                 "openpyxl", "folium", "branca", "plotly", "geopandas", "shapely", "PIL"}
+
+IMPORT_BUDGET_S = 0.15
+
+
+def run_script(name, args=()):
+    """Run src/<name>.py as __main__ from its folder, with the given arguments."""
+    path = os.path.join(SRC_DIR, f"{name}.py")
+    script_dir = os.path.dirname(path)
+    argv = sys.argv
+    sys.argv = [path, *args]
+    # Sibling modules of the script are imported as when it runs directly
+    sys.path.insert(0, script_dir)
+    os.chdir(script_dir)
+    try:
+        runpy.run_path(path, run_name="__main__")
+    finally:
+        sys.argv = argv
+        sys.path.remove(script_dir)
+
+
+def check_startup(budget=IMPORT_BUDGET_S):
+    """Import time and heavy packages loaded by `cli.py --help`. Returns True when within budget."""
+    result = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__), "--help"],
+                            capture_output=True, text=True, check=True)
+
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        imported.add(name.strip().split(".")[0])
+
+    heavy = sorted(imported & HEAVY_MODULES)
+    seconds = total_us / 1e6
+    print(f"Import time: {seconds:.3f}s (budget {budget:.3f}s), {len(imported)} top-level modules")
+    if heavy:
+        print(f"Heavy packages imported at startup: {', '.join(heavy)}")
+    ok = not heavy and seconds <= budget
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remote work cities pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command, (_, help_text) in COMMANDS.items():
+        sub = subparsers.add_parser(command, help=help_text)
+        if command == "collect":
+            sub.add_argument("--source", choices=list(COLLECT_SOURCES), default="numbeo")
+        sub.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed on to the script")
+
+    check = subparsers.add_parser("check-startup", help="check the CLI import time and heavy imports")
+    check.add_argument("--budget", type=float, default=IMPORT_BUDGET_S, help="import time budget in seconds")
+
+    # REMAINDER does not take options placed right after the subcommand (e.g. --listar),
+    # so unknown options are passed on to the script as well
+    args, options = parser.parse_known_args()
+    if args.command == "check-startup":
+        if options:
+            parser.error(f"unrecognized arguments: {' '.join(options)}")
+        sys.exit(0 if check_startup(args.budget) else 1)
+
+    scripts = [COLLECT_SOURCES[args.source]] if args.command == "collect" else COMMANDS[args.command][0]
+    for name in scripts:
+        run_script(name, options + args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
+"""
+Average rain days and temperature per capital from the INMET (BDMEP) exports.
+
+Both monthly exports and hourly exports ("Hora Medicao" column) are accepted;
+hourly readings are first reduced to the same monthly table, so the summary is
+computed the same way for both.
+"""
+
 import pandas as pd
 import os
 
+from profiling import profiler
+
 # List of Brazilian capital cities (lowercase with underscores)
 cities = [
     "aracaju", "belem", "belo_horizonte", "boa_vista", "brasilia", "cuiaba", "curitiba",
@@ -12,55 +22,94 @@ cities = [
 # Base path for the climate data files - change this to your local path
 base_path = "C:/Users/samue/OneDrive/Documents/Data-Science-Studies/Best_Cities_Remote_Work_Brazil/data/climate_data/"
 
-# Final summary results
-summary = []
+monthly_columns = ["Date", "Precipitation_Days", "Average_Temperature", "Average_Wind_Speed"]
+hourly_columns = ["Date", "Hour", "Precipitation", "Average_Temperature", "Average_Wind_Speed"]
 
-for city in cities:
-    file_path = os.path.join(base_path, f"data_{city}.csv")
-    
-    with open(file_path, encoding="utf-8") as f:
-        lines = f.readlines()
 
-    # Find where the actual data table starts
-    for i, line in enumerate(lines):
-        if line.startswith("Data Medicao"):
-            data_start_index = i
-            break
+def monthly_from_hourly(data):
+    """Reduce hourly readings to monthly rain days (days with precipitation > 0) and means."""
+    dates = pd.to_datetime(data["Date"], format="%Y-%m-%d")
+    daily_precip = data["Precipitation"].groupby(dates).sum(min_count=1)
+    rain_days = (daily_precip > 0).where(daily_precip.notna())
+    months = daily_precip.index.to_period("M")
+
+    monthly = data[["Average_Temperature", "Average_Wind_Speed"]].groupby(dates.dt.to_period("M")).mean()
+    monthly.insert(0, "Precipitation_Days", rain_days.groupby(months).sum(min_count=1))
+    monthly.index.name = "Date"
+    return monthly.reset_index()[monthly_columns]
 
-    # Read only the 4 first columns to avoid extra empty ones
+
+def read_station(file_path):
+    """Read one station export (monthly or hourly) into a monthly table."""
+    # Only scan up to the header of the data table, hourly files can be large
+    with open(file_path, encoding="utf-8") as f:
+        for data_start_index, line in enumerate(f):
+            if line.startswith("Data Medicao"):
+                break
+    hourly = line.split(";")[1].startswith("Hora")
+    columns = hourly_columns if hourly else monthly_columns
+
+    # Read only the first columns to avoid extra empty ones
     data = pd.read_csv(
         file_path,
         skiprows=data_start_index,
         sep=';',
         decimal='.',
         na_values=['null'],
-        usecols=range(4)
+        usecols=range(len(columns))
     )
 
     # Rename columns to English
-    data.columns = ["Date", "Precipitation_Days", "Average_Temperature", "Average_Wind_Speed"]
+    data.columns = columns
+    profiler.count("rows", len(data))
+    return monthly_from_hourly(data) if hourly else data
 
+
+def summarize_station(data):
+    """Average monthly rain days and temperature of one station."""
     # Remove rows with missing temperature or precipitation
     valid_data = data.dropna(subset=["Precipitation_Days", "Average_Temperature"])
+    profiler.count("rows_dropped", len(data) - len(valid_data))
 
     # Compute averages from valid data only
-    avg_precip_days = valid_data["Precipitation_Days"].mean()
-    avg_temperature = valid_data["Average_Temperature"].mean()
-
-    summary.append({
-        "City": city.replace("_", " ").title(),
-        "Avg Precipitation Days": round(avg_precip_days, 2),
-        "Avg Annual Temperature (°C)": round(avg_temperature, 2)
-    })
-
-# Create DataFrame and sort by temperature
-df_summary = pd.DataFrame(summary)
-df_summary.sort_values(by="Avg Annual Temperature (°C)", ascending=False, inplace=True)
-
-# Print results to terminal
-print(df_summary.to_string(index=False))
-
-# Export to CSV
-os.makedirs("data", exist_ok=True)
-df_summary.to_csv("data/climate_summary.csv", index=False, encoding="utf-8-sig")
-print("/nSummary saved to: data/climate_summary.csv")
+    return valid_data["Precipitation_Days"].mean(), valid_data["Average_Temperature"].mean()
+
+
+def summarize_stations(base_path, cities):
+    """Summary table of every city, sorted by temperature."""
+    summary = []
+
+    for city in cities:
+        file_path = os.path.join(base_path, f"data_{city}.csv")
+
+        with profiler.stage("read"):
+            data = read_station(file_path)
+        profiler.count("files")
+        profiler.count("bytes", os.path.getsize(file_path))
+
+        with profiler.stage("aggregate"):
+            avg_precip_days, avg_temperature = summarize_station(data)
+
+        summary.append({
+            "City": city.replace("_", " ").title(),
+            "Avg Precipitation Days": round(avg_precip_days, 2),
+            "Avg Annual Temperature (°C)": round(avg_temperature, 2)
+        })
+
+    # Create DataFrame and sort by temperature
+    df_summary = pd.DataFrame(summary)
+    df_summary.sort_values(by="Avg Annual Temperature (°C)", ascending=False, inplace=True)
+    return df_summary
+
+
+if __name__ == "__main__":
+    df_summary = summarize_stations(base_path, cities)
+
+    # Print results to terminal
+    print(df_summary.to_string(index=False))
+
+    # Export to CSV
+    with profiler.stage("write"):
+        os.makedirs("data", exist_ok=True)
+        df_summary.to_csv("data/climate_summary.csv", index=False, encoding="utf-8-sig")
+    print("/nSummary saved to: data/climate_summary.csv")
@@ -0,0 +1,294 @@
+"""
+Normalized indicator matrix shared between worker processes.
+
+The IPS indicators and the capital-level cost of living, climate, internet
+and safety tables are joined into one float matrix (one row per
+municipality, Min-Max scaled to 0-1 with lower-is-better columns inverted,
+missing values left as NaN). The matrix and the IBGE codes are published once
+in a named shared memory block; workers receive only a small descriptor
+(block name, shape, dtype, columns) and attach to the block without copying,
+as read-only NumPy views. Memory stays flat as workers are added and worker
+start-up does not depend on the number of municipalities.
+
+    with SharedFeatureMatrix.build() as shared:
+        results = run_parallel(my_task, tasks, shared, processes=4)
+
+my_task(features, task) runs in the workers and gets the attached
+FeatureView. The main block runs a weight sensitivity analysis of the
+rankings as an example.
+
+Usage:
+    python feature_matrix.py --samples 256 --workers 4
+"""
+
+import argparse
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from utils import (DATA_DIR, capitals_uf, themes, default_ips_path, indicator_columns, latest_death_rates, load_ips,
+                   scale_indicators)
+
+# Capital-level sources: file -> (city column, feature columns)
+capital_sources = {
+    "cost_of_life_capitals.csv": ("City", [
+        '1BR Apartment (Center)', '1BR Apartment (Outside)', 'Utilities (Monthly)', 'Internet (Monthly)',
+        'Groceries (Monthly)', 'Public Transport (Monthly)', 'Cost Index'
+    ]),
+    "climate_scores.csv": ("City", ['Precip Score', 'Temp Score', 'Wind Score', 'Climate Score']),
+    "internet_quality_capitals.csv": ("city", ['speed_mbps']),
+}
+
+# Feature of the newest death_per_capital_<year>.csv; its Taxa_<year> column is renamed to it
+DEATH_RATE = 'Violent Death Rate'
+
+# Source columns where lower values are better
+lower_is_better = [
+    '1BR Apartment (Center)', '1BR Apartment (Outside)', 'Utilities (Monthly)', 'Internet (Monthly)',
+    'Groceries (Monthly)', 'Public Transport (Monthly)', 'Cost Index', DEATH_RATE
+]
+
+# Column groups weighted by the sensitivity analysis: the IPS themes plus one group per source
+feature_groups = {
+    **themes,
+    'Cost of Living': capital_sources["cost_of_life_capitals.csv"][1],
+    'Climate': ['Climate Score'],
+    'Internet Speed': ['speed_mbps'],
+    'Violent Deaths': [DEATH_RATE],
+}
+
+
+def city_key(names):
+    """Accent- and case-insensitive city names ("São Luis" and "São Luís" match)."""
+    return names.map(lambda name: unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore")
+                     .decode().casefold().strip())
+
+
+def build_feature_frame(df, data_dir=DATA_DIR):
+    """IBGE codes and the scaled feature DataFrame (one row per municipality of the IPS table df)."""
+    features = scale_indicators(df, indicator_columns(df))
+
+    # The capital tables only have city names: match them to the row of the capital in its UF
+    capital_key = dict(zip(city_key(pd.Series(list(capitals_uf))), capitals_uf.values()))
+    key = city_key(df['CityName'])
+    key = key.where(key.map(capital_key) == df['UF'])
+
+    sources = dict(capital_sources)
+    death_rates = latest_death_rates(data_dir)
+    if death_rates:
+        sources[death_rates[0]] = ("Capital", [DEATH_RATE])
+
+    for file_name, (city_col, cols) in sources.items():
+        file_path = os.path.join(data_dir, file_name)
+        if not os.path.exists(file_path):
+            continue
+        source = pd.read_csv(file_path, encoding="utf-8-sig")
+        if death_rates and file_name == death_rates[0]:
+            source = source.rename(columns={death_rates[1]: DEATH_RATE})
+        source = source.set_index(city_key(source[city_col]))[cols]
+        values = source[~source.index.duplicated()].reindex(key).to_numpy(dtype=float)
+
+        col_min, col_max = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+        scaled = (values - col_min) / np.where(col_max > col_min, col_max - col_min, 1)
+        for i, col in enumerate(cols):
+            features[col] = 1 - scaled[:, i] if col in lower_is_better else scaled[:, i]
+
+    return df['Código IBGE'].to_numpy(dtype=np.int64), features
+
+
+class FeatureView:
+    """Read-only view of a published matrix. Keeps the shared memory block open while it lives."""
+
+    def __init__(self, descriptor):
+        self.descriptor = descriptor
+        # Pool workers share the resource tracker of the owner, so attaching does not hand them
+        # the cleanup of the block (the owner unlinks it)
+        self._shm = shared_memory.SharedMemory(name=descriptor["name"])
+
+        rows, cols = descriptor["shape"]
+        self.matrix = np.ndarray((rows, cols), dtype=descriptor["dtype"], buffer=self._shm.buf)
+        self.ids = np.ndarray(rows, dtype=np.int64, buffer=self._shm.buf, offset=descriptor["ids_offset"])
+        self.matrix.flags.writeable = False
+        self.ids.flags.writeable = False
+        self.columns = descriptor["columns"]
+        self._positions = {col: i for i, col in enumerate(self.columns)}
+
+    def column_indexes(self, cols):
+        return [self._positions[col] for col in cols if col in self._positions]
+
+    def close(self):
+        # The views must go before the buffer can be released
+        del self.matrix, self.ids
+        self._shm.close()
+
+
+class SharedFeatureMatrix:
+    """Owner of the shared memory block: publishes the matrix once and unlinks it on close."""
+
+    def __init__(self, ids, features, dtype=np.float64, name=None):
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+        matrix = np.ascontiguousarray(features.to_numpy(dtype=dtype))
+        ids_offset = matrix.nbytes + (-matrix.nbytes) % 8
+
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=max(ids_offset + ids.nbytes, 1))
+        np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=self._shm.buf)[:] = matrix
+        np.ndarray(ids.shape, dtype=np.int64, buffer=self._shm.buf, offset=ids_offset)[:] = ids
+
+        self.descriptor = {
+            "name": self._shm.name,
+            "shape": matrix.shape,
+            "dtype": matrix.dtype.str,
+            "ids_offset": ids_offset,
+            "columns": list(features.columns),
+        }
+
+    @classmethod
+    def build(cls, ips_path=None, dtype=np.float64, name=None):
+        ids, features = build_feature_frame(load_ips(ips_path or default_ips_path()))
+        return cls(ids, features, dtype, name)
+
+    @property
+    def nbytes(self):
+        return self._shm.size
+
+    def view(self):
+        return FeatureView(self.descriptor)
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# View attached by each worker process
+_features = None
+
+
+def _init_worker(descriptor):
+    global _features
+    _features = FeatureView(descriptor)
+
+
+def _run_task(args):
+    func, task = args
+    return func(_features, task)
+
+
+def run_parallel(func, tasks, shared, processes=None, mp_context=None):
+    """
+    Run func(features, task) for every task in worker processes attached to the shared matrix.
+
+    Only the descriptor is sent when a worker starts; func and the tasks are
+    pickled as usual, so they should be small (weights, row ranges, ids).
+    """
+    with ProcessPoolExecutor(processes, mp_context=mp_context, initializer=_init_worker,
+                             initargs=(shared.descriptor,)) as executor:
+        return list(executor.map(_run_task, [(func, task) for task in tasks]))
+
+
+def process_memory_mb():
+    """Resident and proportional set size of this process in MB (Linux only, None elsewhere)."""
+    memory = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    memory[key.lower()] = int(value.split()[0]) / 1024
+    except OSError:
+        return None
+    return memory
+
+
+def group_scores(features):
+    """Mean of the available columns of every feature group (rows x groups), NaN where none."""
+    scores = np.full((features.matrix.shape[0], len(feature_groups)), np.nan)
+    for g, cols in enumerate(feature_groups.values()):
+        indexes = features.column_indexes(cols)
+        if indexes:
+            values = features.matrix[:, indexes]
+            count = np.count_nonzero(~np.isnan(values), axis=1)
+            with np.errstate(invalid="ignore"):
+                scores[:, g] = np.nansum(values, axis=1) / np.where(count, count, np.nan)
+    return scores
+
+
+def rank_sensitivity(features, task):
+    """
+    Ranks of every row under a batch of random group weights.
+
+    Returns the sum and sum of squares of the ranks (1 = best) over the
+    batch, so the caller can combine batches into a mean and a spread.
+    """
+    seed, n_samples, groups = task
+    rng = np.random.default_rng(seed)
+    scores = group_scores(features)[:, groups]
+    available = ~np.isnan(scores)
+    filled = np.nan_to_num(scores)
+
+    rank_sum = np.zeros(len(filled))
+    rank_sq = np.zeros(len(filled))
+    for weights in rng.dirichlet(np.ones(len(groups)), n_samples):
+        # Weighted mean over the groups each row has
+        with np.errstate(invalid="ignore", divide="ignore"):
+            total = (filled @ weights) / (available @ weights)
+        order = np.argsort(-np.nan_to_num(total, nan=-np.inf), kind="stable")
+        ranks = np.empty(len(order))
+        ranks[order] = np.arange(1, len(order) + 1)
+        rank_sum += ranks
+        rank_sq += ranks ** 2
+    return rank_sum, rank_sq, os.getpid(), process_memory_mb()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank sensitivity to the group weights over the shared feature matrix")
+    parser.add_argument("--ips", default=None, help="IPS table (default: full municipal table if downloaded)")
+    parser.add_argument("--samples", type=int, default=256, help="random weight vectors")
+    parser.add_argument("--batch", type=int, default=16, help="weight vectors per task")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    df = load_ips(args.ips or default_ips_path())
+    start = time.perf_counter()
+    with SharedFeatureMatrix(*build_feature_frame(df)) as shared:
+        rows, cols = shared.descriptor["shape"]
+        print(f"Published {rows} x {cols} matrix ({shared.nbytes / 1024 ** 2:.1f} MB) "
+              f"as '{shared.descriptor['name']}' in {time.perf_counter() - start:.2f}s")
+
+        # Groups with data for every row would drown the capital-only ones in the full municipal table
+        view = shared.view()
+        coverage = ~np.isnan(group_scores(view))
+        view.close()
+        groups = [g for g in range(len(feature_groups)) if coverage[:, g].any()]
+
+        tasks = [(seed, min(args.batch, args.samples - done), groups)
+                 for seed, done in enumerate(range(0, args.samples, args.batch))]
+        start = time.perf_counter()
+        results = run_parallel(rank_sensitivity, tasks, shared, args.workers)
+        elapsed = time.perf_counter() - start
+
+    rank_sum = sum(result[0] for result in results)
+    rank_sq = sum(result[1] for result in results)
+    mean = rank_sum / args.samples
+    spread = np.sqrt(np.maximum(rank_sq / args.samples - mean ** 2, 0))
+
+    summary = pd.DataFrame({"Município": df['Município'], "UF": df['UF'], "Mean Rank": mean.round(1),
+                            "Rank Std": spread.round(1)}).sort_values("Mean Rank")
+    print(summary.head(args.top).to_string(index=False))
+
+    memory = {pid: mb for _, _, pid, mb in results}
+    print(f"{args.samples} weight samples in {elapsed:.2f}s on {len(memory)} workers")
+    for pid, mb in memory.items():
+        if mb:
+            print(f"  worker {pid}: RSS {mb['rss']:.1f} MB, PSS {mb['pss']:.1f} MB")
@@ -0,0 +1,158 @@
+"""
+Great-circle distances between municipalities and hub points (capitals, airports).
+
+Points are converted once to unit vectors on the sphere. The cosine of the
+central angle between every pair is then a matrix product (BLAS), computed
+in row blocks sized to a memory budget, so the 31M municipality pairs at
+national scale never exist as one matrix. Distances come from that cosine
+through the chord between the points, 2R·asin(chord / 2) with
+chord = sqrt(2 - 2cos): the same value as the haversine formula, but
+computed from the dot product instead of the latitude and longitude
+differences, so very short distances are only accurate to about 0.2 m.
+Radius tests compare the cosine with cos(r / R) and need no trigonometry
+per pair.
+
+Features per municipality:
+- distance to (and name of) the nearest capital and hub airport;
+- number of other municipalities within a radius (100 km by default).
+
+Municipality coordinates come from a CSV with the IBGE code, latitude and
+longitude (e.g. the public "municipios.csv" list of Brazilian municipalities),
+saved as data/municipios.csv. Without it only the capitals are covered, using
+utils.capital_coords.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import DATA_DIR, capital_coords, capitals_uf, default_ips_path, load_ips
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Memory budget for each block of the pair matrix
+CHUNK_MB = 64
+
+# Main international airports
+airport_coords = {
+    "GRU": (-23.4356, -46.4731), "GIG": (-22.8090, -43.2506), "BSB": (-15.8692, -47.9208),
+    "CNF": (-19.6244, -43.9719), "VCP": (-23.0074, -47.1345), "REC": (-8.1265, -34.9236),
+    "SSA": (-12.9086, -38.3225), "FOR": (-3.7763, -38.5326), "POA": (-29.9939, -51.1714),
+    "CWB": (-25.5285, -49.1758), "FLN": (-27.6703, -48.5525), "MAO": (-3.0386, -60.0497),
+    "BEL": (-1.3792, -48.4763)
+}
+
+COORDS_PATH = os.path.join(DATA_DIR, "municipios.csv")
+
+
+def unit_vectors(lat, lon):
+    """(n, 3) unit vectors of points given in degrees."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def cosine_to_km(cosine):
+    """Great-circle distance in km from the cosine of the central angle (chord form)."""
+    chord = np.sqrt(np.clip(2.0 - 2.0 * cosine, 0.0, 4.0))
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(chord / 2.0)
+
+
+def row_blocks(n_rows, n_cols, chunk_mb=CHUNK_MB):
+    """Row slices so that an (rows, n_cols) float64 block and one temporary fit in chunk_mb."""
+    rows = max(1, int(chunk_mb * 2 ** 20 // (16 * max(n_cols, 1))))
+    for start in range(0, n_rows, rows):
+        yield slice(start, min(start + rows, n_rows))
+
+
+def iter_distance_blocks(lat, lon, other_lat, other_lon, chunk_mb=CHUNK_MB):
+    """Yield (row slice, block of distances in km) of the full points x other points matrix."""
+    points = unit_vectors(lat, lon)
+    others = unit_vectors(other_lat, other_lon)
+    for rows in row_blocks(len(points), len(others), chunk_mb):
+        yield rows, cosine_to_km(points[rows] @ others.T)
+
+
+def distance_matrix(lat, lon, other_lat, other_lon):
+    """Full distance matrix in km (only for small sets, e.g. capitals x airports)."""
+    return cosine_to_km(unit_vectors(lat, lon) @ unit_vectors(other_lat, other_lon).T)
+
+
+def nearest_point(lat, lon, other_lat, other_lon, chunk_mb=CHUNK_MB):
+    """Distance in km and index of the nearest other point for every point."""
+    points = unit_vectors(lat, lon)
+    others = unit_vectors(other_lat, other_lon)
+    index = np.empty(len(points), dtype=np.int64)
+    cosine = np.empty(len(points))
+    for rows in row_blocks(len(points), len(others), chunk_mb):
+        block = points[rows] @ others.T
+        index[rows] = block.argmax(axis=1)
+        cosine[rows] = block[np.arange(len(block)), index[rows]]
+    return cosine_to_km(cosine), index
+
+
+def count_within(lat, lon, radius_km, other_lat=None, other_lon=None, chunk_mb=CHUNK_MB):
+    """
+    Number of other points within radius_km of every point.
+
+    Without other points the points are counted against themselves, leaving
+    each point out of its own count.
+    """
+    points = unit_vectors(lat, lon)
+    others = points if other_lat is None else unit_vectors(other_lat, other_lon)
+    threshold = np.cos(radius_km / EARTH_RADIUS_KM)
+    counts = np.zeros(len(points), dtype=np.int64)
+    for rows in row_blocks(len(points), len(others), chunk_mb):
+        counts[rows] = np.count_nonzero(points[rows] @ others.T >= threshold, axis=1)
+    return counts - 1 if other_lat is None else counts
+
+
+def accessibility_features(df, lat_col="lat", lon_col="lon", radius_km=100, hubs=capital_coords,
+                           airports=airport_coords, chunk_mb=CHUNK_MB):
+    """DataFrame (same index as df) with the distance and count features of every row."""
+    lat = df[lat_col].to_numpy(dtype=float)
+    lon = df[lon_col].to_numpy(dtype=float)
+    features = pd.DataFrame(index=df.index)
+
+    for label, points in (("Capital", hubs), ("Airport", airports)):
+        names = list(points)
+        point_lat, point_lon = np.array(list(points.values())).T
+        km, index = nearest_point(lat, lon, point_lat, point_lon, chunk_mb)
+        features[f"Nearest {label}"] = np.array(names)[index]
+        features[f"Distance to Nearest {label} (km)"] = km.round(1)
+
+    features[f"Municipalities within {radius_km:g} km"] = count_within(lat, lon, radius_km, chunk_mb=chunk_mb)
+    return features
+
+
+def load_municipality_coords(file_path=COORDS_PATH):
+    """IBGE code, latitude and longitude of every municipality."""
+    coords = pd.read_csv(file_path, encoding="utf-8")
+    coords = coords.rename(columns={"codigo_ibge": "Código IBGE", "latitude": "lat", "longitude": "lon"})
+    return coords[["Código IBGE", "lat", "lon"]]
+
+
+def municipalities_with_coords(df, coords_path=COORDS_PATH):
+    """IPS rows with lat/lon: every municipality if the coordinates file exists, otherwise the capitals."""
+    if os.path.exists(coords_path):
+        return df.merge(load_municipality_coords(coords_path), on="Código IBGE", how="inner")
+    # Capitals are matched on (CityName, UF): other municipalities share some capital names
+    located = df[df['CityName'].map(capitals_uf) == df['UF']].copy()
+    located['lat'], located['lon'] = zip(*located['CityName'].map(capital_coords))
+    return located
+
+
+if __name__ == "__main__":
+    df = municipalities_with_coords(load_ips(default_ips_path()))
+    if not os.path.exists(COORDS_PATH):
+        print(f"{COORDS_PATH} not found: computing the features for the {len(df)} capitals only.")
+
+    features = accessibility_features(df)
+    result = pd.concat([df[['Código IBGE', 'Município', 'UF']], features], axis=1)
+    print(result.sort_values("Distance to Nearest Airport (km)").to_string(index=False))
+
+    output_path = os.path.join(DATA_DIR, "accessibility_features.csv")
+    result.to_csv(output_path, index=False, encoding="utf-8")
+    print(f"Accessibility features saved to {output_path}")
@@ -0,0 +1,291 @@
+"""
+Append-only history of the generated tables (rankings, internet quality, ...).
+
+Each snapshot is stored as a Parquet segment with only the cells that changed
+since the previous snapshot, in long (key, column, value) format, so storage
+grows with the changed values and not with full copies of the tables. Every
+CHECKPOINT_EVERY snapshots a checkpoint with the full state of the table is
+written next to the segment, and a point-in-time read replays only the segments
+from the latest checkpoint at or before its date. Snapshot-to-snapshot diffs are
+computed on the pivoted tables, and compaction folds old segments into a single
+base segment, which also serves as a checkpoint. Segments written as .csv.gz by
+earlier versions are still read.
+
+Removed rows get a __deleted__ flag and removed columns a tombstone cell; a row
+that comes back is stored in full, so compaction can drop deleted rows.
+
+Usage:
+    python history_store.py snapshot
+    python history_store.py diff 2025-01-01 2025-04-01
+    python history_store.py compact 2025-04-01
+"""
+
+import argparse
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from utils import DATA_DIR, NOTEBOOK_DIR, latest_death_rates
+
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
+
+# Tracked tables: name -> (file, key column)
+tracked_tables = {
+    "ranked_analysis": (os.path.join(NOTEBOOK_DIR, "ranked_analysis.csv"), "City"),
+    "internet_quality_capitals": (os.path.join(DATA_DIR, "internet_quality_capitals.csv"), "city"),
+    "climate_scores": (os.path.join(DATA_DIR, "climate_scores.csv"), "City"),
+    "cost_of_life_capitals": (os.path.join(DATA_DIR, "cost_of_life_capitals.csv"), "City"),
+    "coworking_capitals": (os.path.join(DATA_DIR, "coworking_capitals.csv"), "capital"),
+}
+
+# Newest single-year death rates; the table keeps one name as the year moves on
+death_rates = latest_death_rates()
+if death_rates:
+    tracked_tables["death_per_capital"] = (os.path.join(DATA_DIR, death_rates[0]), "Capital")
+
+# Segments between two full checkpoints; bounds the replay of a point-in-time read
+CHECKPOINT_EVERY = 10
+
+DELETED = "__deleted__"
+
+# value_str of a cell whose column was removed from the table
+DROPPED = "__dropped__"
+
+
+def to_long(df, key):
+    """Table -> long cells with a numeric and a text value column."""
+    long = df.melt(id_vars=key, var_name='column', value_name='value').rename(columns={key: 'key'})
+    numeric = pd.to_numeric(long['value'], errors='coerce')
+    long['value_num'] = numeric
+    long['value_str'] = long['value'].where(numeric.isna() & long['value'].notna()).astype(object)
+    return long.drop(columns='value')
+
+
+class HistoryStore:
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.manifest_path = os.path.join(root, "manifest.json")
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {}
+        self._segments = {}
+
+    def _save_manifest(self):
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+
+    def snapshots(self, table):
+        return [segment['snapshot'] for segment in self.manifest.get(table, [])]
+
+    def _read_segment(self, table, file_name):
+        path = os.path.join(self.root, table, file_name)
+        if path not in self._segments:
+            if file_name.endswith(".csv.gz"):
+                self._segments[path] = pd.read_csv(
+                    path, dtype={'key': str, 'column': str, 'value_str': object}, encoding="utf-8"
+                )
+            else:
+                self._segments[path] = pd.read_parquet(path)
+        return self._segments[path]
+
+    def _write_segment(self, table, file_name, cells):
+        os.makedirs(os.path.join(self.root, table), exist_ok=True)
+        cells = cells[['key', 'column', 'value_num', 'value_str']].astype(
+            {'key': str, 'column': str, 'value_num': float, 'value_str': object}
+        )
+        cells.to_parquet(os.path.join(self.root, table, file_name), index=False)
+
+    def _cells(self, table, as_of=None):
+        """Latest value of every (key, column) cell at the given snapshot date."""
+        segments = [s for s in self.manifest.get(table, []) if as_of is None or s['snapshot'] <= str(as_of)]
+        if not segments:
+            return pd.DataFrame(columns=['key', 'column', 'value_num', 'value_str', 'snapshot'])
+
+        # Replay starts at the latest checkpoint, which holds every cell up to its snapshot
+        start = max((i for i, s in enumerate(segments) if 'checkpoint' in s), default=None)
+        parts = []
+        if start is not None:
+            parts.append(self._read_segment(table, segments[start]['checkpoint'])
+                         .assign(snapshot=segments[start]['snapshot']))
+            segments = segments[start + 1:]
+        parts += [self._read_segment(table, s['file']).assign(snapshot=s['snapshot']) for s in segments]
+
+        # Segments are appended in date order, so the last row per cell wins
+        cells = pd.concat(parts, ignore_index=True)
+        return cells.drop_duplicates(subset=['key', 'column'], keep='last')
+
+    def _segments_since_checkpoint(self, table):
+        segments = self.manifest.get(table, [])
+        last = max((i for i, s in enumerate(segments) if 'checkpoint' in s), default=-1)
+        return len(segments) - 1 - last
+
+    @staticmethod
+    def _deleted_keys(cells):
+        return set(cells.loc[(cells['column'] == DELETED) & (cells['value_num'] == 1), 'key'])
+
+    def append(self, table, df, key, snapshot=None):
+        """Store the cells of df that differ from the latest snapshot. Returns the number of changed cells."""
+        snapshot = str(snapshot or date.today().isoformat())
+        existing = self.snapshots(table)
+        if existing and snapshot <= existing[-1]:
+            raise ValueError(f"Snapshot {snapshot} is not newer than the latest one ({existing[-1]}) for {table}")
+
+        df = df.drop_duplicates(subset=[key]).copy()
+        df[key] = df[key].astype(str).str.strip()
+        new = to_long(df, key)
+
+        previous = self._cells(table)
+        merged = new.merge(previous, on=['key', 'column'], how='outer', suffixes=('', '_old'), indicator=True)
+
+        same_num = (merged['value_num'] == merged['value_num_old']) | \
+                   (merged['value_num'].isna() & merged['value_num_old'].isna())
+        same_str = (merged['value_str'] == merged['value_str_old']) | \
+                   (merged['value_str'].isna() & merged['value_str_old'].isna())
+        # Keys that disappeared get a tombstone, keys that came back are revived
+        deleted = self._deleted_keys(previous)
+        alive = set(previous['key']) - deleted
+        new_keys = set(new['key'])
+        revived = new_keys & deleted
+        flags = [(k, DELETED, 1.0) for k in sorted(alive - new_keys)] + \
+                [(k, DELETED, 0.0) for k in sorted(revived)]
+
+        # Revived keys are stored in full: compaction may have dropped their old cells
+        changed = merged[(merged['_merge'] == 'left_only') |
+                         ((merged['_merge'] == 'both') & (~(same_num & same_str) | merged['key'].isin(revived)))]
+
+        # Columns removed from a key that is still in the table get a tombstone cell
+        dropped = merged[(merged['_merge'] == 'right_only') & merged['key'].isin(new_keys) &
+                         (merged['column'] != DELETED) & (merged['value_str_old'] != DROPPED)]
+
+        segment = pd.concat([
+            changed[['key', 'column', 'value_num', 'value_str']],
+            dropped[['key', 'column']].assign(value_num=np.nan, value_str=DROPPED),
+            pd.DataFrame(flags, columns=['key', 'column', 'value_num']).assign(value_str=None),
+        ], ignore_index=True)
+
+        file_name = f"{snapshot}.parquet"
+        self._write_segment(table, file_name, segment)
+        entry = {'snapshot': snapshot, 'file': file_name, 'key': key, 'cells': len(segment)}
+        self.manifest.setdefault(table, []).append(entry)
+
+        if self._segments_since_checkpoint(table) >= CHECKPOINT_EVERY:
+            checkpoint = f"{snapshot}.checkpoint.parquet"
+            self._write_segment(table, checkpoint, self._cells(table))
+            entry['checkpoint'] = checkpoint
+        self._save_manifest()
+        return len(segment)
+
+    def as_of(self, table, snapshot=None):
+        """Rebuild the table as it was at the given snapshot date (latest if None)."""
+        cells = self._cells(table, snapshot)
+        deleted = self._deleted_keys(cells)
+        cells = cells[(cells['column'] != DELETED) & (cells['value_str'] != DROPPED) & ~cells['key'].isin(deleted)]
+
+        values = cells['value_num'].astype(object).where(cells['value_num'].notna(), cells['value_str'])
+        wide = cells.assign(value=values).pivot(index='key', columns='column', values='value')
+
+        key = self.manifest[table][-1]['key'] if self.manifest.get(table) else 'key'
+        wide = wide.rename_axis(key).rename_axis(None, axis=1).reset_index()
+        return wide.infer_objects()
+
+    def diff(self, table, old_snapshot, new_snapshot, rank_col=None, ascending=False):
+        """
+        Vectorized difference of the numeric columns between two snapshots.
+
+        With rank_col, the rank of each key by that column is computed in both
+        snapshots and the rank change (positive = moved up) is added.
+        """
+        segments = self.manifest.get(table, [])
+        for snapshot in (old_snapshot, new_snapshot):
+            if segments and ".base." in segments[0]['file'] and str(snapshot) < segments[0]['snapshot']:
+                raise ValueError(f"The history of {table} before {segments[0]['snapshot']} was compacted away; "
+                                 f"cannot diff from {snapshot}")
+            if not segments or str(snapshot) < segments[0]['snapshot']:
+                raise ValueError(f"No snapshot of {table} at or before {snapshot}")
+
+        old = self.as_of(table, old_snapshot)
+        new = self.as_of(table, new_snapshot)
+        key = old.columns[0] if len(old.columns) else new.columns[0]
+
+        old = old.set_index(key)
+        new = new.set_index(key)
+        keys = old.index.union(new.index)
+        cols = [c for c in new.columns.intersection(old.columns)
+                if pd.api.types.is_numeric_dtype(new[c]) and pd.api.types.is_numeric_dtype(old[c])]
+
+        old_values = old.reindex(keys)[cols].to_numpy(dtype=float)
+        new_values = new.reindex(keys)[cols].to_numpy(dtype=float)
+        delta = pd.DataFrame(new_values - old_values, index=keys, columns=[f"{c} Δ" for c in cols])
+
+        if rank_col:
+            old_rank = old[rank_col].rank(ascending=ascending, method='min').reindex(keys)
+            new_rank = new[rank_col].rank(ascending=ascending, method='min').reindex(keys)
+            delta.insert(0, 'Rank Old', old_rank)
+            delta.insert(1, 'Rank New', new_rank)
+            delta.insert(2, 'Rank Change', old_rank - new_rank)
+
+        changed = ~np.all((new_values == old_values) | (np.isnan(new_values) & np.isnan(old_values)), axis=1)
+        delta.insert(0, 'Changed', changed)
+        return delta.rename_axis(key).reset_index()
+
+    def compact(self, table, up_to=None):
+        """Fold every segment up to the given date into a single base segment."""
+        segments = self.manifest.get(table, [])
+        up_to = str(up_to or segments[-1]['snapshot'])
+        old = [s for s in segments if s['snapshot'] <= up_to]
+        if len(old) < 2:
+            return
+
+        cells = self._cells(table, up_to)
+        # Tombstoned keys and columns are fully dropped from the base (a revived key is stored in full)
+        deleted = self._deleted_keys(cells)
+        base = cells[~cells['key'].isin(deleted) & (cells['column'] != DELETED) & (cells['value_str'] != DROPPED)]
+
+        base_snapshot = old[-1]['snapshot']
+        file_name = f"{base_snapshot}.base.parquet"
+        self._write_segment(table, file_name, base)
+        for name in {f for s in old for f in (s['file'], s.get('checkpoint')) if f and f != file_name}:
+            os.remove(os.path.join(self.root, table, name))
+
+        # The base holds the full state at its snapshot, so it is also the checkpoint of the later segments
+        self.manifest[table] = [{'snapshot': base_snapshot, 'file': file_name, 'key': old[-1]['key'],
+                                 'cells': len(base), 'checkpoint': file_name}] + \
+                               [s for s in segments if s['snapshot'] > up_to]
+        self._segments.clear()
+        self._save_manifest()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned history of the generated tables")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    snapshot_parser = subparsers.add_parser("snapshot")
+    snapshot_parser.add_argument("--date", default=None)
+    diff_parser = subparsers.add_parser("diff")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new")
+    diff_parser.add_argument("--table", default="ranked_analysis")
+    compact_parser = subparsers.add_parser("compact")
+    compact_parser.add_argument("up_to", nargs="?", default=None)
+    args = parser.parse_args()
+
+    store = HistoryStore()
+
+    if args.command == "snapshot":
+        for table, (file_path, key) in tracked_tables.items():
+            if os.path.exists(file_path):
+                df = pd.read_csv(file_path, encoding="utf-8-sig")
+                print(f"{table}: {store.append(table, df, key, args.date)} changed cells")
+    elif args.command == "diff":
+        rank_col = "Remote Work Score" if args.table == "ranked_analysis" else None
+        df_diff = store.diff(args.table, args.old, args.new, rank_col=rank_col)
+        print(df_diff[df_diff['Changed']].to_string(index=False))
+    elif args.command == "compact":
+        for table in list(store.manifest):
+            store.compact(table, args.up_to)
+        print("History compacted.")
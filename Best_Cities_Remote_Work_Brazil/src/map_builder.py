@@ -0,0 +1,337 @@
+"""
+Nationwide choropleth of municipal scores with clustered point layers.
+
+Municipal boundaries (e.g. IBGE BR_Municipios_2022.shp, joined on the IBGE code)
+are simplified once per zoom level with a topology-preserving (coverage)
+simplification, rounded to a fixed precision and cached as GeoJSON in
+data/geo_cache, so later runs skip the expensive geometry work. Each level is
+written as TopoJSON (quantized, delta-encoded arcs, every shared border stored
+once). Only the coarsest level is embedded in the HTML; the finer ones are
+separate files fetched the first time the zoom reaches them. Point layers use
+FastMarkerCluster, which ships the points as one array instead of one marker
+object per point.
+"""
+
+import hashlib
+import json
+import os
+
+import branca.colormap as cm
+import folium
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from branca.element import MacroElement, Template
+from folium.elements import JSCSSMixin
+from folium.plugins import FastMarkerCluster
+
+from utils import DATA_DIR, NOTEBOOK_DIR, add_theme_scores, default_ips_path, load_ips
+
+GEO_CACHE_DIR = os.path.join(DATA_DIR, "geo_cache")
+
+# Minimum zoom for each level -> simplification tolerance in degrees
+zoom_levels = {
+    0: 0.05,
+    6: 0.01,
+    9: 0.002,
+}
+
+
+def file_hash(file_path):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def is_valid_coverage(gdf):
+    """True when the polygons form an exact coverage (no overlaps, neighbours share identical vertices)."""
+    return hasattr(shapely, "coverage_is_valid") and bool(shapely.coverage_is_valid(np.asarray(gdf.geometry)))
+
+
+def simplify_geometries(gdf, tolerance, valid_coverage=None):
+    """
+    Simplify keeping shared borders between neighbours.
+
+    Coverage simplification only works on a valid coverage: on an invalid one it
+    leaves almost every vertex in place. In that case (or without GEOS 3.12)
+    each polygon is simplified on its own, topology preserved.
+    """
+    if valid_coverage is None:
+        valid_coverage = is_valid_coverage(gdf)
+    if valid_coverage and hasattr(gdf.geometry, "simplify_coverage"):
+        return gdf.geometry.simplify_coverage(tolerance)
+    return gdf.geometry.simplify(tolerance, preserve_topology=True)
+
+
+def load_simplified_levels(boundaries_path, code_col="CD_MUN", precision=4, levels=zoom_levels):
+    """
+    Return {min_zoom: GeoDataFrame} with the simplified boundaries, using the
+    cache in data/geo_cache when the source file, code column, tolerance and
+    precision did not change.
+    """
+    os.makedirs(GEO_CACHE_DIR, exist_ok=True)
+    source_hash = file_hash(boundaries_path)
+    source = valid_coverage = None
+    simplified = {}
+
+    for min_zoom, tolerance in levels.items():
+        cache_path = os.path.join(GEO_CACHE_DIR,
+                                  f"municipios_{source_hash}_{code_col}_t{tolerance}_p{precision}.geojson")
+        if os.path.exists(cache_path):
+            simplified[min_zoom] = gpd.read_file(cache_path)
+            continue
+
+        # The full-resolution source is read only if some level is missing from the cache
+        if source is None:
+            source = gpd.read_file(boundaries_path)[[code_col, "geometry"]].to_crs(epsg=4326)
+            source[code_col] = source[code_col].astype(str)
+            valid_coverage = is_valid_coverage(source)
+            if not valid_coverage:
+                print("Boundaries are not a valid coverage; simplifying each polygon on its own.")
+
+        gdf = source.copy()
+        # Pointwise rounding: every vertex is snapped on its own, so shared borders stay identical
+        gdf["geometry"] = simplify_geometries(gdf, tolerance, valid_coverage).set_precision(
+            10 ** -precision, mode="pointwise")
+        gdf = gdf[~gdf.geometry.is_empty]
+        gdf.to_file(cache_path, driver="GeoJSON", COORDINATE_PRECISION=precision)
+        simplified[min_zoom] = gdf
+
+    return simplified
+
+
+def polygon_rings(geometry):
+    """Rings of a Polygon or MultiPolygon as lists of (n, 2) coordinate arrays, one list per polygon."""
+    return [[np.asarray(ring.coords)[:-1] for ring in [polygon.exterior, *polygon.interiors]]
+            for polygon in getattr(geometry, "geoms", [geometry]) if not polygon.is_empty]
+
+
+def to_topojson(gdf, properties, precision=4, object_name="municipios"):
+    """
+    TopoJSON topology of the polygons in gdf, with the given per-row properties.
+
+    Coordinates are quantized to the 10^-precision grid and arcs are delta
+    encoded. Rings are cut where three or more polygons meet, so a border shared
+    by two neighbours is stored once and referenced by both (reversed as ~index).
+    """
+    scale = 10.0 ** -precision
+    x0, y0 = gdf.total_bounds[:2]
+    shapes = [[[np.round((ring - (x0, y0)) / scale).astype(np.int64) for ring in rings] for rings in polygon_rings(geom)]
+              for geom in gdf.geometry]
+    # Drop the repeated vertices left by quantization
+    shapes = [[[ring[np.any(ring != np.roll(ring, 1, axis=0), axis=1)] for ring in rings] for rings in polygons]
+              for polygons in shapes]
+    shapes = [[[ring for ring in rings if len(ring) >= 3] for rings in polygons] for polygons in shapes]
+    shapes = [[rings for rings in polygons if rings] for polygons in shapes]
+
+    rings = [ring for polygons in shapes for rings in polygons for ring in rings]
+    width = max((int(ring[:, 1].max()) for ring in rings), default=0) + 1
+    keys = [ring[:, 0] * width + ring[:, 1] for ring in rings]
+
+    # A junction is a vertex visited with different neighbours (where a shared border starts or ends)
+    if keys:
+        key = np.concatenate(keys)
+        previous = np.concatenate([np.roll(k, 1) for k in keys])
+        following = np.concatenate([np.roll(k, -1) for k in keys])
+        visits = np.unique(np.column_stack([key, np.minimum(previous, following), np.maximum(previous, following)]),
+                           axis=0)
+        points, counts = np.unique(visits[:, 0], return_counts=True)
+        is_junction = np.isin(key, points[counts > 1])
+        junction_masks = np.split(is_junction, np.cumsum([len(k) for k in keys])[:-1])
+    else:
+        junction_masks = []
+
+    arcs, arc_index = [], {}
+
+    def add_arc(ring, ring_keys):
+        forward = ring_keys.tobytes()
+        if forward in arc_index:
+            return arc_index[forward]
+        backward = ring_keys[::-1].tobytes()
+        if backward in arc_index:
+            return ~arc_index[backward]
+        arc_index[forward] = len(arcs)
+        arcs.append(np.vstack([ring[:1], np.diff(ring, axis=0)]).tolist())
+        return len(arcs) - 1
+
+    def encode_ring(ring, ring_keys, junction_mask):
+        cuts = np.flatnonzero(junction_mask)
+        # Rings without junctions (islands, enclaves) start at their smallest vertex so both sides match
+        start = cuts[0] if len(cuts) else int(np.argmin(ring_keys))
+        ring, ring_keys = np.roll(ring, -start, axis=0), np.roll(ring_keys, -start)
+        cuts = list(cuts - start) + [len(ring)] if len(cuts) else [0, len(ring)]
+        closed, closed_keys = np.vstack([ring, ring[:1]]), np.append(ring_keys, ring_keys[0])
+        return [add_arc(closed[a:b + 1], closed_keys[a:b + 1]) for a, b in zip(cuts[:-1], cuts[1:])]
+
+    ring_iter = iter(zip(keys, junction_masks))
+    geometries = []
+    for polygons, props in zip(shapes, properties.to_dict("records")):
+        encoded = [[encode_ring(ring, *next(ring_iter)) for ring in rings] for rings in polygons]
+        if not encoded:
+            continue
+        if len(encoded) == 1:
+            geometries.append({"type": "Polygon", "arcs": encoded[0], "properties": props})
+        else:
+            geometries.append({"type": "MultiPolygon", "arcs": encoded, "properties": props})
+
+    return {
+        "type": "Topology",
+        "transform": {"scale": [scale, scale], "translate": [float(x0), float(y0)]},
+        "objects": {object_name: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": arcs,
+    }
+
+
+class ZoomTopoJsonLayers(JSCSSMixin, MacroElement):
+    """
+    Choropleth levels swapped on zoom: only the level whose zoom range contains the
+    current zoom is shown. Levels with a topology are embedded; levels with a url are
+    fetched the first time the zoom reaches them (the previous level stays until then).
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var levels = {{ this.levels|tojson }};
+            var scoreLabel = {{ this.score_label|tojson }};
+            function style(feature) {
+                return {fillColor: feature.properties.fill, color: "#555555", weight: 0.2, fillOpacity: 0.8};
+            }
+            function tooltip(feature, layer) {
+                layer.bindTooltip("<b>" + feature.properties.name + "</b><br>" + scoreLabel + ": "
+                                  + feature.properties.score, {sticky: true});
+            }
+            function toLayer(topology) {
+                var object = topology.objects[Object.keys(topology.objects)[0]];
+                return L.geoJson(topojson.feature(topology, object),
+                                 {style: style, onEachFeature: tooltip, smoothFactor: 1.5});
+            }
+            function load(level) {
+                level.loading = true;
+                fetch(level.url)
+                    .then(function(response) { return response.json(); })
+                    .then(function(topology) { level.layer = toLayer(topology); update(); })
+                    .catch(function(error) { console.warn("Could not load " + level.url, error); });
+            }
+            function update() {
+                var zoom = map.getZoom();
+                var active = null;
+                levels.forEach(function(level) {
+                    if (zoom < level.zoom) { return; }
+                    if (level.layer) { active = level.layer; }
+                    else if (level.url && !level.loading) { load(level); }
+                });
+                levels.forEach(function(level) {
+                    if (!level.layer) { return; }
+                    if (level.layer === active) { if (!map.hasLayer(level.layer)) { map.addLayer(level.layer); } }
+                    else if (map.hasLayer(level.layer)) { map.removeLayer(level.layer); }
+                });
+            }
+            levels.forEach(function(level) {
+                if (level.topology) { level.layer = toLayer(level.topology); delete level.topology; }
+            });
+            map.on('zoomend', update);
+            update();
+        })();
+        {% endmacro %}
+    """)
+
+    default_js = [("topojson", "https://cdn.jsdelivr.net/npm/topojson-client@3/dist/topojson-client.min.js")]
+
+    def __init__(self, levels, score_label):
+        super().__init__()
+        self._name = "ZoomTopoJsonLayers"
+        self.levels = levels
+        self.score_label = score_label
+
+
+def build_choropleth_map(simplified, scores, score_col, code_col="CD_MUN", score_code_col="Código IBGE",
+                         name_col="Município", points=None, level_files_prefix=None, precision=4):
+    """
+    Folium map with the choropleth levels as TopoJSON and optional clustered points.
+
+    The coarsest level is embedded in the HTML. With level_files_prefix, the finer
+    levels are written next to it as <prefix>_z<zoom>.topojson and loaded on zoom
+    (the map must then be served over HTTP, e.g. python -m http.server; opened from
+    disk it keeps the embedded level). Without it the finer levels are dropped.
+    points is a DataFrame with lat, lon and label columns.
+    """
+    scores = scores[[score_code_col, name_col, score_col]].copy()
+    scores[score_code_col] = scores[score_code_col].astype(str)
+    colormap = cm.linear.YlGn_09.scale(scores[score_col].min(), scores[score_col].max())
+    colormap.caption = score_col
+
+    brazil_map = folium.Map(location=[-15.7942, -47.8826], zoom_start=4, tiles="cartodbpositron", prefer_canvas=True)
+
+    # Colours are computed once here and stored in the feature properties
+    levels = []
+    for i, (min_zoom, gdf) in enumerate(sorted(simplified.items())):
+        if i and not level_files_prefix:
+            break
+        layer_gdf = gdf.merge(scores, left_on=code_col, right_on=score_code_col, how="inner")
+        properties = pd.DataFrame({
+            "name": layer_gdf[name_col],
+            "score": layer_gdf[score_col].round(4).astype(object).where(layer_gdf[score_col].notna(), None),
+            "fill": layer_gdf[score_col].map(lambda v: colormap(v) if pd.notna(v) else "#cccccc"),
+        })
+        topology = to_topojson(layer_gdf, properties, precision)
+        if i == 0:
+            levels.append({"zoom": min_zoom, "topology": topology})
+            continue
+        file_path = f"{level_files_prefix}_z{min_zoom}.topojson"
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(topology, f, ensure_ascii=False, separators=(",", ":"))
+        levels.append({"zoom": min_zoom, "url": os.path.basename(file_path)})
+
+    ZoomTopoJsonLayers(levels, score_col).add_to(brazil_map)
+    colormap.add_to(brazil_map)
+
+    if points is not None and len(points):
+        FastMarkerCluster(
+            points[["lat", "lon", "label"]].values.tolist(),
+            name="Cities",
+            callback="""
+                function (row) {
+                    var marker = L.marker(new L.LatLng(row[0], row[1]));
+                    marker.bindPopup(row[2]);
+                    return marker;
+                };
+            """,
+        ).add_to(brazil_map)
+
+    folium.LayerControl(collapsed=True).add_to(brazil_map)
+    return brazil_map
+
+
+def centroid_points(gdf, scores, score_col, code_col="CD_MUN", score_code_col="Código IBGE", name_col="Município"):
+    """One point per municipality (representative point, always inside the polygon) labelled with its score."""
+    points = gdf[[code_col, "geometry"]].copy()
+    points["geometry"] = points.geometry.representative_point()
+    scores = scores[[score_code_col, name_col, score_col]].assign(**{score_code_col: scores[score_code_col].astype(str)})
+    points = points.merge(scores, left_on=code_col, right_on=score_code_col, how="inner")
+    return pd.DataFrame({
+        "lat": points.geometry.y.round(5),
+        "lon": points.geometry.x.round(5),
+        "label": points[name_col] + ": " + points[score_col].round(3).astype(str),
+    })
+
+
+if __name__ == "__main__":
+    # IBGE municipal mesh: https://www.ibge.gov.br/geociencias/organizacao-do-territorio/malhas-territoriais
+    boundaries_path = os.path.join(DATA_DIR, "BR_Municipios_2022", "BR_Municipios_2022.shp")
+
+    df_scores = add_theme_scores(load_ips(default_ips_path()))
+    simplified = load_simplified_levels(boundaries_path)
+    points = centroid_points(simplified[max(simplified)], df_scores, "Overall Score")
+
+    output_path = os.path.join(NOTEBOOK_DIR, "remote_work_brazil_map.html")
+    level_files_prefix = os.path.splitext(output_path)[0]
+    brazil_map = build_choropleth_map(simplified, df_scores, "Overall Score", points=points,
+                                      level_files_prefix=level_files_prefix)
+    brazil_map.save(output_path)
+    print(f"Map saved as '{output_path}' ({os.path.getsize(output_path) / 1e6:.1f} MB); finer levels in "
+          f"{level_files_prefix}_z*.topojson, loaded on zoom when the map is served over HTTP.")
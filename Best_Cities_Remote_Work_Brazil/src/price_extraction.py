@@ -0,0 +1,162 @@
+"""
+Price extraction for coworking pages (search results, listings).
+
+The page is reduced to plain text once (one regex pass drops tags, scripts
+and styles) and then scanned once with a single precompiled pattern that
+matches R$ / BRL / reais amounts together with an optional period:
+
+    R$ 1.200,00/mês   R$1,200.00 per month   BRL 45 por dia   35 reais a hora
+
+Amounts accept "." or "," as thousands separator and 1-2 decimals after the
+last separator. Prices are normalized to a monthly value: a day is a working
+day (20 per month, as the Workfrom daily prices were already converted), an
+hour is 8 working hours of such a day and a week is 52/12 of a month. Amounts
+without a period take the default period of the source.
+
+Only the standard library is used, so a batch over thousands of saved pages
+can run in worker processes without loading BeautifulSoup.
+
+Usage:
+    python price_extraction.py ../data/pages/*.html --output ../data/coworking_page_prices.csv
+"""
+
+import argparse
+import csv
+import glob
+import html
+import os
+import re
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Digits with "." or "," inside; the separators are interpreted by parse_amount. Kept this loose
+# because a stricter pattern is retried at every digit of the page and doubles the scan time.
+AMOUNT = r"\d(?:[\d.,]*\d)?"
+
+# Period word -> canonical period
+period_aliases = {
+    "mês": "month", "mes": "month", "mensal": "month", "month": "month", "monthly": "month", "mo": "month",
+    "semana": "week", "semanal": "week", "week": "week", "weekly": "week",
+    "dia": "day", "diária": "day", "diaria": "day", "day": "day", "daily": "day",
+    "hora": "hour", "horas": "hour", "hour": "hour", "hourly": "hour", "hr": "hour", "h": "hour",
+}
+
+# Canonical period -> factor to a monthly price
+MONTHLY_FACTOR = {
+    "month": 1.0,
+    "week": 52 / 12,
+    "day": 20.0,
+    "hour": 8 * 20.0,
+}
+
+# Longest aliases first so "monthly" is not read as "mo"
+_PERIODS = "|".join(sorted(map(re.escape, period_aliases), key=len, reverse=True))
+
+PRICE_PATTERN = re.compile(
+    rf"(?:(?:R\$|BRL)\s*(?P<prefixed>{AMOUNT})|(?<![\d.,])(?P<suffixed>{AMOUNT})\s*(?:BRL|reais)\b)"
+    rf"(?:\s*(?:/|por|per|ao|à|a|an)?\s*(?P<period>{_PERIODS})\b)?",
+    re.IGNORECASE,
+)
+
+# Same as above for elements that only hold a price ("1.200/mês"), with or without currency
+BARE_PRICE_PATTERN = re.compile(
+    rf"(?:R\$|BRL)?\s*(?P<prefixed>{AMOUNT})(?:\s*(?:BRL|reais)\b)?"
+    rf"(?:\s*(?:/|por|per|ao|à|a|an)?\s*(?P<period>{_PERIODS})\b)?",
+    re.IGNORECASE,
+)
+
+# Decimal part: 1-2 digits after the last separator
+DECIMAL_TAIL = re.compile(r"(.*?)(?:[.,](\d{1,2}))?")
+
+MARKUP_PATTERN = re.compile(r"<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->|<[^>]+>",
+                            re.IGNORECASE | re.DOTALL)
+
+
+def page_text(page):
+    """Visible text of an HTML page, tags replaced by spaces."""
+    return html.unescape(MARKUP_PATTERN.sub(" ", page))
+
+
+def parse_amount(text):
+    """'1.234,56', '1,234.56', '1.500' or '49,9' as a float."""
+    if text.isdigit():
+        return float(text)
+    integer, decimals = DECIMAL_TAIL.fullmatch(text).groups()
+    value = float(re.sub(r"[.,]", "", integer))
+    return value + float(f"0.{decimals}") if decimals else value
+
+
+def iter_prices(text, default_period="month", bare_numbers=False):
+    """Yield (amount, period, monthly price) for every price in the text, in a single scan."""
+    pattern = BARE_PRICE_PATTERN if bare_numbers else PRICE_PATTERN
+    for match in pattern.finditer(text):
+        amount = parse_amount(match.group("prefixed") or match.group("suffixed"))
+        word = match.group("period")
+        period = period_aliases[word.lower()] if word else default_period
+        yield amount, period, amount * MONTHLY_FACTOR[period]
+
+
+def extract_prices(text, default_period="month", min_monthly=100, max_monthly=5000, bare_numbers=False):
+    """Monthly prices found in the text, keeping only those in the plausible range."""
+    return [round(monthly, 2) for _, _, monthly in iter_prices(text, default_period, bare_numbers)
+            if min_monthly <= monthly <= max_monthly]
+
+
+def price_summary(prices):
+    if not prices:
+        return {"prices": 0, "min_price": None, "median_price": None, "max_price": None}
+    return {"prices": len(prices), "min_price": min(prices), "median_price": statistics.median(prices),
+            "max_price": max(prices)}
+
+
+def extract_page(file_path, default_period="month", min_monthly=100, max_monthly=5000):
+    """Price summary of one saved page."""
+    with open(file_path, encoding="utf-8", errors="replace") as f:
+        prices = extract_prices(page_text(f.read()), default_period, min_monthly, max_monthly)
+    return {"page": file_path, **price_summary(prices)}
+
+
+def _extract_page(args):
+    return extract_page(*args)
+
+
+def extract_pages(paths, processes=None, default_period="month", min_monthly=100, max_monthly=5000):
+    """Price summaries of many saved pages, in worker processes when there is more than one CPU."""
+    processes = processes or os.cpu_count() or 1
+    tasks = [(path, default_period, min_monthly, max_monthly) for path in paths]
+    if processes == 1 or len(tasks) < 2:
+        return [_extract_page(task) for task in tasks]
+    with ProcessPoolExecutor(processes) as executor:
+        return list(executor.map(_extract_page, tasks, chunksize=max(1, len(tasks) // (processes * 8))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract monthly coworking prices from saved pages")
+    parser.add_argument("pages", nargs="+", help="HTML files or glob patterns")
+    parser.add_argument("--output", default=None, help="CSV with one row per page")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--default-period", choices=list(MONTHLY_FACTOR), default="month",
+                        help="period of prices that do not state one")
+    parser.add_argument("--min-monthly", type=float, default=100)
+    parser.add_argument("--max-monthly", type=float, default=5000)
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in args.pages for path in glob.glob(pattern)})
+    megabytes = sum(os.path.getsize(path) for path in paths) / 1024 ** 2
+
+    start = time.perf_counter()
+    results = extract_pages(paths, args.processes, args.default_period, args.min_monthly, args.max_monthly)
+    elapsed = time.perf_counter() - start
+
+    with_prices = [row for row in results if row["prices"]]
+    print(f"{len(paths)} pages ({megabytes:.1f} MB) in {elapsed:.2f}s: "
+          f"{len(paths) / max(elapsed, 1e-9):.0f} pages/s, {megabytes / max(elapsed, 1e-9):.1f} MB/s")
+    print(f"{len(with_prices)} pages with prices, {sum(row['prices'] for row in results)} prices")
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["page", "prices", "min_price", "median_price", "max_price"])
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"Prices saved to {args.output}")
@@ -0,0 +1,156 @@
+"""
+Opt-in instrumentation: stage timers, per-stage memory peaks and counters.
+
+Off by default. Run a script with PROFILE=1 (or PROFILE=<trace.json>) or call
+profiler.enable() to record. While off, profiler.stage() returns a shared no-op
+context manager and profiler.count() returns at once, so instrumented code
+pays one attribute check per call.
+
+When the process exits, an enabled profiler writes a JSON trace and prints a
+summary. The trace lists each stage with its start, duration and peak memory
+above the level at stage entry, plus the counters. The scripts run their
+stages one after the other in a single thread, so stages are flat (not nested).
+
+A separate Profiler can also be started and stopped around a piece of code
+without writing a trace (benchmarks.py measures its cases this way).
+"""
+
+import atexit
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        if self.profiler.memory:
+            tracemalloc.reset_peak()
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        record = {
+            "stage": self.name,
+            "start_s": round(self.start - self.profiler.started, 6),
+            "duration_s": round(duration, 6),
+        }
+        if self.profiler.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            record["peak_mb"] = round(max(peak - self.start_memory, 0) / 2 ** 20, 3)
+        self.profiler.stages.append(record)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.memory = True
+        self.trace_path = None
+        self.started = None
+        self.stages = []
+        self.counters = defaultdict(int)
+        self._tracing = False
+
+    def start(self, memory=True):
+        """Record stages and counters from now on (tracemalloc is started if needed)."""
+        self.enabled = True
+        self.memory = memory
+        self.started = time.perf_counter()
+        self.stages = []
+        self.counters.clear()
+        self._tracing = memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+
+    def stop(self):
+        """Stop recording; the stages and counters are kept."""
+        self.enabled = False
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def enable(self, trace_path=None, memory=True):
+        """Start recording; the trace and summary are written at exit."""
+        if self.enabled:
+            return
+        self.trace_path = trace_path
+        self.start(memory)
+        atexit.register(self.finish)
+
+    def stage(self, name):
+        """Context manager timing a named stage (no-op when disabled)."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def count(self, name, value=1):
+        """Add value to a counter (requests, bytes, rows, retries...)."""
+        if self.enabled:
+            self.counters[name] += value
+
+    def trace(self):
+        return {
+            "script": os.path.basename(sys.argv[0]),
+            "argv": sys.argv[1:],
+            "total_s": round(time.perf_counter() - self.started, 6),
+            "stages": self.stages,
+            "counters": dict(self.counters),
+        }
+
+    def summary(self):
+        """Time, calls and memory peak per stage, plus the counters, as text."""
+        totals = {}
+        for record in self.stages:
+            total = totals.setdefault(record["stage"], {"calls": 0, "seconds": 0.0, "peak_mb": 0.0})
+            total["calls"] += 1
+            total["seconds"] += record["duration_s"]
+            total["peak_mb"] = max(total["peak_mb"], record.get("peak_mb", 0.0))
+
+        elapsed = time.perf_counter() - self.started
+        lines = [f"{'Stage':<40} {'Calls':>6} {'Seconds':>10} {'% total':>8} {'Peak MB':>9}"]
+        for name, total in sorted(totals.items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(f"{name:<40} {total['calls']:>6} {total['seconds']:>10.3f} "
+                         f"{100 * total['seconds'] / elapsed:>7.1f}% {total['peak_mb']:>9.2f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value:,}" if isinstance(value, int) else f"{name}: {value:,.3f}")
+        lines.append(f"Total: {elapsed:.3f}s")
+        return "\n".join(lines)
+
+    def finish(self):
+        """Write the JSON trace and print the summary."""
+        if not self.enabled:
+            return
+        trace_path = self.trace_path or "profile_{}_{}.json".format(
+            os.path.splitext(os.path.basename(sys.argv[0]) or "python")[0], datetime.now().strftime("%Y%m%d_%H%M%S"))
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump(self.trace(), f, ensure_ascii=False, indent=2)
+        print(self.summary())
+        print(f"Trace saved to '{trace_path}'.")
+        self.stop()
+
+
+profiler = Profiler()
+
+if os.environ.get("PROFILE", "").lower() not in ("", "0", "false"):
+    profiler.enable(None if os.environ["PROFILE"].lower() in ("1", "true") else os.environ["PROFILE"])
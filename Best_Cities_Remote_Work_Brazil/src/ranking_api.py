@@ -0,0 +1,286 @@
+"""
+Local read-only JSON API over the ranked table (notebook/ranked_analysis.csv).
+
+The table is loaded once. For every numeric column a sorted index (row
+positions, best first, missing values last) is precomputed for the whole table
+and for each UF and region. A query picks the index of its group and sort
+column and scans it in blocks, applying the filters as vectorized masks, until
+k rows pass, so a top-k never sorts or copies the table. UF and Region come
+from utils.capitals_uf when the table does not have them.
+
+Every response except /health carries a weak ETag with the data version (hash
+of the file; weak because took_ms differs between otherwise equal bodies), and
+If-None-Match is answered with 304. A watcher thread checks the file every
+second and swaps in a freshly built index when the ranking is regenerated;
+requests in flight keep the index they started with.
+
+Endpoints:
+    GET /rankings?sort=Remote Work Score&k=10&region=Nordeste
+                 &filter=1BR Apartment (Center)<2000&filter=speed_mbps>200
+        optional: uf=BA, order=asc, columns=City,Remote Work Score
+    GET /cities/<name>
+    GET /columns
+    GET /health
+
+Usage:
+    python ranking_api.py --port 8050
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import operator
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from utils import NOTEBOOK_DIR, capitals_uf, uf_region
+
+RANKING_PATH = os.path.join(NOTEBOOK_DIR, "ranked_analysis.csv")
+
+DEFAULT_SORT = "Remote Work Score"
+MAX_K = 1000
+
+# Rows checked per step of a filtered scan
+SCAN_BLOCK = 4096
+
+operators = {
+    "<=": operator.le, ">=": operator.ge, "!=": operator.ne,
+    "<": operator.lt, ">": operator.gt, "=": operator.eq,
+}
+FILTER_PATTERN = re.compile(r"^(.+?)\s*(<=|>=|!=|<|>|=)\s*(.+)$")
+
+
+class QueryError(ValueError):
+    pass
+
+
+def file_hash(file_path):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+class RankingIndex:
+    def __init__(self, df, version, key="City", group_cols=("UF", "Region")):
+        df = df.reset_index(drop=True)
+        if "UF" not in df.columns:
+            df["UF"] = df[key].map(capitals_uf)
+        if "Region" not in df.columns:
+            df["Region"] = df["UF"].map(uf_region)
+
+        self.version = version
+        self.key = key
+        self.columns = list(df.columns)
+        self.numeric = {col: df[col].to_numpy(dtype=float) for col in df.select_dtypes("number").columns}
+        self.text = {col: df[col].astype(object).to_numpy() for col in df.columns if col not in self.numeric}
+
+        # JSON-ready rows (NaN -> null), built once and shared by every response
+        self.records = [{col: (None if isinstance(v, float) and math.isnan(v) else v) for col, v in row.items()}
+                        for row in df.to_dict("records")]
+        self.by_key = {str(row[key]).casefold(): i for i, row in enumerate(self.records)}
+
+        # Row positions per group, then one descending order per (group, column)
+        everything = np.arange(len(df))
+        self.groups = {(None, None): everything}
+        for col in group_cols:
+            for value, positions in df.groupby(col, sort=True).indices.items():
+                self.groups[(col, value)] = positions
+        self.orders = {}
+        for group, positions in self.groups.items():
+            for col, values in self.numeric.items():
+                group_values = values[positions]
+                # Stable sort on the negated values: ties keep the table order, NaN goes last
+                order = np.argsort(np.where(np.isnan(group_values), np.inf, -group_values), kind="stable")
+                self.orders[(group, col)] = positions[order]
+
+    @classmethod
+    def from_csv(cls, file_path=RANKING_PATH):
+        return cls(pd.read_csv(file_path, encoding="utf-8"), file_hash(file_path))
+
+    def parse_filter(self, expression):
+        match = FILTER_PATTERN.match(expression.strip())
+        if not match:
+            raise QueryError(f"Invalid filter '{expression}' (use <column><op><value>, op in {', '.join(operators)})")
+        col, op, raw = match.group(1).strip(), match.group(2), match.group(3).strip()
+        if col in self.numeric:
+            try:
+                return self.numeric[col], operators[op], float(raw)
+            except ValueError:
+                raise QueryError(f"Column '{col}' is numeric, got '{raw}'")
+        if col in self.text and op in ("=", "!="):
+            return self.text[col], operators[op], raw
+        raise QueryError(f"Unknown column or operator for filter '{expression}'")
+
+    def top(self, sort=DEFAULT_SORT, k=10, uf=None, region=None, filters=(), ascending=False, columns=None):
+        if k < 1:
+            raise QueryError(f"k must be at least 1, got {k}")
+        if sort not in self.numeric:
+            raise QueryError(f"Unknown sort column '{sort}'")
+        if uf and region:
+            raise QueryError("Use either uf or region, not both")
+        group = ("UF", uf) if uf else ("Region", region) if region else (None, None)
+        if group not in self.groups:
+            return []
+        if columns:
+            unknown = [col for col in columns if col not in self.columns]
+            if unknown:
+                raise QueryError(f"Unknown columns: {', '.join(unknown)}")
+
+        order = self.orders[(group, sort)]
+        if ascending:
+            # Reverse the non-missing part, keep missing values last
+            n_valid = np.count_nonzero(~np.isnan(self.numeric[sort][order]))
+            order = np.concatenate([order[:n_valid][::-1], order[n_valid:]])
+
+        conditions = [self.parse_filter(expression) for expression in filters]
+        if conditions:
+            hits = []
+            for start in range(0, len(order), SCAN_BLOCK):
+                block = order[start:start + SCAN_BLOCK]
+                mask = np.ones(len(block), dtype=bool)
+                for values, compare, value in conditions:
+                    mask &= compare(values[block], value)
+                hits.extend(block[mask][:k - len(hits)].tolist())
+                if len(hits) >= k:
+                    break
+        else:
+            hits = order[:k].tolist()
+
+        if columns:
+            return [{col: self.records[i][col] for col in columns} for i in hits]
+        return [self.records[i] for i in hits]
+
+    def city(self, name):
+        position = self.by_key.get(name.casefold())
+        return None if position is None else self.records[position]
+
+
+class RankingService:
+    """Holds the current index and reloads it when the file changes."""
+
+    def __init__(self, file_path=RANKING_PATH, poll_seconds=1.0):
+        self.file_path = file_path
+        self.poll_seconds = poll_seconds
+        self._mtime = os.stat(file_path).st_mtime_ns
+        self.index = RankingIndex.from_csv(file_path)
+        self.loaded_at = time.time()
+
+    def reload_if_changed(self):
+        try:
+            mtime = os.stat(self.file_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        index = RankingIndex.from_csv(self.file_path)
+        if index.version != self.index.version:
+            # A single reference swap: requests in flight keep their index
+            self.index = index
+            self.loaded_at = time.time()
+            print(f"Reloaded {self.file_path} (version {index.version})")
+            return True
+        return False
+
+    def watch(self):
+        def loop():
+            while True:
+                time.sleep(self.poll_seconds)
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    # Keep serving the previous version if the new file is incomplete or invalid
+                    print(f"Reload failed: {e}")
+        threading.Thread(target=loop, daemon=True).start()
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, body, etag=None):
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            start = time.perf_counter()
+            index = service.index
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+
+            def param(name, default=None):
+                return params.get(name, [default])[0]
+
+            try:
+                if url.path == "/rankings":
+                    k = min(int(param("k", 10)), MAX_K)
+                    columns = param("columns")
+                    results = index.top(
+                        sort=param("sort", DEFAULT_SORT), k=k, uf=param("uf"), region=param("region"),
+                        filters=params.get("filter", []), ascending=param("order", "desc") == "asc",
+                        columns=columns.split(",") if columns else None,
+                    )
+                    body = {"version": index.version, "count": len(results), "results": results}
+                elif url.path.startswith("/cities/"):
+                    record = index.city(unquote(url.path[len("/cities/"):]))
+                    if record is None:
+                        self.send_json(404, {"error": "City not found"})
+                        return
+                    body = {"version": index.version, "result": record}
+                elif url.path == "/columns":
+                    body = {"version": index.version, "numeric": list(index.numeric), "text": list(index.text),
+                            "groups": sorted({col for col, _ in index.groups if col})}
+                elif url.path == "/health":
+                    body = {"version": index.version, "rows": len(index.records), "loaded_at": service.loaded_at}
+                else:
+                    self.send_json(404, {"error": "Not found"})
+                    return
+            except (QueryError, ValueError) as e:
+                self.send_json(400, {"error": str(e)})
+                return
+
+            # Checked after routing, so errors (404, 400) are never turned into a 304.
+            # /health reports the live service, so it is never answered from a cache
+            etag = None if url.path == "/health" else f'W/"{index.version}"'
+            if etag and self.headers.get("If-None-Match") in (etag, etag[2:]):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            body["took_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self.send_json(200, body, etag)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the ranked table")
+    parser.add_argument("--table", default=RANKING_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    args = parser.parse_args()
+
+    service = RankingService(args.table)
+    service.watch()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving {args.table} ({len(service.index.records)} rows) on http://{args.host}:{args.port}")
+    server.serve_forever()
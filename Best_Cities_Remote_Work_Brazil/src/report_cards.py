@@ -0,0 +1,152 @@
+"""
+Batch report cards for every city in the ranked table.
+
+Each card has the radar chart from analysis.ipynb, the category breakdown and
+the city's position among all Remote Work Scores. Cards are drawn in worker
+processes; every worker builds one figure template at start-up and only clears
+and redraws its axes per card. A hash of each city's scores is kept in the
+output folder so only cards whose scores changed are redrawn.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from utils import NOTEBOOK_DIR
+
+CARDS_DIR = os.path.join(NOTEBOOK_DIR, "report_cards")
+CACHE_FILE = "cards_cache.json"
+
+labels = ['Cost of Living', 'Internet Speed', 'Climate', 'Safety', 'Quality of Life']
+
+# Figure template reused by every card drawn in this worker process
+_template = None
+
+
+def radar_categories(df_ranked):
+    """The five composite categories used by plot_radar_chart in analysis.ipynb."""
+    df_radar = df_ranked[['City', 'Remote Work Score']].copy()
+    df_radar['Cost of Living'] = (
+        df_ranked['1BR Apartment (Center)'] * 0.4 +
+        df_ranked['Utilities (Monthly)'] * 0.3 +
+        df_ranked['Groceries (Monthly)'] * 0.3
+    )
+    df_radar['Internet Speed'] = df_ranked['speed_mbps']
+    df_radar['Climate'] = df_ranked['Climate Score']
+    df_radar['Safety'] = df_ranked['Segurança Pessoal']
+    df_radar['Quality of Life'] = (
+        df_ranked['Índice de Progresso Social'] * 0.3 +
+        df_ranked['Saúde e Bem-estar'] * 0.3 +
+        df_ranked['Moradia'] * 0.2 +
+        df_ranked['Água e Saneamento'] * 0.2
+    )
+    df_radar['Rank'] = df_radar['Remote Work Score'].rank(ascending=False, method='min').astype(int)
+    return df_radar
+
+
+def _init_worker(all_scores):
+    """Create the figure and axes once per worker."""
+    global _template
+    fig = plt.figure(figsize=(12, 4.5))
+    ax_radar = fig.add_subplot(1, 3, 1, polar=True)
+    ax_bars = fig.add_subplot(1, 3, 2)
+    ax_rank = fig.add_subplot(1, 3, 3)
+    _template = (fig, ax_radar, ax_bars, ax_rank, np.sort(np.asarray(all_scores))[::-1])
+
+
+def draw_card(card, output_path):
+    """Redraw the template axes for one city and save the card."""
+    fig, ax_radar, ax_bars, ax_rank, sorted_scores = _template
+    for ax in (ax_radar, ax_bars, ax_rank):
+        ax.cla()
+
+    values = np.array([card[label] for label in labels], dtype=float)
+    values = np.nan_to_num(values)
+    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False)
+    closed_angles = np.append(angles, angles[0])
+    closed_values = np.append(values, values[0])
+
+    ax_radar.plot(closed_angles, closed_values, color='tab:blue')
+    ax_radar.fill(closed_angles, closed_values, color='tab:blue', alpha=0.25)
+    ax_radar.set_xticks(angles)
+    ax_radar.set_xticklabels(labels, fontsize=8)
+    ax_radar.set_ylim(0, 1)
+    ax_radar.set_title('Remote Work Criteria', fontsize=10)
+
+    ax_bars.barh(labels, values, color='skyblue')
+    ax_bars.set_xlim(0, 1)
+    ax_bars.invert_yaxis()
+    ax_bars.set_xlabel('Normalized Value')
+    ax_bars.set_title('Category Breakdown', fontsize=10)
+
+    positions = np.arange(1, len(sorted_scores) + 1)
+    colors = np.where(positions == card['Rank'], 'tab:orange', 'lightgray')
+    ax_rank.bar(positions, sorted_scores, color=colors)
+    ax_rank.set_xlabel('Rank')
+    ax_rank.set_ylabel('Remote Work Score')
+    ax_rank.set_title(f"Rank {card['Rank']} of {len(sorted_scores)}", fontsize=10)
+
+    fig.suptitle(f"{card['City']} - Remote Work Score {card['Remote Work Score']:.3f}")
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=150)
+    return output_path
+
+
+def scores_hash(all_scores):
+    """Hash of the sorted Remote Work Score of every city, drawn in the rank panel of each card."""
+    scores = np.round(np.sort(np.asarray(all_scores, dtype=float)), 10)
+    return hashlib.sha256(scores.tobytes()).hexdigest()
+
+
+def card_hash(card, all_scores_hash):
+    """Hash of the values shown in a card (rank panel included)."""
+    payload = {key: (None if pd.isna(value) else round(float(value), 10)) if key != 'City' else value
+               for key, value in card.items()}
+    payload['all_scores'] = all_scores_hash
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def generate_report_cards(df_ranked, output_dir=CARDS_DIR, max_workers=None):
+    """Draw the cards whose scores changed since the last run. Returns the list of written files."""
+    os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+
+    df_cards = radar_categories(df_ranked)
+    all_scores_hash = scores_hash(df_cards['Remote Work Score'])
+    jobs = []
+    for card in df_cards.to_dict('records'):
+        file_name = f"{card['City'].lower().replace(' ', '_')}.png"
+        output_path = os.path.join(output_dir, file_name)
+        digest = card_hash(card, all_scores_hash)
+        if cache.get(file_name) == digest and os.path.exists(output_path):
+            continue
+        cache[file_name] = digest
+        jobs.append((card, output_path))
+
+    written = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(df_cards['Remote Work Score'].to_numpy(),)) as executor:
+            cards, paths = zip(*jobs)
+            written = list(executor.map(draw_card, cards, paths, chunksize=max(1, len(jobs) // 32)))
+
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    return written
+
+
+if __name__ == "__main__":
+    df_ranked = pd.read_csv(os.path.join(NOTEBOOK_DIR, "ranked_analysis.csv"), encoding="utf-8")
+    written = generate_report_cards(df_ranked)
+    print(f"{len(written)} report cards written to {CARDS_DIR} ({len(df_ranked) - len(written)} unchanged).")
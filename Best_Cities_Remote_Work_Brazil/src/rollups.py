@@ -0,0 +1,131 @@
+"""
+Population-weighted rollups of the IPS thematic scores and the Remote Work Score
+from municipality to UF and to macro-region.
+
+The base table is scanned once: per-UF sums of weight and weight * score are
+computed in a single grouped reduction and cached. Region totals are built from
+the UF sums, and any re-weighting of the themes is a linear combination of the
+cached sums, so the municipality table is never read again.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import DATA_DIR, NOTEBOOK_DIR, themes, uf_region, load_ips, add_theme_scores, default_ips_path
+
+
+class RollupEngine:
+    def __init__(self, df, score_cols, weight_col='População 2022', uf_col='UF'):
+        self.score_cols = list(score_cols)
+        self.weight_col = weight_col
+
+        # Single vectorized pass over the base table
+        uf_codes, ufs = pd.factorize(df[uf_col], sort=True)
+        weights = df[weight_col].to_numpy(dtype=float)
+        values = df[self.score_cols].to_numpy(dtype=float)
+
+        # Missing scores should not count towards the weight of their column
+        valid = ~np.isnan(values)
+        weighted = np.where(valid, values * weights[:, None], 0.0)
+        valid_weight = valid * weights[:, None]
+
+        n_groups = len(ufs)
+        self._sum_wx = np.zeros((n_groups, len(self.score_cols)))
+        self._sum_w = np.zeros((n_groups, len(self.score_cols)))
+        np.add.at(self._sum_wx, uf_codes, weighted)
+        np.add.at(self._sum_w, uf_codes, valid_weight)
+
+        self._count = np.bincount(uf_codes, minlength=n_groups)
+        self._population = np.bincount(uf_codes, weights=weights, minlength=n_groups)
+        self._ufs = pd.Index(ufs, name='UF')
+
+        # Region partials are built from the cached UF sums
+        regions = self._ufs.map(uf_region)
+        region_codes, region_names = pd.factorize(regions, sort=True)
+        self._region_codes = region_codes
+        self._regions = pd.Index(region_names, name='Region')
+        self._cache = {}
+
+    def _sums(self, level):
+        """Return the cached (sum_wx, sum_w, count, population, index) for a level."""
+        if level in self._cache:
+            return self._cache[level]
+
+        if level == 'UF':
+            sums = (self._sum_wx, self._sum_w, self._count, self._population, self._ufs)
+        elif level == 'Region':
+            n = len(self._regions)
+            sum_wx = np.zeros((n, len(self.score_cols)))
+            sum_w = np.zeros((n, len(self.score_cols)))
+            np.add.at(sum_wx, self._region_codes, self._sum_wx)
+            np.add.at(sum_w, self._region_codes, self._sum_w)
+            count = np.bincount(self._region_codes, weights=self._count, minlength=n).astype(int)
+            population = np.bincount(self._region_codes, weights=self._population, minlength=n)
+            sums = (sum_wx, sum_w, count, population, self._regions)
+        elif level == 'Brasil':
+            sums = (self._sum_wx.sum(axis=0, keepdims=True), self._sum_w.sum(axis=0, keepdims=True),
+                    np.array([self._count.sum()]), np.array([self._population.sum()]),
+                    pd.Index(['Brasil'], name='Brasil'))
+        else:
+            raise ValueError(f"Unknown level '{level}'. Use 'UF', 'Region' or 'Brasil'.")
+
+        self._cache[level] = sums
+        return sums
+
+    def rollup(self, level='UF', score_weights=None, combined_name='Combined Score'):
+        """
+        Population-weighted mean of every score column at the given level.
+
+        score_weights optionally maps score columns to weights; the weighted
+        combination is added as an extra column computed from the cached sums.
+        """
+        sum_wx, sum_w, count, population, index = self._sums(level)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sum_wx / sum_w
+
+        result = pd.DataFrame(means, columns=self.score_cols, index=index)
+
+        if score_weights:
+            cols = [self.score_cols.index(col) for col in score_weights]
+            w = np.array(list(score_weights.values()), dtype=float)
+            result[combined_name] = means[:, cols] @ (w / w.sum())
+
+        result.insert(0, 'Municipalities', count)
+        result.insert(1, self.weight_col, population)
+        return result.reset_index()
+
+
+def load_remote_work_scores(ips_path, ranked_path):
+    """Join the ranked Remote Work Scores to the IPS table to get UF and population per city."""
+    df_ips = pd.read_csv(ips_path, encoding="utf-8")
+    df_ranked = pd.read_csv(ranked_path, encoding="utf-8")
+    return df_ranked[['City', 'Remote Work Score']].merge(
+        df_ips[['Município', 'UF', 'População 2022']].rename(columns={'Município': 'City'}),
+        on='City', how='inner'
+    )
+
+
+if __name__ == "__main__":
+    df_scores = add_theme_scores(load_ips(default_ips_path()))
+    engine = RollupEngine(df_scores, list(themes))
+
+    equal_weights = {score: 1 for score in themes}
+    df_uf = engine.rollup('UF', equal_weights, 'Overall Score')
+    df_region = engine.rollup('Region', equal_weights, 'Overall Score')
+
+    print(df_region.to_string(index=False))
+
+    # Remote Work Score only exists for the capitals in the ranking
+    df_remote = load_remote_work_scores(os.path.join(DATA_DIR, "ips_capitals.csv"),
+                                        os.path.join(NOTEBOOK_DIR, "ranked_analysis.csv"))
+    remote_engine = RollupEngine(df_remote, ['Remote Work Score'])
+    df_remote_region = remote_engine.rollup('Region')
+    print(df_remote_region.to_string(index=False))
+
+    df_uf.to_csv(os.path.join(DATA_DIR, "ips_rollup_uf.csv"), index=False, encoding="utf-8")
+    df_region.to_csv(os.path.join(DATA_DIR, "ips_rollup_region.csv"), index=False, encoding="utf-8")
+    df_remote_region.to_csv(os.path.join(DATA_DIR, "remote_work_rollup_region.csv"), index=False, encoding="utf-8")
+    print("Rollups saved to data/ips_rollup_uf.csv, data/ips_rollup_region.csv and data/remote_work_rollup_region.csv")
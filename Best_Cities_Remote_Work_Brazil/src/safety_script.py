@@ -1,16 +1,23 @@
-import pandas as pd
+import os
 
-# Read the Excel file without headers to handle merged cells
-df = pd.read_excel('C:/Users/samue/OneDrive/Documents/Data-Science-Studies/Best_Cities_Remote_Work_Brazil/src/mortes_por_capital.xlsx', sheet_name='Planilha1', header=None)
+from violence_series import extract_rates, trend_features
 
-# Filter rows where the UF (column 1) is not empty
-filtered = df[df[1].notna() & (df[1] != '')]
+# Stream the workbook and keep the rate of every year in the sheet
+df_long = extract_rates('mortes_por_capital.xlsx', sheet_name='Planilha1')
+df_trends = trend_features(df_long)
 
-# Select capital names (column 2) and 2023 Taxa (column 18)
-result = filtered[[2, 18]]
+latest_year = df_long['Year'].max()
+latest_col = f'Taxa_{latest_year}'
+latest_file = f'death_per_capital_{latest_year}.csv'
 
-# Rename columns and save to CSV
-result.columns = ['Capital', 'Taxa_2023']
-result.to_csv('death_per_capital_2023.csv', index=False)
+# Single-year file of the latest year (the scoring notebook reads the 2023 one)
+result = df_trends[['Capital', latest_col]]
+result.to_csv(latest_file, index=False)
 
-print("Data saved to 'death_per_capital_2023.csv'")
\ No newline at end of file
+# Long-format rates and trend features for the safety score
+os.makedirs("../data", exist_ok=True)
+df_long.to_csv('../data/death_rates_capitals_long.csv', index=False, encoding='utf-8')
+df_trends.to_csv('../data/death_rate_trends_capitals.csv', index=False, encoding='utf-8')
+
+print(f"Data saved to '{latest_file}' ({latest_col}), "
+      "'../data/death_rates_capitals_long.csv' and '../data/death_rate_trends_capitals.csv'")
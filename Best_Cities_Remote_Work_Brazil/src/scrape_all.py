@@ -19,6 +19,8 @@ import random
 import json
 from urllib.parse import quote
 
+from profiling import profiler
+
 
 class BrazilCapitalsCollector:
     def __init__(self):
@@ -71,6 +73,22 @@ class BrazilCapitalsCollector:
         # Sessão para manter cookies entre requisições
         self.session = requests.Session()
     
+    def _fetch(self, url):
+        """Faz a requisição HTTP, registrando tempo, bytes e erros no profiler."""
+        with profiler.stage("http"):
+            response = self.session.get(url, headers=self.headers, timeout=15)
+        profiler.count("requests")
+        profiler.count("bytes", len(response.content))
+        if response.status_code != 200:
+            profiler.count("http_errors")
+        return response
+
+    def _pause(self):
+        """Atraso aleatório entre requisições para evitar bloqueios."""
+        delay = random.uniform(3, 5)
+        profiler.count("sleep_s", delay)
+        time.sleep(delay)
+
     def format_city_for_url(self, city_name):
         """Formata o nome da cidade para uso em URLs."""
         formatted = city_name.replace(" ", "-")\
@@ -103,45 +121,46 @@ class BrazilCapitalsCollector:
         url = f'https://www.numbeo.com/cost-of-living/in/{city_url}-Brazil'
         
         try:
-            response = self.session.get(url, headers=self.headers, timeout=15)
+            response = self._fetch(url)
             if response.status_code != 200:
                 print(f"Erro ao acessar {url}: Status code {response.status_code}")
                 return None, None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Método 1: Buscar pelo índice na tabela
-            cost_index = None
-            rent_index = None
+            with profiler.stage("parse"):
+                soup = BeautifulSoup(response.text, 'html.parser')
             
-            # Procurar todas as tabelas
-            tables = soup.find_all('table')
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    row_text = row.text.strip()
-                    if "Cost of Living Index" in row_text:
-                        cells = row.find_all('td')
-                        if len(cells) >= 2:
-                            cost_index = self.extract_float_from_text(cells[1].text)
-                    elif "Rent Index" in row_text:
-                        cells = row.find_all('td')
-                        if len(cells) >= 2:
-                            rent_index = self.extract_float_from_text(cells[1].text)
+                # Método 1: Buscar pelo índice na tabela
+                cost_index = None
+                rent_index = None
             
-            # Método 2: Se o método 1 falhar, buscar por texto
-            if cost_index is None:
-                cost_pattern = re.compile(r'Cost of Living Index.*?(\d+\.\d+)')
-                cost_match = cost_pattern.search(response.text)
-                if cost_match:
-                    cost_index = float(cost_match.group(1))
+                # Procurar todas as tabelas
+                tables = soup.find_all('table')
+                for table in tables:
+                    rows = table.find_all('tr')
+                    for row in rows:
+                        row_text = row.text.strip()
+                        if "Cost of Living Index" in row_text:
+                            cells = row.find_all('td')
+                            if len(cells) >= 2:
+                                cost_index = self.extract_float_from_text(cells[1].text)
+                        elif "Rent Index" in row_text:
+                            cells = row.find_all('td')
+                            if len(cells) >= 2:
+                                rent_index = self.extract_float_from_text(cells[1].text)
             
-            if rent_index is None:
-                rent_pattern = re.compile(r'Rent Index.*?(\d+\.\d+)')
-                rent_match = rent_pattern.search(response.text)
-                if rent_match:
-                    rent_index = float(rent_match.group(1))
+                # Método 2: Se o método 1 falhar, buscar por texto
+                if cost_index is None:
+                    cost_pattern = re.compile(r'Cost of Living Index.*?(\d+\.\d+)')
+                    cost_match = cost_pattern.search(response.text)
+                    if cost_match:
+                        cost_index = float(cost_match.group(1))
             
+                if rent_index is None:
+                    rent_pattern = re.compile(r'Rent Index.*?(\d+\.\d+)')
+                    rent_match = rent_pattern.search(response.text)
+                    if rent_match:
+                        rent_index = float(rent_match.group(1))
+
             return cost_index, rent_index
             
         except Exception as e:
@@ -154,34 +173,35 @@ class BrazilCapitalsCollector:
         url = f'https://www.numbeo.com/crime/in/{city_url}-Brazil'
         
         try:
-            response = self.session.get(url, headers=self.headers, timeout=15)
+            response = self._fetch(url)
             if response.status_code != 200:
                 print(f"Erro ao acessar {url}: Status code {response.status_code}")
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Método 1: Buscar pelo índice na tabela
-            safety_index = None
+            with profiler.stage("parse"):
+                soup = BeautifulSoup(response.text, 'html.parser')
             
-            # Procurar todas as tabelas
-            tables = soup.find_all('table')
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    row_text = row.text.strip()
-                    if "Safety Index" in row_text:
-                        cells = row.find_all('td')
-                        if len(cells) >= 2:
-                            safety_index = self.extract_float_from_text(cells[1].text)
+                # Método 1: Buscar pelo índice na tabela
+                safety_index = None
             
-            # Método 2: Se o método 1 falhar, buscar por texto
-            if safety_index is None:
-                safety_pattern = re.compile(r'Safety Index.*?(\d+\.\d+)')
-                safety_match = safety_pattern.search(response.text)
-                if safety_match:
-                    safety_index = float(safety_match.group(1))
+                # Procurar todas as tabelas
+                tables = soup.find_all('table')
+                for table in tables:
+                    rows = table.find_all('tr')
+                    for row in rows:
+                        row_text = row.text.strip()
+                        if "Safety Index" in row_text:
+                            cells = row.find_all('td')
+                            if len(cells) >= 2:
+                                safety_index = self.extract_float_from_text(cells[1].text)
             
+                # Método 2: Se o método 1 falhar, buscar por texto
+                if safety_index is None:
+                    safety_pattern = re.compile(r'Safety Index.*?(\d+\.\d+)')
+                    safety_match = safety_pattern.search(response.text)
+                    if safety_match:
+                        safety_index = float(safety_match.group(1))
+
             return safety_index
             
         except Exception as e:
@@ -194,45 +214,46 @@ class BrazilCapitalsCollector:
         url = f'https://www.numbeo.com/quality-of-life/in/{city_url}-Brazil'
         
         try:
-            response = self.session.get(url, headers=self.headers, timeout=15)
+            response = self._fetch(url)
             if response.status_code != 200:
                 print(f"Erro ao acessar {url}: Status code {response.status_code}")
                 return None, None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Método 1: Buscar pelos índices na tabela
-            qol_index = None
-            transport_index = None
+            with profiler.stage("parse"):
+                soup = BeautifulSoup(response.text, 'html.parser')
             
-            # Procurar todas as tabelas
-            tables = soup.find_all('table')
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    row_text = row.text.strip()
-                    if "Quality of Life Index" in row_text:
-                        cells = row.find_all('td')
-                        if len(cells) >= 2:
-                            qol_index = self.extract_float_from_text(cells[1].text)
-                    elif "Traffic Commute Time Index" in row_text:
-                        cells = row.find_all('td')
-                        if len(cells) >= 2:
-                            transport_index = self.extract_float_from_text(cells[1].text)
+                # Método 1: Buscar pelos índices na tabela
+                qol_index = None
+                transport_index = None
             
-            # Método 2: Se o método 1 falhar, buscar por texto
-            if qol_index is None:
-                qol_pattern = re.compile(r'Quality of Life Index.*?(\d+\.\d+)')
-                qol_match = qol_pattern.search(response.text)
-                if qol_match:
-                    qol_index = float(qol_match.group(1))
+                # Procurar todas as tabelas
+                tables = soup.find_all('table')
+                for table in tables:
+                    rows = table.find_all('tr')
+                    for row in rows:
+                        row_text = row.text.strip()
+                        if "Quality of Life Index" in row_text:
+                            cells = row.find_all('td')
+                            if len(cells) >= 2:
+                                qol_index = self.extract_float_from_text(cells[1].text)
+                        elif "Traffic Commute Time Index" in row_text:
+                            cells = row.find_all('td')
+                            if len(cells) >= 2:
+                                transport_index = self.extract_float_from_text(cells[1].text)
             
-            if transport_index is None:
-                transport_pattern = re.compile(r'Traffic Commute Time Index.*?(\d+\.\d+)')
-                transport_match = transport_pattern.search(response.text)
-                if transport_match:
-                    transport_index = float(transport_match.group(1))
+                # Método 2: Se o método 1 falhar, buscar por texto
+                if qol_index is None:
+                    qol_pattern = re.compile(r'Quality of Life Index.*?(\d+\.\d+)')
+                    qol_match = qol_pattern.search(response.text)
+                    if qol_match:
+                        qol_index = float(qol_match.group(1))
             
+                if transport_index is None:
+                    transport_pattern = re.compile(r'Traffic Commute Time Index.*?(\d+\.\d+)')
+                    transport_match = transport_pattern.search(response.text)
+                    if transport_match:
+                        transport_index = float(transport_match.group(1))
+
             return qol_index, transport_index
             
         except Exception as e:
@@ -306,14 +327,14 @@ class BrazilCapitalsCollector:
             city_data['indice_aluguel'] = rent_index
             
             # Adicionar um atraso para evitar bloqueios
-            time.sleep(random.uniform(3, 5))
+            self._pause()
             
             # Coletar dados de segurança
             safety_index = self.get_safety_data(capital)
             city_data['indice_seguranca'] = safety_index
             
             # Adicionar um atraso para evitar bloqueios
-            time.sleep(random.uniform(3, 5))
+            self._pause()
             
             # Coletar dados de qualidade de vida
             qol_index, transport_index = self.get_quality_of_life_data(capital)
@@ -321,7 +342,7 @@ class BrazilCapitalsCollector:
             city_data['indice_transporte'] = transport_index
             
             # Adicionar um atraso para evitar bloqueios
-            time.sleep(random.uniform(3, 5))
+            self._pause()
             
             # Coletar dados simulados de coworking (baseados em estimativas)
             spaces_count, avg_price = self.get_coworking_data(capital)
@@ -330,6 +351,7 @@ class BrazilCapitalsCollector:
             
             # Adicionar os dados desta cidade à nossa coleção
             self.all_data.append(city_data)
+            profiler.count("cities")
             
             print(f"Dados coletados para {capital}:")
             print(f"  Custo de Vida: {cost_index}")
@@ -343,8 +365,10 @@ class BrazilCapitalsCollector:
     def save_to_csv(self, filename='dados_capitais_brasileiras.csv'):
         """Salva os dados coletados em um arquivo CSV."""
         if self.all_data:
-            df = pd.DataFrame(self.all_data)
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
+            with profiler.stage("save_csv"):
+                df = pd.DataFrame(self.all_data)
+                df.to_csv(filename, index=False, encoding='utf-8-sig')
+            profiler.count("rows", len(df))
             print(f"Dados salvos em {filename} - {len(self.all_data)} registros.")
         else:
             print("Nenhum dado para salvar.")
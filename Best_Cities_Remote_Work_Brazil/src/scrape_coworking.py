@@ -18,6 +18,8 @@ import re
 import json
 from urllib.parse import quote
 
+from price_extraction import extract_prices, page_text
+
 
 class BrazilCoworkingCollector:
     def __init__(self):
@@ -109,21 +111,9 @@ class BrazilCoworkingCollector:
                     estimated_spaces = max(1, int(int(results_count) * 0.01))
                     city_data['total_spaces'] = min(estimated_spaces, 150)  # Cap at reasonable number
             
-            # Look for pricing information in snippets
-            snippets = soup.find_all(['div', 'span', 'p'], string=re.compile(r'R\$|BRL|per month|por mês', re.IGNORECASE))
-            prices = []
-            
-            for snippet in snippets:
-                # Look for price patterns like R$500, R$ 500, 500 BRL, etc.
-                price_matches = re.findall(r'R\$\s*(\d+(?:\.\d+)?)', snippet.text)
-                if price_matches:
-                    for match in price_matches:
-                        try:
-                            price = float(match)
-                            if 100 <= price <= 5000:  # Reasonable price range for coworking in Brazil
-                                prices.append(price)
-                        except ValueError:
-                            continue
+            # Look for prices like R$500, R$ 1.200,00/mês, 45 reais por dia in one scan of the page text,
+            # normalized to monthly and kept in a reasonable range for coworking in Brazil
+            prices = extract_prices(page_text(response.text), min_monthly=100, max_monthly=5000)
             
             # Calculate price range if prices were found
             if prices:
@@ -164,20 +154,9 @@ class BrazilCoworkingCollector:
                 if match:
                     space_count = int(match.group(1))
             
-            # Try to find price ranges
-            prices = []
-            price_elements = soup.select('.price')
-            for price_el in price_elements:
-                price_text = price_el.text.strip()
-                # Extract numeric values from prices
-                match = re.search(r'(\d+)', price_text)
-                if match:
-                    try:
-                        price = int(match.group(1))
-                        if 100 <= price <= 5000:  # Reasonable price range
-                            prices.append(price)
-                    except ValueError:
-                        continue
+            # Try to find price ranges (monthly unless the element says otherwise)
+            price_text = "\n".join(price_el.text for price_el in soup.select('.price'))
+            prices = extract_prices(price_text, min_monthly=100, max_monthly=5000, bare_numbers=True)
             
             # Return the data
             return {
@@ -210,21 +189,11 @@ class BrazilCoworkingCollector:
             locations = soup.select('.location-card')
             space_count = len(locations) if locations else 0
             
-            # Try to find any pricing information
-            prices = []
-            price_elements = soup.select('.location-price')
-            for price_el in price_elements:
-                price_text = price_el.text.strip()
-                # Extract numeric values from prices
-                match = re.search(r'(\d+)', price_text)
-                if match:
-                    try:
-                        price = int(match.group(1))
-                        if 5 <= price <= 500:  # Reasonable daily price range
-                            # Convert to monthly price (assuming 20 working days)
-                            prices.append(price * 20)
-                    except ValueError:
-                        continue
+            # Try to find any pricing information: daily prices unless stated otherwise,
+            # converted to monthly (20 working days)
+            price_text = "\n".join(price_el.text for price_el in soup.select('.location-price'))
+            prices = extract_prices(price_text, default_period="day", min_monthly=100, max_monthly=10000,
+                                    bare_numbers=True)
             
             # Return the data
             return {
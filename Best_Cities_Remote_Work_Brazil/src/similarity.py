@@ -0,0 +1,106 @@
+"""
+"Cities like X" search over the IPS indicators.
+
+The indicator matrix is Min-Max scaled (lower-is-better indicators inverted),
+optionally weighted per theme, and loaded into a scikit-learn nearest-neighbour
+index once. Queries for a single city and the batch all-pairs top-k both run
+against that prebuilt index.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+
+from utils import themes, default_ips_path, indicator_columns, load_ips, scale_indicators
+
+
+class CitySimilarityIndex:
+    def __init__(self, df, metric='euclidean', theme_weights=None, feature_cols=None, name_col='Município'):
+        if metric not in ('euclidean', 'cosine'):
+            raise ValueError("metric must be 'euclidean' or 'cosine'")
+
+        self.metric = metric
+        self.feature_cols = feature_cols or indicator_columns(df)
+        self.names = df[name_col].reset_index(drop=True)
+        self._positions = pd.Series(np.arange(len(self.names)), index=self.names)
+
+        # Scale, then fill gaps with the column median so every city can be indexed
+        scaled = scale_indicators(df, self.feature_cols)
+        scaled = scaled.fillna(scaled.median()).fillna(0)
+        matrix = scaled.to_numpy(dtype=float)
+
+        # Weighting by sqrt(w) makes squared distances weighted by w
+        if theme_weights:
+            matrix = matrix * np.sqrt(self._column_weights(theme_weights))
+
+        # On unit vectors Euclidean order equals cosine order, so one tree serves both
+        if metric == 'cosine':
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1, norms)
+
+        self.matrix = matrix
+        self.index = NearestNeighbors(algorithm='auto').fit(matrix)
+
+    def _column_weights(self, theme_weights):
+        """Weight per feature column: the largest weight of the themes it belongs to, 1 otherwise."""
+        weights = np.ones(len(self.feature_cols))
+        for i, col in enumerate(self.feature_cols):
+            matched = [w for theme, w in theme_weights.items() if col in themes[theme]]
+            if matched:
+                weights[i] = max(matched)
+        return weights
+
+    def _to_distance(self, dist):
+        # Chord length on the unit sphere -> cosine distance
+        if self.metric == 'cosine':
+            return dist ** 2 / 2
+        return dist
+
+    def most_similar(self, city, k=10):
+        """Return the k cities most similar to the given one (the city itself excluded)."""
+        if city not in self._positions.index:
+            raise KeyError(f"City '{city}' not found in the index")
+
+        pos = self._positions[city]
+        if np.ndim(pos):
+            pos = pos.iloc[0]
+
+        dist, idx = self.index.kneighbors(self.matrix[pos:pos + 1], n_neighbors=min(k + 1, len(self.names)))
+        keep = idx[0] != pos
+        return pd.DataFrame({
+            'City': self.names.iloc[idx[0][keep]].to_numpy()[:k],
+            'Distance': self._to_distance(dist[0][keep])[:k]
+        })
+
+    def all_pairs_top_k(self, k=5):
+        """Top-k neighbours for every city in one batch query, as a long table."""
+        k = min(k, len(self.names) - 1)
+        dist, idx = self.index.kneighbors(self.matrix, n_neighbors=k + 1)
+
+        # Drop the self match from each row (usually column 0, but ties can reorder it)
+        rows = np.arange(len(self.names))[:, None]
+        not_self = idx != rows
+        not_self[not_self.sum(axis=1) > k, -1] = False
+        idx = idx[not_self].reshape(len(self.names), k)
+        dist = dist[not_self].reshape(len(self.names), k)
+
+        return pd.DataFrame({
+            'City': np.repeat(self.names.to_numpy(), k),
+            'Neighbour Rank': np.tile(np.arange(1, k + 1), len(self.names)),
+            'Similar City': self.names.to_numpy()[idx.ravel()],
+            'Distance': self._to_distance(dist.ravel())
+        })
+
+
+if __name__ == "__main__":
+    df_ips = load_ips(default_ips_path())
+
+    index = CitySimilarityIndex(df_ips, metric='euclidean')
+    print("Cities most similar to Goiânia:")
+    print(index.most_similar(df_ips.loc[df_ips['CityName'] == 'Goiânia', 'Município'].iloc[0], k=5).to_string(index=False))
+
+    # Same query giving more importance to safety and internet
+    weighted_index = CitySimilarityIndex(df_ips, metric='cosine',
+                                         theme_weights={'Safety Score': 3, 'Internet Score': 2})
+    print("\nCities most similar to Goiânia (cosine, safety and internet weighted):")
+    print(weighted_index.most_similar(df_ips.loc[df_ips['CityName'] == 'Goiânia', 'Município'].iloc[0], k=5).to_string(index=False))
@@ -0,0 +1,179 @@
+"""
+Synthetic datasets at configurable scale, shaped like the real inputs.
+
+- IPS: a municipal table with the columns of data/ips_capitals.csv. The 27
+  capitals come first, followed by generated municipalities spread over the
+  UFs in proportion to the real municipality counts. Indicators are drawn
+  from the capitals' empirical covariance, so correlated themes stay
+  correlated.
+- INMET: multi-year hourly station exports in the BDMEP layout read by
+  climate_analysis.py. Temperature, rain days and wind follow the monthly
+  profile of the station's real export in data/climate_data, with daily
+  cycles, noise and a share of "null" readings.
+
+Generation is seeded, so the same scale always produces the same files.
+
+Usage:
+    python synthetic_data.py ips --rows 55700
+    python synthetic_data.py inmet --years 5
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from climate_analysis import cities
+from utils import DATA_DIR
+
+SYNTHETIC_DIR = os.path.join(DATA_DIR, "synthetic")
+
+# Municipalities per UF (IBGE, 5,570 in total)
+municipalities_per_uf = {
+    "AC": 22, "AL": 102, "AP": 16, "AM": 62, "BA": 417, "CE": 184, "DF": 1, "ES": 78, "GO": 246,
+    "MA": 217, "MT": 141, "MS": 79, "MG": 853, "PA": 144, "PB": 223, "PR": 399, "PE": 185, "PI": 224,
+    "RJ": 92, "RN": 167, "RS": 497, "RO": 52, "RR": 15, "SC": 295, "SP": 645, "SE": 75, "TO": 139
+}
+
+
+def synthetic_ips(n_rows=5_570, template_path=os.path.join(DATA_DIR, "ips_capitals.csv"), seed=0):
+    """IPS table with n_rows municipalities (the capitals included)."""
+    rng = np.random.default_rng(seed)
+    template = pd.read_csv(template_path, encoding="utf-8")
+    capitals = template.assign(Município=template['Município'] + " (" + template['UF'] + ")")
+    n_new = max(n_rows - len(capitals), 0)
+
+    ufs = np.array(list(municipalities_per_uf))
+    weights = np.array(list(municipalities_per_uf.values()), dtype=float)
+    new = pd.DataFrame({
+        'Código IBGE': 9_000_000 + np.arange(n_new),
+        'Município': [f"Município {i:06d}" for i in range(n_new)],
+        'UF': rng.choice(ufs, size=n_new, p=weights / weights.sum()),
+    })
+    new['Município'] = new['Município'] + " (" + new['UF'] + ")"
+
+    # Small towns dominate: log-normal population around ~12k inhabitants
+    new['População 2022'] = np.maximum(np.round(rng.lognormal(9.4, 1.1, n_new)), 800).astype(int)
+
+    # Indicators: mean + random combination of the centered capitals (empirical covariance)
+    cols = [col for col in template.select_dtypes('number').columns
+            if col not in ('Código IBGE', 'População 2022')]
+    values = template[cols].to_numpy(dtype=float)
+    centered = values - values.mean(axis=0)
+    draws = values.mean(axis=0) + rng.standard_normal((n_new, len(values))) @ centered / np.sqrt(len(values) - 1)
+
+    # Keep every indicator within the capitals' range widened by one standard deviation
+    spread = values.std(axis=0)
+    low = np.where(values.min(axis=0) >= 0, np.maximum(values.min(axis=0) - spread, 0), values.min(axis=0) - spread)
+    new[cols] = np.clip(draws, low, values.max(axis=0) + spread)
+
+    return pd.concat([capitals, new[template.columns]], ignore_index=True)
+
+
+def station_profile(city, climate_dir=os.path.join(DATA_DIR, "climate_data")):
+    """Header lines and monthly (temperature, rain days, wind) profile from the real export."""
+    header = {"Nome": city.replace("_", " ").upper(), "Codigo Estacao": "A000",
+              "Latitude": "-15.0", "Longitude": "-47.0", "Altitude": "500"}
+    profile = pd.DataFrame({"temperature": 26.0, "rain_days": 10.0, "wind": 2.0}, index=range(1, 13))
+
+    file_path = os.path.join(climate_dir, f"data_{city}.csv")
+    if os.path.exists(file_path):
+        with open(file_path, encoding="utf-8") as f:
+            for data_start_index, line in enumerate(f):
+                if line.startswith("Data Medicao"):
+                    break
+                key, _, value = line.partition(":")
+                if key in header:
+                    header[key] = value.strip()
+        monthly = pd.read_csv(file_path, skiprows=data_start_index, sep=';', na_values=['null'], usecols=range(4))
+        monthly.columns = ["Date", "rain_days", "temperature", "wind"]
+        monthly = monthly.groupby(pd.to_datetime(monthly["Date"]).dt.month)[["temperature", "rain_days", "wind"]].mean()
+        profile = monthly.reindex(profile.index).fillna(monthly.mean()).fillna(profile)
+    return header, profile
+
+
+def synthetic_station(city, years=1, start_year=2000, missing=0.01, seed=0):
+    """Hourly readings of one station as a DataFrame with the BDMEP hourly columns."""
+    rng = np.random.default_rng([seed, sum(city.encode())])
+    _, profile = station_profile(city)
+
+    hours = pd.date_range(f"{start_year}-01-01", f"{start_year + years}-01-01", freq="h", inclusive="left")
+    days = hours.normalize()
+    month = hours.month.to_numpy()
+
+    # Daily cycle peaking around 18 UTC (15h local), plus noise
+    temperature = (profile["temperature"].to_numpy()[month - 1]
+                   + 4.0 * np.sin(2 * np.pi * (hours.hour.to_numpy() - 12) / 24)
+                   + rng.normal(0, 1.0, len(hours)))
+
+    # Rainy days drawn from the monthly rain-day frequency; rain falls in a few hours of the day
+    day_index, unique_days = pd.factorize(days)
+    rain_probability = profile["rain_days"].to_numpy()[unique_days.month - 1] / unique_days.days_in_month
+    rainy_day = rng.random(len(unique_days)) < rain_probability
+    rainy_hour = rainy_day[day_index] & (rng.random(len(hours)) < 0.2)
+    precipitation = np.where(rainy_hour, rng.exponential(2.5, len(hours)), 0.0)
+
+    wind = rng.gamma(4.0, profile["wind"].to_numpy()[month - 1] / 4.0)
+
+    data = pd.DataFrame({
+        "Data Medicao": hours.strftime("%Y-%m-%d"),
+        "Hora Medicao": hours.strftime("%H00"),
+        "PRECIPITACAO TOTAL, HORARIO(mm)": precipitation.round(1),
+        "TEMPERATURA DO AR - BULBO SECO, HORARIA(°C)": temperature.round(1),
+        "VENTO, VELOCIDADE HORARIA(m/s)": wind.round(1),
+    })
+    readings = data.columns[2:]
+    data[readings] = data[readings].mask(rng.random((len(data), len(readings))) < missing)
+    # The exports end every line with a separator
+    data[""] = ""
+    return data
+
+
+def write_station(city, out_dir, years=1, start_year=2000, seed=0):
+    """Write data_<city>.csv in the BDMEP hourly layout and return its path."""
+    header, _ = station_profile(city)
+    data = synthetic_station(city, years, start_year, seed=seed)
+
+    file_path = os.path.join(out_dir, f"data_{city}.csv")
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        for key, value in header.items():
+            f.write(f"{key}: {value}\n")
+        f.write("Situacao: Operante\n")
+        f.write(f"Data Inicial: {start_year}-01-01\n")
+        f.write(f"Data Final: {start_year + years - 1}-12-31\n")
+        f.write("Periodicidade da Medicao: Horaria\n\n")
+        data.to_csv(f, sep=";", index=False, na_rep="null", lineterminator="\n")
+    return file_path
+
+
+def write_ips(n_rows, out_dir, seed=0):
+    """Write the synthetic IPS table to out_dir and return its path."""
+    os.makedirs(out_dir, exist_ok=True)
+    file_path = os.path.join(out_dir, "ips_brasil_municipios.csv")
+    synthetic_ips(n_rows, seed=seed).to_csv(file_path, index=False, encoding="utf-8")
+    return file_path
+
+
+def write_inmet(years, out_dir, stations=cities, seed=0):
+    """Write one hourly export per station to out_dir and return the directory."""
+    os.makedirs(out_dir, exist_ok=True)
+    for city in stations:
+        write_station(city, out_dir, years, seed=seed)
+    return out_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic IPS and INMET datasets")
+    parser.add_argument("dataset", choices=["ips", "inmet"])
+    parser.add_argument("--rows", type=int, default=5_570, help="municipalities in the IPS table")
+    parser.add_argument("--years", type=int, default=1, help="years of hourly readings per station")
+    parser.add_argument("--out", default=SYNTHETIC_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.dataset == "ips":
+        print(f"Saved {write_ips(args.rows, args.out, args.seed)}")
+    else:
+        out_dir = write_inmet(args.years, os.path.join(args.out, "climate_data"), seed=args.seed)
+        print(f"Saved {len(cities)} hourly station files to {out_dir}")
@@ -0,0 +1,160 @@
+"""
+Shared definitions for the remote work analysis scripts.
+
+The IPS theme columns, the indicators where lower is better and the
+capital/region lookups used to live only inside the notebooks. They are
+kept here so the scripts in src/ compute exactly the same scores.
+"""
+
+import os
+import re
+
+import pandas as pd
+
+DATA_DIR = "../data"
+NOTEBOOK_DIR = "../notebook"
+
+# Brazilian state capitals with their UF
+capitals_uf = {
+    "Rio Branco": "AC", "Maceió": "AL", "Macapá": "AP", "Manaus": "AM", "Salvador": "BA",
+    "Fortaleza": "CE", "Brasília": "DF", "Vitória": "ES", "Goiânia": "GO", "São Luís": "MA",
+    "Cuiabá": "MT", "Campo Grande": "MS", "Belo Horizonte": "MG", "Belém": "PA",
+    "João Pessoa": "PB", "Curitiba": "PR", "Recife": "PE", "Teresina": "PI",
+    "Rio de Janeiro": "RJ", "Natal": "RN", "Porto Alegre": "RS", "Porto Velho": "RO",
+    "Boa Vista": "RR", "Florianópolis": "SC", "São Paulo": "SP", "Aracaju": "SE", "Palmas": "TO"
+}
+
+# Latitude and longitude of the capitals (city centre)
+capital_coords = {
+    "Rio Branco": (-9.9747, -67.8100), "Maceió": (-9.6658, -35.7350), "Macapá": (0.0349, -51.0694),
+    "Manaus": (-3.1190, -60.0217), "Salvador": (-12.9777, -38.5016), "Fortaleza": (-3.7319, -38.5267),
+    "Brasília": (-15.7942, -47.8826), "Vitória": (-20.3155, -40.3128), "Goiânia": (-16.6869, -49.2648),
+    "São Luís": (-2.5307, -44.3068), "Cuiabá": (-15.6014, -56.0979), "Campo Grande": (-20.4697, -54.6201),
+    "Belo Horizonte": (-19.9167, -43.9345), "Belém": (-1.4558, -48.4902), "João Pessoa": (-7.1195, -34.8450),
+    "Curitiba": (-25.4284, -49.2733), "Recife": (-8.0476, -34.8770), "Teresina": (-5.0919, -42.8034),
+    "Rio de Janeiro": (-22.9068, -43.1729), "Natal": (-5.7945, -35.2110), "Porto Alegre": (-30.0346, -51.2177),
+    "Porto Velho": (-8.7612, -63.9004), "Boa Vista": (2.8235, -60.6758), "Florianópolis": (-27.5954, -48.5480),
+    "São Paulo": (-23.5505, -46.6333), "Aracaju": (-10.9472, -37.0731), "Palmas": (-10.2491, -48.3243)
+}
+
+# IBGE macro-regions
+uf_region = {
+    "AC": "Norte", "AP": "Norte", "AM": "Norte", "PA": "Norte", "RO": "Norte", "RR": "Norte", "TO": "Norte",
+    "AL": "Nordeste", "BA": "Nordeste", "CE": "Nordeste", "MA": "Nordeste", "PB": "Nordeste",
+    "PE": "Nordeste", "PI": "Nordeste", "RN": "Nordeste", "SE": "Nordeste",
+    "DF": "Centro-Oeste", "GO": "Centro-Oeste", "MT": "Centro-Oeste", "MS": "Centro-Oeste",
+    "ES": "Sudeste", "MG": "Sudeste", "RJ": "Sudeste", "SP": "Sudeste",
+    "PR": "Sul", "RS": "Sul", "SC": "Sul"
+}
+
+# Indicator columns by theme (same as ips_analysis.ipynb)
+transport_cols = [
+    'Mortes por Acidente de Transporte', 'Densidade de Internet Banda Larga Fixa',
+    'Cobertura de Internet Móvel (4G/5G)', 'Áreas Verdes Urbanas',
+    'Emissões de CO₂ por Habitante'
+]
+
+health_cols = [
+    'Expectativa de Vida', 'Obesidade',
+    'Mortalidade por Doenças Crônicas Não Transmissíveis',
+    'Mortalidade Infantil até 5 Anos', 'Subnutrição',
+    'Cobertura Vacinal (Poliomielite)', 'Hospitalizações por Condições Sensíveis à Atenção Primária'
+]
+
+safety_cols = [
+    'Segurança Pessoal', 'Assassinatos de Jovens', 'Assassinatos de Mulheres',
+    'Homicídios', 'Violência contra Mulheres', 'Violência contra Negros',
+    'Violência contra Indígenas', 'Suicídios'
+]
+
+quality_life_cols = [
+    'Índice de Progresso Social', 'Necessidades Humanas Básicas',
+    'Fundamentos do Bem-estar', 'Oportunidades', 'Qualidade do Meio Ambiente',
+    'Direitos Individuais', 'Liberdades Individuais e de Escolha',
+    'Acesso à Cultura, Lazer e Esporte'
+]
+
+internet_cols = [
+    'Cobertura de Internet Móvel (4G/5G)',
+    'Densidade de Internet Banda Larga Fixa',
+    'Densidade de Telefonia Móvel',
+    'Qualidade de Internet Móvel'
+]
+
+themes = {
+    'Transport Score': transport_cols,
+    'Health Score': health_cols,
+    'Safety Score': safety_cols,
+    'Quality of Life Score': quality_life_cols,
+    'Internet Score': internet_cols
+}
+
+# Indicators where lower values are better
+invert_cols = [
+    'Mortes por Acidente de Transporte', 'Assassinatos de Jovens',
+    'Assassinatos de Mulheres', 'Homicídios', 'Suicídios',
+    'Mortalidade por Doenças Crônicas Não Transmissíveis',
+    'Mortalidade Infantil até 5 Anos', 'Subnutrição',
+    'Hospitalizações por Condições Sensíveis à Atenção Primária',
+    'Violência contra Mulheres', 'Violência contra Negros',
+    'Violência contra Indígenas', 'Emissões de CO₂ por Habitante'
+]
+
+
+def theme_columns():
+    """Return the unique indicator columns used by the thematic scores, in a stable order."""
+    return list(dict.fromkeys(col for cols in themes.values() for col in cols))
+
+
+def indicator_columns(df):
+    """Return every numeric IPS indicator column (excludes the IBGE code, area, population and GDP)."""
+    skip = {'Código IBGE', 'Área (km²)', 'População 2022', 'PIB per capita 2021'}
+    return [col for col in df.select_dtypes('number').columns if col not in skip]
+
+
+def default_ips_path():
+    """Full municipal IPS table when it was downloaded, otherwise the capitals subset."""
+    ips_path = os.path.join(DATA_DIR, "ips_brasil_municipios.csv")
+    if not os.path.exists(ips_path):
+        ips_path = os.path.join(DATA_DIR, "ips_capitals.csv")
+    return ips_path
+
+
+def latest_death_rates(data_dir=DATA_DIR):
+    """(file name, rate column) of the newest death_per_capital_<year>.csv from safety_script.py, or None."""
+    if not os.path.isdir(data_dir):
+        return None
+    years = [int(match.group(1)) for name in os.listdir(data_dir)
+             for match in [re.fullmatch(r"death_per_capital_(\d{4})\.csv", name)] if match]
+    if not years:
+        return None
+    return f"death_per_capital_{max(years)}.csv", f"Taxa_{max(years)}"
+
+
+def load_ips(file_path):
+    """Load an IPS table and add the CityName column without the "(UF)" suffix."""
+    df = pd.read_csv(file_path, encoding="utf-8")
+    df['CityName'] = df['Município'].str.extract(r'^(.+?)\s*\(')[0].fillna(df['Município']).str.strip()
+    return df
+
+
+def scale_indicators(df, cols):
+    """Min-Max scale the given columns to 0-1, inverting the indicators where lower is better."""
+    values = df[cols].astype(float)
+    col_min = values.min()
+    col_range = (values.max() - col_min).replace(0, 1)
+    scaled = (values - col_min) / col_range
+    inverted = [col for col in cols if col in invert_cols]
+    scaled[inverted] = 1 - scaled[inverted]
+    return scaled
+
+
+def add_theme_scores(df):
+    """Return a copy of df with the scaled indicators and the five thematic scores plus Overall Score."""
+    cols = theme_columns()
+    df_scaled = df.copy()
+    df_scaled[cols] = scale_indicators(df, cols)
+    for score, score_cols in themes.items():
+        df_scaled[score] = df_scaled[score_cols].mean(axis=1)
+    df_scaled['Overall Score'] = df_scaled[list(themes)].mean(axis=1)
+    return df_scaled
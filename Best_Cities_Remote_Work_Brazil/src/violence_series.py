@@ -0,0 +1,139 @@
+"""
+Multi-year violent death rates from the Fórum de Segurança workbook.
+
+The workbook is streamed row by row in read-only mode. The header row with the
+years is detected automatically and the columns under the "Taxa" label are kept,
+so every year present in the sheet ends up in a long (Capital, UF, Year, Taxa)
+table instead of only the hard-coded 2023 column.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from utils import capitals_uf
+
+YEAR_PATTERN = re.compile(r'^\s*((?:19|20)\d{2})\b')
+FOOTNOTE_PATTERN = re.compile(r'\s*\(\d+\)\s*$')
+uf_capital = {uf: capital for capital, uf in capitals_uf.items()}
+
+
+def parse_year(cell):
+    """Return the year in a header cell like 2023 or '2022 (4)', otherwise None."""
+    if isinstance(cell, (int, float)) and not isinstance(cell, bool) and 1900 <= cell <= 2100:
+        return int(cell)
+    if isinstance(cell, str):
+        match = YEAR_PATTERN.match(cell)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def clean_capital(capital, uf):
+    """Drop footnote markers like 'Recife (5)' and fill '-' (Distrito Federal) from the UF."""
+    capital = FOOTNOTE_PATTERN.sub('', str(capital)).strip()
+    if capital in ('', '-'):
+        capital = uf_capital.get(uf, capital)
+    return capital
+
+
+def find_rate_columns(header_rows, year_row, rate_label='Taxa'):
+    """
+    Map column index -> year for the rate block.
+
+    The block starts at the column labelled rate_label in one of the header rows
+    and runs while the year row keeps having years. Without a label, the last
+    block of year columns is used.
+    """
+    years = [parse_year(cell) for cell in year_row]
+
+    start = None
+    for row in header_rows:
+        for i, cell in enumerate(row):
+            if isinstance(cell, str) and cell.strip().startswith(rate_label):
+                start = i
+    if start is None:
+        start = max(i for i, year in enumerate(years) if year is not None)
+        while start > 0 and years[start - 1] is not None and years[start - 1] < years[start]:
+            start -= 1
+
+    columns = {}
+    for i in range(start, len(years)):
+        if years[i] is None:
+            break
+        columns[i] = years[i]
+    return columns
+
+
+def iter_rates(file_path, sheet_name=None, uf_col=1, capital_col=2, max_header_rows=20):
+    """Yield (Capital, UF, Year, Taxa) tuples while streaming the sheet."""
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        header_rows = []
+        rate_columns = None
+
+        for row in ws.iter_rows(values_only=True):
+            if rate_columns is None:
+                # Still in the header: look for the row with at least two years
+                if sum(parse_year(cell) is not None for cell in row) >= 2:
+                    rate_columns = find_rate_columns(header_rows, row)
+                else:
+                    header_rows = (header_rows + [row])[-max_header_rows:]
+                continue
+
+            uf = row[uf_col] if len(row) > uf_col else None
+            capital = row[capital_col] if len(row) > capital_col else None
+            if not uf or not capital:
+                continue
+
+            uf = str(uf).strip()
+            capital = clean_capital(capital, uf)
+            for col, year in rate_columns.items():
+                value = row[col] if len(row) > col else None
+                rate = value if isinstance(value, (int, float)) else np.nan
+                yield capital, uf, year, rate
+    finally:
+        wb.close()
+
+
+def extract_rates(file_path, sheet_name=None):
+    """Long-format table with one row per capital and year."""
+    return pd.DataFrame(iter_rates(file_path, sheet_name), columns=['Capital', 'UF', 'Year', 'Taxa'])
+
+
+def trend_features(df_long):
+    """
+    Vectorized trend features per capital: least-squares slope of the rate per
+    year, last year-over-year change (absolute and %) and volatility (std of the rates).
+    """
+    wide = df_long.pivot_table(index=['Capital', 'UF'], columns='Year', values='Taxa', aggfunc='mean', sort=False)
+    wide = wide.sort_index(axis=1)
+    rates = wide.to_numpy(dtype=float)
+    years = wide.columns.to_numpy(dtype=float)
+
+    # Slope with missing years masked out
+    mask = ~np.isnan(rates)
+    n = mask.sum(axis=1)
+    x = np.where(mask, years, 0.0)
+    y = np.where(mask, rates, 0.0)
+    x_mean = x.sum(axis=1) / np.maximum(n, 1)
+    y_mean = y.sum(axis=1) / np.maximum(n, 1)
+    dx = np.where(mask, years - x_mean[:, None], 0.0)
+    dy = np.where(mask, rates - y_mean[:, None], 0.0)
+    denominator = (dx ** 2).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = np.where(denominator > 0, (dx * dy).sum(axis=1) / denominator, np.nan)
+
+    features = pd.DataFrame(index=wide.index)
+    features['Taxa_Slope'] = slope
+    if rates.shape[1] >= 2:
+        last, previous = rates[:, -1], rates[:, -2]
+        features['Taxa_YoY_Change'] = last - previous
+        with np.errstate(invalid='ignore', divide='ignore'):
+            features['Taxa_YoY_Pct'] = (last - previous) / previous * 100
+    features['Taxa_Volatility'] = wide.std(axis=1, ddof=1).to_numpy()
+    features[f'Taxa_{int(years[-1])}'] = rates[:, -1]
+    return features.reset_index()
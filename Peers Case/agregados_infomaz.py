@@ -0,0 +1,155 @@
+"""
+Agregados mensais materializados das vendas, mantidos de forma incremental.
+
+Para (categoria, mês), (produto, mês) e (cliente, mês) são guardadas somas e
+contagens (valor da nota, valor e quantidade dos itens, margem e número de
+itens com margem). Cada atualização processa apenas as linhas novas da aba
+"Transações Vendas" e soma os parciais do lote aos agregados existentes; as
+médias das questões saem de soma / contagem.
+
+A conferência antes de cada atualização não relê o histórico: compara o número
+de linhas e o hash das últimas JANELA_VERIFICACAO linhas já processadas, e a
+assinatura dos cadastros cobre só o que os agregados usam (categoria e estoque
+dos produtos já agregados, posições de estoque até a última venda processada).
+Uma nova posição diária de estoque não invalida nada; se algo coberto mudar, os
+agregados são refeitos a partir do histórico completo.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from base_infomaz import DIRETORIO_CACHE, carregar_planilhas, construir_fato
+
+DIRETORIO_AGREGADOS = os.path.join(DIRETORIO_CACHE, "agregados")
+
+# Nível do agregado -> chave agrupada junto com o mês
+NIVEIS = {"categoria": "CATEGORIA", "produto": "ID PRODUTO", "cliente": "ID CLIENTE"}
+
+MEDIDAS = ["VALOR NOTA", "VALOR ITEM", "QTD ITEM", "N_ITENS", "MARGEM", "N_MARGEM"]
+
+# Entra na assinatura: mudar o cálculo da tabela fato (ex.: custo da margem) refaz os agregados
+VERSAO = 3
+
+# Últimas linhas processadas conferidas por hash antes de aplicar um lote novo
+JANELA_VERIFICACAO = 1000
+
+
+# Hash do conteúdo de uma ou mais tabelas
+def hash_tabelas(*tabelas):
+    h = hashlib.sha256()
+    for tabela in tabelas:
+        h.update(pd.util.hash_pandas_object(tabela, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+# Somas e contagens de um lote da tabela fato, por nível e mês
+def agregar_lote(fato_lote):
+    base = fato_lote.assign(
+        N_ITENS=1,
+        N_MARGEM=fato_lote["MARGEM"].notna().astype("int64"),
+        MARGEM=fato_lote["MARGEM"].fillna(0.0),
+    )
+    parciais = {}
+    for nivel, chave in NIVEIS.items():
+        parcial = base.groupby([chave, "MES_ANO"], observed=True)[MEDIDAS].sum()
+        # Categorias viram texto, como nos agregados lidos do disco
+        if isinstance(parcial.index.levels[0], pd.CategoricalIndex):
+            parcial.index = parcial.index.set_levels(parcial.index.levels[0].astype(str), level=0)
+        parciais[nivel] = parcial
+    return parciais
+
+
+# Com diretorio=None os agregados ficam só em memória (ex.: redução dos parciais de chunks)
+class AgregadosMensais:
+    def __init__(self, diretorio=DIRETORIO_AGREGADOS):
+        self.diretorio = diretorio
+        self.arquivo_estado = os.path.join(diretorio, "estado.json") if diretorio else None
+        self.estado = {"linhas": 0, "cauda": None, "data_max": None, "assinatura": None}
+        self.tabelas = {}
+        if self.arquivo_estado and os.path.exists(self.arquivo_estado):
+            with open(self.arquivo_estado, encoding="utf-8") as f:
+                self.estado = json.load(f)
+            for nivel, chave in NIVEIS.items():
+                df = pd.read_csv(os.path.join(diretorio, f"{nivel}.csv"), encoding="utf-8")
+                df["MES_ANO"] = pd.PeriodIndex(df["MES_ANO"], freq="M")
+                self.tabelas[nivel] = df.set_index([chave, "MES_ANO"])
+
+    def _salvar(self):
+        if not self.diretorio:
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        for nivel, df in self.tabelas.items():
+            df.reset_index().to_csv(os.path.join(self.diretorio, f"{nivel}.csv"), index=False, encoding="utf-8")
+        with open(self.arquivo_estado, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, ensure_ascii=False, indent=2)
+
+    # Hash das linhas conferidas: as últimas JANELA_VERIFICACAO antes da posição linhas
+    @staticmethod
+    def _hash_cauda(transacoes_df, linhas):
+        return hash_tabelas(transacoes_df.iloc[max(linhas - JANELA_VERIFICACAO, 0):linhas])
+
+    # Assinatura do que os agregados já somados usam dos cadastros: categoria e estoque dos
+    # produtos agregados e as posições desses estoques até a última venda processada
+    # (o cliente vem da própria transação, então o cadastro de clientes não entra)
+    def _assinatura(self, produtos_df, estoque_df):
+        produtos = produtos_df[["ID PRODUTO", "ID ESTOQUE", "CATEGORIA"]]
+        if "produto" in self.tabelas:
+            produtos = produtos[produtos["ID PRODUTO"].isin(self.tabelas["produto"].index.get_level_values(0))]
+        estoque = estoque_df[["ID ESTOQUE", "DATA ESTOQUE", "VALOR UNITARIO"]]
+        estoque = estoque[estoque["ID ESTOQUE"].isin(produtos["ID ESTOQUE"])]
+        if self.estado["data_max"]:
+            estoque = estoque[estoque["DATA ESTOQUE"] <= pd.Timestamp(self.estado["data_max"])]
+        return f"v{VERSAO}-{hash_tabelas(produtos, estoque)}"
+
+    # As linhas já processadas continuam iguais? (contagem e cauda, sem reler o histórico)
+    def _historico_intacto(self, transacoes_df, produtos_df, estoque_df):
+        linhas = self.estado["linhas"]
+        if linhas > len(transacoes_df) or self.estado["assinatura"] != self._assinatura(produtos_df, estoque_df):
+            return False
+        return linhas == 0 or self._hash_cauda(transacoes_df, linhas) == self.estado.get("cauda")
+
+    # Aplica apenas as transações novas. Retorna o número de linhas processadas.
+    def atualizar(self, transacoes_df, produtos_df, clientes_df, estoque_df):
+        if not self.tabelas or not self._historico_intacto(transacoes_df, produtos_df, estoque_df):
+            self.tabelas = {}
+            self.estado = {"linhas": 0, "cauda": None, "data_max": None, "assinatura": None}
+
+        lote = transacoes_df.iloc[self.estado["linhas"]:]
+        if len(lote) == 0:
+            return 0
+
+        self.somar(agregar_lote(construir_fato(lote, produtos_df, clientes_df, estoque_df)))
+        data_max = lote["DATA NOTA"].max()
+        if self.estado["data_max"]:
+            data_max = max(data_max, pd.Timestamp(self.estado["data_max"]))
+        self.estado["linhas"] = len(transacoes_df)
+        self.estado["cauda"] = self._hash_cauda(transacoes_df, len(transacoes_df))
+        self.estado["data_max"] = None if pd.isna(data_max) else data_max.isoformat()
+        self.estado["assinatura"] = self._assinatura(produtos_df, estoque_df)
+        self._salvar()
+        return len(lote)
+
+    # Soma parciais (saída de agregar_lote) aos agregados
+    def somar(self, parciais):
+        for nivel, parcial in parciais.items():
+            if nivel in self.tabelas:
+                parcial = pd.concat([self.tabelas[nivel], parcial]).groupby(level=[0, 1]).sum()
+            self.tabelas[nivel] = parcial
+
+    # Agregado de um nível com as chaves como colunas
+    def tabela(self, nivel):
+        return self.tabelas[nivel].reset_index()
+
+
+if __name__ == "__main__":
+    planilhas = carregar_planilhas()
+    estoque_df = planilhas["Cadastro de Estoque"]
+    estoque_df["VALOR UNITARIO"] = estoque_df["VALOR ESTOQUE"] / estoque_df["QTD ESTOQUE"]
+
+    agregados = AgregadosMensais()
+    novas = agregados.atualizar(planilhas["Transações Vendas"], planilhas["Cadastro Produtos"],
+                                planilhas["Cadastro Clientes"], estoque_df)
+    print(f"{novas} transações novas aplicadas ({agregados.estado['linhas']} no total).")
@@ -1,35 +1,541 @@
+# matplotlib, seaborn, reportlab e PIL são importados só nas funções de gráfico e PDF,
+# então --listar, --sem-relatorio e o backend SQL não pagam o custo dessas importações
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+import hashlib
+import json
 import os
-
-# Configurações iniciais
-sns.set_theme(style="whitegrid")
-plt.style.use('ggplot')
-
-# Função para carregar uma tabela do CSV
-def carregar_tabela(nome_arquivo):
-    df = pd.read_csv(nome_arquivo)
-    return [list(df.columns)] + df.values.tolist()
-
-# Função para formatar a tabela no PDF
+import sys
+import threading
+import time
+import tracemalloc
+from base_infomaz import DIRETORIO_CACHE, carregar_planilhas, construir_fato, media_2_casas
+from ranking_infomaz import ranking_por_grupo
+from agregados_infomaz import AgregadosMensais
+from sqlite_infomaz import BancoInfomaz, comparar_resultados
+from chunks_infomaz import TAMANHO_CHUNK, compras_cliente_produto, executar_em_chunks
+from perfil_infomaz import perfil
+
+# Linhas de cada tabela mostradas no PDF (o CSV continua completo)
+MAX_LINHAS_TABELA = 50
+
+# Resolução das imagens embutidas no PDF
+DPI_IMPRESSAO = 150
+DIRETORIO_IMAGENS = os.path.join(DIRETORIO_CACHE, "imagens_pdf")
+
+ESTILO_TABELA = [
+    ('BACKGROUND', (0,0), (-1,0), "lightblue"),
+    ('TEXTCOLOR', (0,0), (-1,0), "whitesmoke"),
+    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+    ('FONTSIZE', (0,0), (-1,-1), 8),
+    ('LEFTPADDING', (0,0), (-1,-1), 4),
+    ('RIGHTPADDING', (0,0), (-1,-1), 4),
+    ('BOTTOMPADDING', (0,0), (-1,0), 12),
+    ('BACKGROUND', (0,1), (-1,-1), "beige"),
+    ('GRID', (0,0), (-1,-1), 1, "black")
+]
+
+# Função para carregar uma tabela do CSV como texto simples (cabeçalho + até max_linhas linhas).
+# Retorna também o total de linhas do arquivo.
+def carregar_tabela(nome_arquivo, max_linhas=MAX_LINHAS_TABELA):
+    df = pd.read_csv(nome_arquivo, nrows=max_linhas)
+    with open(nome_arquivo, "rb") as f:
+        total = sum(1 for _ in f) - 1
+    return [list(df.columns)] + [[str(cell) for cell in row] for row in df.values.tolist()], total
+
+# Função para formatar a tabela no PDF: células de texto simples (sem um Paragraph por célula),
+# cabeçalho repetido em cada página e quebra entre linhas
 def formata_tabela(tabela):
-    styles = getSampleStyleSheet()
-    return [[Paragraph(str(cell), styles["Normal"]) for cell in row] for row in tabela]
+    from reportlab.platypus import Table, TableStyle
+    t = Table(tabela, repeatRows=1, splitByRow=True)
+    t.setStyle(TableStyle(ESTILO_TABELA))
+    return t
+
+# Reduz a imagem para a resolução de impressão do tamanho em que ela aparece no PDF
+def reduzir_imagem(nome_arquivo, width, height, dpi=DPI_IMPRESSAO):
+    tamanho = (round(width / 72 * dpi), round(height / 72 * dpi))
+    destino = os.path.join(DIRETORIO_IMAGENS, f"{dpi}_{os.path.basename(nome_arquivo)}")
+    if os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(nome_arquivo):
+        return destino
+
+    from PIL import Image as PILImage
+    os.makedirs(DIRETORIO_IMAGENS, exist_ok=True)
+    with PILImage.open(nome_arquivo) as img:
+        if img.width <= tamanho[0]:
+            return nome_arquivo
+        img.convert("RGB").resize(tamanho, PILImage.LANCZOS).save(destino, optimize=True)
+    return destino
 
 # Função para adicionar uma imagem ao relatório
-def adicionar_imagem(nome_arquivo, width=400):
+def adicionar_imagem(nome_arquivo, width=400, height=250):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Image, Paragraph
     if os.path.exists(nome_arquivo):
-        return Image(nome_arquivo, width=width, height=250)
+        return Image(reduzir_imagem(nome_arquivo, width, height), width=width, height=height)
     else:
         return Paragraph(f"Imagem '{nome_arquivo}' não encontrada.", getSampleStyleSheet()["Normal"])
 
+# Especificação de cada gráfico: CSV de entrada, tipo de plot, eixos e textos
+GRAFICOS = {
+    "grafico_questao_1.png": {
+        "csv": "questao_1_valor_total_categoria.csv", "tipo": "barplot", "x": "VALOR NOTA", "y": "CATEGORIA",
+        "head": 10, "titulo": "Questão 1 - Valor Total de Venda por Categoria",
+        "xlabel": "Valor Total de Venda", "ylabel": "Categoria"
+    },
+    "grafico_questao_3.png": {
+        "csv": "questao_3_ranking_clientes.csv", "tipo": "barplot", "x": "QTD ITEM", "y": "NOME CLIENTE",
+        "ultimo_mes": True, "titulo": "Questão 3 - Top 10 Clientes por Quantidade de Produtos Comprados no Último Mês",
+        "xlabel": "Quantidade de Produtos", "ylabel": "Nome do Cliente"
+    },
+    "grafico_questao_5.png": {
+        "csv": "questao_5_ranking_produtos_quantidade.csv", "tipo": "barplot", "x": "QTD ITEM", "y": "NOME PRODUTO",
+        "ultimo_mes": True, "titulo": "Questão 5 - Top 10 Produtos por Quantidade de Venda no Último Mês",
+        "xlabel": "Quantidade Vendida", "ylabel": "Produto"
+    },
+    "grafico_questao_6.png": {
+        "csv": "questao_6_ranking_produtos_valor.csv", "tipo": "barplot", "x": "TOTAL_VENDIDO", "y": "NOME PRODUTO",
+        "ultimo_mes": True, "titulo": "Questão 6 - Top 10 Produtos por Valor de Venda no Último Mês",
+        "xlabel": "Valor Total Vendido", "ylabel": "Produto"
+    },
+    "grafico_questao_7.png": {
+        "csv": "questao_7_media_valor_categoria.csv", "tipo": "lineplot", "x": "MES_ANO", "y": "MEDIA_VALOR_ITEM",
+        "hue": "CATEGORIA", "rotacao": 45, "titulo": "Questão 7 - Média de Valor de Venda por Categoria por Mês",
+        "xlabel": "Mês", "ylabel": "Média de Valor de Venda"
+    },
+    "grafico_questao_8.png": {
+        "csv": "questao_8_ranking_margem_categoria.csv", "tipo": "lineplot", "x": "MES_ANO", "y": "MEDIA_MARGEM",
+        "hue": "CATEGORIA", "rotacao": 45, "titulo": "Questão 8 - Média de Margem de Lucro por Categoria por Mês",
+        "xlabel": "Mês", "ylabel": "Média de Margem"
+    },
+    "grafico_questao_10.png": {
+        "csv": "questao_10_ranking_estoque_produtos.csv", "tipo": "barplot", "x": "TOTAL_ESTOQUE", "y": "NOME PRODUTO",
+        "titulo": "Questão 10 - Top 20 Produtos por Quantidade de Estoque",
+        "xlabel": "Quantidade de Estoque", "ylabel": "Produto"
+    },
+}
+
+ARQUIVO_CACHE_GRAFICOS = ".cache_graficos.json"
+
+
+# Hash do CSV de entrada junto com a especificação do gráfico
+def hash_grafico(spec):
+    h = hashlib.sha256(json.dumps(spec, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    with open(spec["csv"], "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+# Renderiza um gráfico a partir do seu CSV (executado nos processos do pool)
+def renderizar_grafico(nome_imagem, spec):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_theme(style="whitegrid")
+    plt.style.use('ggplot')
+
+    dados = pd.read_csv(spec["csv"])
+    if spec.get("ultimo_mes"):
+        dados = dados[dados["MES_ANO"] == dados["MES_ANO"].max()]
+    if "head" in spec:
+        dados = dados.head(spec["head"])
+
+    plt.figure(figsize=(10, 6))
+    plot = sns.lineplot if spec["tipo"] == "lineplot" else sns.barplot
+    plot(x=spec["x"], y=spec["y"], hue=spec.get("hue"), data=dados)
+    plt.title(spec["titulo"])
+    plt.xlabel(spec["xlabel"])
+    plt.ylabel(spec["ylabel"])
+    if "rotacao" in spec:
+        plt.xticks(rotation=spec["rotacao"])
+    plt.tight_layout()
+    plt.savefig(nome_imagem, dpi=300, bbox_inches='tight')
+    plt.close()
+    return nome_imagem
+
+
+# Dispara os gráficos alterados em um pool de processos.
+# Retorna {imagem: future} apenas para os gráficos que precisam ser refeitos.
+# O hash de um gráfico só entra no cache depois que ele foi salvo com sucesso.
+def gerar_graficos(executor, graficos=GRAFICOS, arquivo_cache=ARQUIVO_CACHE_GRAFICOS):
+    cache = {}
+    if os.path.exists(arquivo_cache):
+        with open(arquivo_cache, encoding="utf-8") as f:
+            cache = json.load(f)
+    trava = threading.Lock()
+
+    def salvar_cache():
+        with open(arquivo_cache, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+
+    # Chamado quando o future termina (na thread do executor ou aqui, se já terminou)
+    def registrar(nome_imagem, digest, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        with trava:
+            cache[nome_imagem] = digest
+            salvar_cache()
+
+    pendentes, digests = {}, {}
+    with trava:
+        for nome_imagem, spec in graficos.items():
+            if not os.path.exists(spec["csv"]):
+                continue
+            digest = hash_grafico(spec)
+            if os.path.exists(nome_imagem) and cache.get(nome_imagem) == digest:
+                continue
+            # Um gráfico que falhar continua marcado como desatualizado
+            cache.pop(nome_imagem, None)
+            digests[nome_imagem] = digest
+            pendentes[nome_imagem] = executor.submit(renderizar_grafico, nome_imagem, spec)
+            perfil.contar("graficos_refeitos")
+        salvar_cache()
+
+    for nome_imagem, future in pendentes.items():
+        future.add_done_callback(lambda future, nome=nome_imagem: registrar(nome, digests[nome], future))
+    return pendentes
+
+
+# ====================
+# Registro de consultas
+# ====================
+# Cada questão é uma função registrada com nome, textos da seção do PDF, CSV de
+# saída e gráfico. Todas leem as mesmas entradas compartilhadas (somente leitura).
+CONSULTAS = {}
+
+
+def consulta(nome, titulo, descricao, arquivo, imagem=None):
+    def registrar(funcao):
+        CONSULTAS[nome] = {"funcao": funcao, "titulo": titulo, "descricao": descricao,
+                           "arquivo": arquivo, "imagem": imagem}
+        return funcao
+    return registrar
+
+
+# Entradas compartilhadas: tabelas e derivados (tabela fato, agregados...) calculados uma única vez
+class Dados:
+    def __init__(self, tabelas, derivados=None):
+        self.tabelas = tabelas
+        self._derivados = dict(derivados or {})
+        self._lock = threading.RLock()
+
+    def __getattr__(self, nome):
+        tabelas = self.__dict__.get("tabelas", {})
+        if nome in tabelas:
+            return tabelas[nome]
+        raise AttributeError(nome)
+
+    def derivado(self, nome, funcao):
+        with self._lock:
+            if nome not in self._derivados:
+                with perfil.etapa(nome):
+                    self._derivados[nome] = funcao(self)
+            return self._derivados[nome]
+
+    # Resultado de uma questão registrada (mesma interface do BancoInfomaz)
+    def consultar(self, nome):
+        return CONSULTAS[nome]["funcao"](self)
+
+
+ABAS_TABELAS = {
+    "produtos_df": "Cadastro Produtos",
+    "clientes_df": "Cadastro Clientes",
+    "transacoes_df": "Transações Vendas",
+    "estoque_df": "Cadastro de Estoque",
+    "fornecedores_df": "Cadastro Fornecedores",
+}
+
+
+# Carregar tabelas (snapshot colunar em cache, datas já convertidas)
+def carregar_tabelas(caminho_arquivo_excel, nomes=ABAS_TABELAS):
+    planilhas = carregar_planilhas(caminho_arquivo_excel, [ABAS_TABELAS[nome] for nome in nomes])
+    tabelas = {nome: planilhas[ABAS_TABELAS[nome]] for nome in nomes}
+
+    # Calcular VALOR UNITÁRIO se não existir
+    estoque_df = tabelas["estoque_df"]
+    if "VALOR UNITARIO" not in estoque_df.columns:
+        estoque_df["VALOR UNITARIO"] = estoque_df["VALOR ESTOQUE"] / estoque_df["QTD ESTOQUE"]
+    return tabelas
+
+
+def carregar_dados(caminho_arquivo_excel="Case_Infomaz_Base_de_Dados.xlsx"):
+    tabelas = carregar_tabelas(caminho_arquivo_excel)
+    perfil.contar("linhas_transacoes", len(tabelas["transacoes_df"]))
+    return Dados(tabelas)
+
+
+# Modo fora da memória: as transações vêm de um CSV/Parquet/snapshot lido em chunks por um
+# pool de processos; as questões recebem os agregados já reduzidos em vez da tabela fato
+def carregar_dados_em_chunks(caminho_transacoes, caminho_arquivo_excel="Case_Infomaz_Base_de_Dados.xlsx",
+                             tamanho_chunk=TAMANHO_CHUNK, processos=None):
+    tabelas = carregar_tabelas(caminho_arquivo_excel, [nome for nome in ABAS_TABELAS if nome != "transacoes_df"])
+    linhas, agregados, compras = executar_em_chunks(caminho_transacoes, tabelas["produtos_df"], tabelas["clientes_df"],
+                                                    tabelas["estoque_df"], tamanho_chunk, processos)
+    print(f"{linhas} transações agregadas em chunks de {tamanho_chunk} linhas.")
+    perfil.contar("linhas_transacoes", linhas)
+    return Dados(tabelas, {"agregados": agregados, "compras_cliente_produto": compras})
+
+
+# Tabela fato montada uma única vez (Questão 9)
+def _fato(dados):
+    return construir_fato(dados.transacoes_df, dados.produtos_df, dados.clientes_df, dados.estoque_df)
+
+
+def _compras_cliente_produto(dados):
+    return compras_cliente_produto(dados.derivado("fato", _fato))
+
+
+# Agregados mensais persistidos, atualizados apenas com as transações novas
+def _agregados(dados):
+    agregados = AgregadosMensais()
+    agregados.atualizar(dados.transacoes_df, dados.produtos_df, dados.clientes_df, dados.estoque_df)
+    return agregados
+
+
+# Acrescenta colunas do cadastro pela chave (apenas chaves cadastradas)
+def _com_cadastro(df, cadastro, chave, colunas):
+    return df.merge(cadastro[[chave] + colunas].drop_duplicates(chave), on=chave)
+
+
+def _vendas_produto_mes(dados):
+    agregados = dados.derivado("agregados", _agregados)
+    vendas = agregados.tabela("produto")[["MES_ANO", "ID PRODUTO", "QTD ITEM", "VALOR ITEM"]]
+    # Valores em centavos: a soma acumulada mês a mês traz ruído no último bit
+    vendas = vendas.assign(**{"VALOR ITEM": vendas["VALOR ITEM"].round(2)})
+    return _com_cadastro(vendas, dados.produtos_df, "ID PRODUTO", ["NOME PRODUTO", "CATEGORIA"])
+
+
+# ====================
+# Questão 1: Valor Total de Venda por Categoria
+# ====================
+@consulta("q1", "Questão 1 - Valor Total de Venda por Categoria",
+          "Esta métrica mostra o faturamento total por categoria de produto.",
+          "questao_1_valor_total_categoria.csv", "grafico_questao_1.png")
+def questao_1(dados):
+    agregados = dados.derivado("agregados", _agregados)
+    valor_total_venda_categoria = agregados.tabela("categoria").groupby("CATEGORIA")["VALOR NOTA"].sum().round(2).reset_index()
+    valor_total_venda_categoria.sort_values(by=["VALOR NOTA", "CATEGORIA"], ascending=[False, True], inplace=True)
+    return valor_total_venda_categoria
+
+
+# ====================
+# Questão 2: Margem de Lucro por Produto
+# ====================
+@consulta("q2", "Questão 2 - Margem de Lucro por Produto",
+          "Mostra a média de margem calculada como (Valor Item - Valor Unitário) para cada produto.",
+          "questao_2_margem_produtos.csv")
+def questao_2(dados):
+    agregados = dados.derivado("agregados", _agregados)
+
+    # Média da margem por produto = soma das margens / itens com margem, somando os meses
+    margem_produtos = agregados.tabela("produto").groupby("ID PRODUTO")[["MARGEM", "N_MARGEM"]].sum().reset_index()
+    margem_produtos = margem_produtos[margem_produtos["N_MARGEM"] > 0]
+    margem_produtos["MARGEM"] = media_2_casas(margem_produtos["MARGEM"], margem_produtos["N_MARGEM"])
+    margem_produtos = _com_cadastro(margem_produtos[["ID PRODUTO", "MARGEM"]], dados.produtos_df, "ID PRODUTO", ["NOME PRODUTO", "CATEGORIA"])
+    margem_produtos = margem_produtos[margem_produtos["CATEGORIA"].notna()].rename(columns={"NOME PRODUTO": "NOME_PRODUTO"})
+    margem_produtos.sort_values(by=["MARGEM", "ID PRODUTO"], ascending=[False, True], inplace=True)
+    return margem_produtos
+
+
+# ====================
+# Questão 3: Ranking de clientes por quantidade de produtos comprados por mês
+# ====================
+@consulta("q3", "Questão 3 - Top 10 Clientes por Quantidade de Produtos Comprados por Mês",
+          "Ranking dos clientes com base na quantidade de produtos comprados por mês.",
+          "questao_3_ranking_clientes.csv", "grafico_questao_3.png")
+def questao_3(dados):
+    agregados = dados.derivado("agregados", _agregados)
+    compras_cliente_mes = agregados.tabela("cliente").sort_values(["MES_ANO", "ID CLIENTE"])[["MES_ANO", "ID CLIENTE", "QTD ITEM"]]
+    compras_cliente_mes = _com_cadastro(compras_cliente_mes, dados.clientes_df, "ID CLIENTE", ["NOME CLIENTE"])
+    return ranking_por_grupo(compras_cliente_mes, "MES_ANO", "QTD ITEM", n=10)
+
+
+# ====================
+# Questão 4: Ranking de fornecedores por quantidade de estoque por mês
+# ====================
+@consulta("q4", "Questão 4 - Top 10 Fornecedores por Quantidade de Estoque Disponível por Mês",
+          "Mostra os fornecedores com maior estoque disponível por mês.",
+          "questao_4_ranking_fornecedores.csv")
+def questao_4(dados):
+    estoque_df = dados.estoque_df
+    estoque_fornecedor_mes = estoque_df.groupby(
+        [estoque_df["DATA ESTOQUE"].dt.to_period('M').rename("MES_ANO"), "ID FORNECEDOR"], observed=True
+    )["QTD ESTOQUE"].sum().reset_index()
+    estoque_fornecedor_mes = estoque_fornecedor_mes.merge(dados.fornecedores_df[["ID FORNECEDOR", "NOME FORNECEDOR"]], on="ID FORNECEDOR")
+    return ranking_por_grupo(estoque_fornecedor_mes, "MES_ANO", "QTD ESTOQUE", n=10)
+
+
+# ====================
+# Questão 5: Ranking de produtos por quantidade de venda por mês
+# ====================
+@consulta("q5", "Questão 5 - Top 10 Produtos por Quantidade de Venda por Mês",
+          "Produtos mais vendidos por mês, com base na quantidade.",
+          "questao_5_ranking_produtos_quantidade.csv", "grafico_questao_5.png")
+def questao_5(dados):
+    vendas_produto_mes = dados.derivado("vendas_produto_mes", _vendas_produto_mes)
+    # Empates em quantidade são desempatados pelo valor vendido
+    ranking_produtos = ranking_por_grupo(vendas_produto_mes, "MES_ANO", ["QTD ITEM", "VALOR ITEM"], n=10)
+    return ranking_produtos[["MES_ANO", "ID PRODUTO", "NOME PRODUTO", "CATEGORIA", "QTD ITEM", "POSICAO_RANKING"]]
+
+
+# ====================
+# Questão 6: Ranking de produtos por valor de venda por mês
+# ====================
+@consulta("q6", "Questão 6 - Top 10 Produtos por Valor de Venda por Mês",
+          "Produtos com maior valor de venda mensal.",
+          "questao_6_ranking_produtos_valor.csv", "grafico_questao_6.png")
+def questao_6(dados):
+    vendas_produto_mes = dados.derivado("vendas_produto_mes", _vendas_produto_mes)
+    ranking_valor_produtos = vendas_produto_mes[["MES_ANO", "ID PRODUTO", "NOME PRODUTO", "CATEGORIA", "VALOR ITEM"]].rename(
+        columns={"VALOR ITEM": "TOTAL_VENDIDO"}
+    )
+    return ranking_por_grupo(ranking_valor_produtos, "MES_ANO", "TOTAL_VENDIDO", n=10)
+
+
+# ====================
+# Questão 7: Média de Valor de Venda por Categoria por Mês
+# ====================
+@consulta("q7", "Questão 7 - Média de Valor de Venda por Categoria por Mês",
+          "Gráfico mostra a evolução da média de valor de venda por categoria ao longo dos meses.",
+          "questao_7_media_valor_categoria.csv", "grafico_questao_7.png")
+def questao_7(dados):
+    vendas_categoria = dados.derivado("agregados", _agregados).tabela("categoria")
+    media_venda_categoria_mensal = vendas_categoria[["CATEGORIA", "MES_ANO"]].copy()
+    media_venda_categoria_mensal["MES_ANO"] = media_venda_categoria_mensal["MES_ANO"].astype(str)
+    media_venda_categoria_mensal["MEDIA_VALOR_ITEM"] = media_2_casas(vendas_categoria["VALOR ITEM"], vendas_categoria["N_ITENS"])
+    return media_venda_categoria_mensal
+
+
+# ====================
+# Questão 8: Média de margem de lucro por categoria
+# ====================
+@consulta("q8", "Questão 8 - Média de Margem de Lucro por Categoria por Mês",
+          "Mostra a média de margem de lucro por categoria e mês.",
+          "questao_8_ranking_margem_categoria.csv", "grafico_questao_8.png")
+def questao_8(dados):
+    vendas_categoria = dados.derivado("agregados", _agregados).tabela("categoria")
+    vendas_categoria = vendas_categoria[vendas_categoria["N_MARGEM"] > 0]
+    ranking_margem_categoria = vendas_categoria[["CATEGORIA", "MES_ANO"]].copy()
+    ranking_margem_categoria["MEDIA_MARGEM"] = media_2_casas(vendas_categoria["MARGEM"], vendas_categoria["N_MARGEM"])
+    return ranking_margem_categoria
+
+
+# ====================
+# Questão 9: Lista de produtos comprados por clientes
+# ====================
+@consulta("q9", "Questão 9 - Top 20 Produtos Mais Comprados por Clientes",
+          "Lista dos produtos mais comprados pelos clientes.",
+          "questao_9_lista_produtos_clientes.csv")
+def questao_9(dados):
+    compras = dados.derivado("compras_cliente_produto", _compras_cliente_produto).reset_index()
+    compras = _com_cadastro(compras, dados.clientes_df, "ID CLIENTE", ["NOME CLIENTE"])
+    compras = _com_cadastro(compras, dados.produtos_df, "ID PRODUTO", ["NOME PRODUTO"])
+    top_produtos_cliente = compras.groupby(["NOME CLIENTE", "NOME PRODUTO"])["QTD ITEM"].sum().reset_index()
+    # Empates na quantidade saem em ordem de cliente e produto, como no backend SQLite
+    top_produtos_cliente.sort_values(by=["QTD ITEM", "NOME CLIENTE", "NOME PRODUTO"], ascending=[False, True, True], inplace=True)
+    return top_produtos_cliente
+
+
+# ====================
+# Questão 10: Ranking de produtos por quantidade de estoque
+# ====================
+@consulta("q10", "Questão 10 - Top 20 Produtos por Quantidade de Estoque",
+          "Mostra quais produtos possuem mais unidades em estoque.",
+          "questao_10_ranking_estoque_produtos.csv", "grafico_questao_10.png")
+def questao_10(dados):
+    estoque_com_produtos = dados.estoque_df.merge(dados.produtos_df[["ID ESTOQUE", "NOME PRODUTO", "CATEGORIA"]], on="ID ESTOQUE")
+    ranking_estoque_produtos = estoque_com_produtos.groupby(["NOME PRODUTO", "CATEGORIA"])["QTD ESTOQUE"].sum().reset_index()
+    ranking_estoque_produtos.rename(columns={"QTD ESTOQUE": "TOTAL_ESTOQUE"}, inplace=True)
+    # Empates no total são ordenados pelo nome e pela categoria, para o corte do top 20 ser sempre o mesmo
+    ranking_estoque_produtos.sort_values(by=["TOTAL_ESTOQUE", "NOME PRODUTO", "CATEGORIA"], ascending=[False, True, True], inplace=True)
+    return ranking_estoque_produtos.head(20)
+
+
+# ====================
+# Execução das consultas
+# ====================
+def _executar_consulta(nome, dados, medir_memoria):
+    info = CONSULTAS[nome]
+    if medir_memoria:
+        # Pelo perfil, para não apagar o pico já medido na etapa "consultas"
+        memoria_inicial = perfil.zerar_pico()
+    inicio = time.perf_counter()
+
+    with perfil.etapa(nome):
+        resultado = dados.consultar(nome)
+        resultado.to_csv(info["arquivo"], index=False)
+    perfil.contar("linhas_csv", len(resultado))
+
+    metrica = {"consulta": nome, "arquivo": info["arquivo"], "linhas": len(resultado),
+               "tempo_s": round(time.perf_counter() - inicio, 6)}
+    if medir_memoria:
+        metrica["pico_memoria_mb"] = round((tracemalloc.get_traced_memory()[1] - memoria_inicial) / 1024 ** 2, 3)
+    return metrica
+
+
+# Roda as consultas selecionadas; as independentes rodam ao mesmo tempo em threads
+# (as entradas são compartilhadas sem cópia). O pico de memória por consulta só é
+# exato com workers=1, pois o tracemalloc mede o processo inteiro.
+def executar_consultas(nomes, dados, workers=None):
+    workers = workers or min(len(nomes), os.cpu_count() or 1)
+    medir_memoria = workers == 1
+    # Com o perfil ligado o tracemalloc já está ativo e não deve ser desligado aqui
+    iniciar_tracemalloc = medir_memoria and not tracemalloc.is_tracing()
+    if iniciar_tracemalloc:
+        tracemalloc.start()
+    try:
+        if workers == 1:
+            return [_executar_consulta(nome, dados, True) for nome in nomes]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda nome: _executar_consulta(nome, dados, False), nomes))
+    finally:
+        if iniciar_tracemalloc:
+            tracemalloc.stop()
+
+
+# Confere as consultas SQL contra as do pandas
+def verificar_sqlite(nomes):
+    dados = carregar_dados()
+    banco = BancoInfomaz()
+    divergencias = 0
+    for nome in nomes:
+        erro = comparar_resultados(dados.consultar(nome), banco.consultar(nome))
+        divergencias += erro is not None
+        print(f"{nome}: {erro or 'ok'}")
+    return divergencias == 0
+
+
 # Função para criar o relatório PDF
-def criar_relatorio_pdf(nome_arquivo_saida):
+def criar_relatorio_pdf(nome_arquivo_saida, max_workers=None, consultas=None, workers_consultas=None,
+                        arquivo_metricas=None, transacoes=None, tamanho_chunk=TAMANHO_CHUNK,
+                        max_linhas=MAX_LINHAS_TABELA, backend="pandas"):
+    nomes = consultas or list(CONSULTAS)
+
+    with perfil.etapa("carregar"):
+        if backend == "sqlite":
+            dados = BancoInfomaz()
+        elif transacoes:
+            dados = carregar_dados_em_chunks(transacoes, tamanho_chunk=tamanho_chunk, processos=max_workers)
+        else:
+            dados = carregar_dados()
+    with perfil.etapa("consultas"):
+        metricas = executar_consultas(nomes, dados, workers_consultas)
+    for m in metricas:
+        memoria = f", pico {m['pico_memoria_mb']} MB" if "pico_memoria_mb" in m else ""
+        print(f"{m['consulta']}: {m['tempo_s']:.4f}s, {m['linhas']} linhas{memoria}")
+    if arquivo_metricas:
+        with open(arquivo_metricas, "w", encoding="utf-8") as f:
+            json.dump(metricas, f, ensure_ascii=False, indent=2)
+
+    if nome_arquivo_saida is None:
+        return metricas
+
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
     doc = SimpleDocTemplate(nome_arquivo_saida, pagesize=letter)
     elements = []
 
@@ -50,313 +556,76 @@ def criar_relatorio_pdf(nome_arquivo_saida):
         elements.append(Spacer(1, 12))
 
         if os.path.exists(nome_tabela):
-            tabela = carregar_tabela(nome_tabela)
-            tabela_formatada = formata_tabela(tabela)
-            t = Table(tabela_formatada)
-            t.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.lightblue),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('FONTSIZE', (0,0), (-1,0), 10),
-                ('BOTTOMPADDING', (0,0), (-1,0), 12),
-                ('BACKGROUND', (0,1), (-1,-1), colors.beige),
-                ('GRID', (0,0), (-1,-1), 1, colors.black)
-            ]))
-            elements.append(t)
+            tabela, total_linhas = carregar_tabela(nome_tabela, max_linhas)
+            elements.append(formata_tabela(tabela))
+            perfil.contar("linhas_tabelas_pdf", len(tabela) - 1)
+            if total_linhas > len(tabela) - 1:
+                elements.append(Paragraph(
+                    f"Mostrando {len(tabela) - 1} de {total_linhas} linhas; tabela completa em '{nome_tabela}'.", normal_style))
         else:
             elements.append(Paragraph(f"Tabela '{nome_tabela}' não encontrada.", normal_style))
         elements.append(Spacer(1, 12))
 
+        # Espera apenas pelo gráfico desta seção, se ele estiver sendo refeito
+        if nome_imagem in graficos_pendentes:
+            with perfil.etapa("espera_grafico"):
+                graficos_pendentes[nome_imagem].result()
+
         if nome_imagem and os.path.exists(nome_imagem):
             img = adicionar_imagem(nome_imagem)
             elements.append(img)
         elements.append(Spacer(1, 24))
 
-    # Carregar arquivo Excel
-    caminho_arquivo_excel = "Case_Infomaz_Base_de_Dados.xlsx"
-    xls = pd.ExcelFile(caminho_arquivo_excel)
-
-    # Carregar tabelas
-    produtos_df = pd.read_excel(xls, sheet_name="Cadastro Produtos", header=1)
-    clientes_df = pd.read_excel(xls, sheet_name="Cadastro Clientes", header=1)
-    transacoes_df = pd.read_excel(xls, sheet_name="Transações Vendas", header=1)
-    estoque_df = pd.read_excel(xls, sheet_name="Cadastro de Estoque", header=1)
-    fornecedores_df = pd.read_excel(xls, sheet_name="Cadastro Fornecedores", header=1)
-
-    # Converter datas
-    transacoes_df["DATA NOTA"] = pd.to_datetime(transacoes_df["DATA NOTA"])
-    transacoes_df["MES_ANO"] = transacoes_df["DATA NOTA"].dt.to_period('M')
-    estoque_df["DATA ESTOQUE"] = pd.to_datetime(estoque_df["DATA ESTOQUE"])
-
-    # Calcular VALOR UNITÁRIO se não existir
-    if "VALOR UNITARIO" not in estoque_df.columns:
-        estoque_df["VALOR UNITARIO"] = estoque_df["VALOR ESTOQUE"] / estoque_df["QTD ESTOQUE"]
-
-    # ====================
-    # Questão 1: Valor Total de Venda por Categoria
-    # ====================
-    df_vendas_categoria = transacoes_df.merge(
-        produtos_df[["ID PRODUTO", "CATEGORIA"]], on="ID PRODUTO"
-    )
-    valor_total_venda_categoria = df_vendas_categoria.groupby("CATEGORIA")["VALOR NOTA"].sum().reset_index()
-    valor_total_venda_categoria.sort_values(by="VALOR NOTA", ascending=False, inplace=True)
-    valor_total_venda_categoria.to_csv("questao_1_valor_total_categoria.csv", index=False)
-
-    # Plotar gráfico
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x="VALOR NOTA", y="CATEGORIA", data=valor_total_venda_categoria.head(10))
-    plt.title("Questão 1 - Valor Total de Venda por Categoria")
-    plt.xlabel("Valor Total de Venda")
-    plt.ylabel("Categoria")
-    plt.tight_layout()
-    plt.savefig("grafico_questao_1.png", dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # ====================
-    # Questão 2: Margem de Lucro por Produto
-    # ====================
-    produtos_estoque_map = produtos_df[["ID PRODUTO", "ID ESTOQUE"]]
-    df_margem = transacoes_df.merge(produtos_estoque_map, on="ID PRODUTO")
-    df_margem = df_margem.merge(estoque_df[["ID ESTOQUE", "VALOR UNITARIO"]], on="ID ESTOQUE")
-    df_margem["MARGEM"] = df_margem["VALOR ITEM"] - df_margem["VALOR UNITARIO"]
-
-    # Adicionar informações faltando
-    if "NOME PRODUTO" not in df_margem.columns or "CATEGORIA" not in df_margem.columns:
-        df_margem = df_margem.merge(produtos_df[["ID PRODUTO", "NOME PRODUTO", "CATEGORIA"]], on="ID PRODUTO")
-
-    # Agrupar por ID PRODUTO e calcular média da margem
-    margem_produtos = df_margem.groupby("ID PRODUTO").agg(
-        MARGEM=("MARGEM", "mean"),
-        NOME_PRODUTO=("NOME PRODUTO", "first"),
-        CATEGORIA=("CATEGORIA", "first")
-    ).reset_index()
-    margem_produtos["MARGEM"] = margem_produtos["MARGEM"].round(2)
-    margem_produtos.sort_values(by="MARGEM", ascending=False, inplace=True)
-    margem_produtos.to_csv("questao_2_margem_produtos.csv", index=False)
-
     # ====================
-    # Questão 3: Ranking de clientes por quantidade de produtos comprados por mês
+    # Gráficos (em paralelo, apenas os que mudaram)
     # ====================
-    ranking_clientes_mensal = transacoes_df.groupby(["ID CLIENTE", "DATA NOTA"])["QTD ITEM"].sum().reset_index()
-    ranking_clientes_mensal["MES_ANO"] = pd.to_datetime(ranking_clientes_mensal["DATA NOTA"]).dt.to_period('M')
-    ranking_completo = ranking_clientes_mensal.merge(clientes_df[["ID CLIENTE", "NOME CLIENTE"]], on="ID CLIENTE")
-    ranking_completo["POSICAO_RANKING"] = ranking_completo.groupby("MES_ANO").cumcount() + 1
-    top_clientes_mensal = ranking_completo.sort_values(by=["MES_ANO", "QTD ITEM"], ascending=[True, False]).head(10)
-    top_clientes_mensal.to_csv("questao_3_ranking_clientes.csv", index=False)
-
-    # Plotar gráfico
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x="QTD ITEM", y="NOME CLIENTE", data=top_clientes_mensal)
-    plt.title("Questão 3 - Top 10 Clientes por Quantidade de Produtos Comprados por Mês")
-    plt.xlabel("Quantidade de Produtos")
-    plt.ylabel("Nome do Cliente")
-    plt.tight_layout()
-    plt.savefig("grafico_questao_3.png", dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # ====================
-    # Questão 4: Ranking de fornecedores por quantidade de estoque por mês
-    # ====================
-    ranking_fornecedores_mensal = estoque_df.groupby(["ID FORNECEDOR", "DATA ESTOQUE"])["QTD ESTOQUE"].sum().reset_index()
-    ranking_fornecedores_mensal["MES_ANO"] = pd.to_datetime(ranking_fornecedores_mensal["DATA ESTOQUE"]).dt.to_period('M')
-    ranking_fornecedores_mensal.drop(columns=["DATA ESTOQUE"], inplace=True)
-    ranking_fornecedores_mensal.sort_values(by=["MES_ANO", "QTD ESTOQUE"], ascending=[True, False], inplace=True)
-    ranking_completo_fornecedores = ranking_fornecedores_mensal.merge(fornecedores_df[["ID FORNECEDOR", "NOME FORNECEDOR"]], on="ID FORNECEDOR")
-    top_fornecedores_mensal = ranking_completo_fornecedores.head(10)
-    top_fornecedores_mensal.to_csv("questao_4_ranking_fornecedores.csv", index=False)
-
-    # ====================
-    # Questão 5: Ranking de produtos por quantidade de venda por mês
-    # ====================
-    ranking_produtos_mensal = transacoes_df.groupby(["ID PRODUTO", "DATA NOTA"])["QTD ITEM"].sum().reset_index()
-    ranking_produtos_mensal["MES_ANO"] = pd.to_datetime(ranking_produtos_mensal["DATA NOTA"]).dt.to_period('M')
-    ranking_completo_produtos = ranking_produtos_mensal.merge(produtos_df[["ID PRODUTO", "NOME PRODUTO", "CATEGORIA"]], on="ID PRODUTO")
-    ranking_completo_produtos["POSICAO_RANKING"] = ranking_completo_produtos.groupby("MES_ANO").cumcount() + 1
-    top_produtos_mensal = ranking_completo_produtos.sort_values(by=["MES_ANO", "QTD ITEM"], ascending=[True, False]).head(10)
-    top_produtos_mensal.to_csv("questao_5_ranking_produtos_quantidade.csv", index=False)
-
-    # Plotar gráfico
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x="QTD ITEM", y="NOME PRODUTO", data=top_produtos_mensal)
-    plt.title("Questão 5 - Top 10 Produtos por Quantidade de Venda por Mês")
-    plt.xlabel("Quantidade Vendida")
-    plt.ylabel("Produto")
-    plt.tight_layout()
-    plt.savefig("grafico_questao_5.png", dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # ====================
-    # Questão 6: Ranking de produtos por valor de venda por mês
-    # ====================
-    ranking_valor_produtos_mensal = transacoes_df.groupby(["ID PRODUTO", "DATA NOTA"])["VALOR ITEM"].sum().reset_index()
-    ranking_valor_produtos_mensal["MES_ANO"] = pd.to_datetime(ranking_valor_produtos_mensal["DATA NOTA"]).dt.to_period('M')
-    ranking_valor_produtos_mensal.rename(columns={"VALOR ITEM": "TOTAL_VENDIDO"}, inplace=True)
-    ranking_valor_produtos_mensal = ranking_valor_produtos_mensal.merge(produtos_df[["ID PRODUTO", "NOME PRODUTO", "CATEGORIA"]], on="ID PRODUTO")
-    ranking_valor_produtos_mensal["POSICAO_RANKING"] = ranking_valor_produtos_mensal.groupby("MES_ANO").cumcount() + 1
-    top_valor_produtos_mensal = ranking_valor_produtos_mensal.sort_values(by=["MES_ANO", "TOTAL_VENDIDO"], ascending=[True, False]).head(10)
-    top_valor_produtos_mensal.to_csv("questao_6_ranking_produtos_valor.csv", index=False)
-
-    # Plotar gráfico
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x="TOTAL_VENDIDO", y="NOME PRODUTO", data=top_valor_produtos_mensal)
-    plt.title("Questão 6 - Top 10 Produtos por Valor de Venda por Mês")
-    plt.xlabel("Valor Total Vendido")
-    plt.ylabel("Produto")
-    plt.tight_layout()
-    plt.savefig("grafico_questao_6.png", dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # ====================
-    # Questão 7: Média de Valor de Venda por Categoria por Mês
-    # ====================
-    transacoes_com_categoria = transacoes_df.merge(produtos_df[["ID PRODUTO", "CATEGORIA"]], on="ID PRODUTO")
-    transacoes_com_categoria["DATA NOTA"] = pd.to_datetime(transacoes_com_categoria["DATA NOTA"])
-    transacoes_com_categoria["MES_ANO"] = transacoes_com_categoria["DATA NOTA"].dt.to_period('M')
-    media_venda_categoria_mensal = transacoes_com_categoria.groupby(["CATEGORIA", "MES_ANO"])["VALOR ITEM"].mean().reset_index()
-    media_venda_categoria_mensal.rename(columns={"VALOR ITEM": "MEDIA_VALOR_ITEM"}, inplace=True)
-    media_venda_categoria_mensal["MES_ANO"] = media_venda_categoria_mensal["MES_ANO"].astype(str)
-    media_venda_categoria_mensal["MEDIA_VALOR_ITEM"] = media_venda_categoria_mensal["MEDIA_VALOR_ITEM"].round(2)
-    media_venda_categoria_mensal.to_csv("questao_7_media_valor_categoria.csv", index=False)
-
-    # Plotar gráfico
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(x="MES_ANO", y="MEDIA_VALOR_ITEM", hue="CATEGORIA", data=media_venda_categoria_mensal)
-    plt.title("Questão 7 - Média de Valor de Venda por Categoria por Mês")
-    plt.xlabel("Mês")
-    plt.ylabel("Média de Valor de Venda")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig("grafico_questao_7.png", dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # ====================
-    # Questão 8: Média de margem de lucro por categoria
-    # ====================
-    df_margem_categoria = transacoes_df.merge(produtos_estoque_map, on="ID PRODUTO")
-    df_margem_categoria = df_margem_categoria.merge(estoque_df[["ID ESTOQUE", "VALOR UNITARIO"]], on="ID ESTOQUE")
-    df_margem_categoria["MARGEM"] = df_margem_categoria["VALOR ITEM"] - df_margem_categoria["VALOR UNITARIO"]
-    df_margem_categoria = df_margem_categoria.merge(produtos_df[["ID PRODUTO", "CATEGORIA"]], on="ID PRODUTO")
-    df_margem_categoria["DATA NOTA"] = pd.to_datetime(df_margem_categoria["DATA NOTA"])
-    df_margem_categoria["MES_ANO"] = df_margem_categoria["DATA NOTA"].dt.to_period('M')
-    ranking_margem_categoria = df_margem_categoria.groupby(["CATEGORIA", "MES_ANO"])["MARGEM"].mean().reset_index()
-    ranking_margem_categoria.rename(columns={"MARGEM": "MEDIA_MARGEM"}, inplace=True)
-    ranking_margem_categoria["MEDIA_MARGEM"] = ranking_margem_categoria["MEDIA_MARGEM"].round(2)
-    ranking_margem_categoria.to_csv("questao_8_ranking_margem_categoria.csv", index=False)
-    ranking_margem_categoria["MES_ANO"] = ranking_margem_categoria["MES_ANO"].astype(str)
-
-    # Plotar gráfico
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(x="MES_ANO", y="MEDIA_MARGEM", hue="CATEGORIA", data=ranking_margem_categoria)
-    plt.title("Questão 8 - Média de Margem de Lucro por Categoria por Mês")
-    plt.xlabel("Mês")
-    plt.ylabel("Média de Margem")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig("grafico_questao_8.png", dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # ====================
-    # Questão 9: Lista de produtos comprados por clientes
-    # ====================
-    transacoes_com_produtos = transacoes_df.merge(produtos_df[["ID PRODUTO", "NOME PRODUTO", "CATEGORIA"]], on="ID PRODUTO")
-    transacoes_com_produtos = transacoes_com_produtos.merge(clientes_df[["ID CLIENTE", "NOME CLIENTE"]], on="ID CLIENTE")
-    top_produtos_cliente = transacoes_com_produtos.groupby(["NOME CLIENTE", "NOME PRODUTO"])["QTD ITEM"].sum().reset_index()
-    top_produtos_cliente.sort_values(by="QTD ITEM", ascending=False, inplace=True)
-    top_produtos_cliente.to_csv("questao_9_lista_produtos_clientes.csv", index=False)
-
-    # ====================
-    # Questão 10: Ranking de produtos por quantidade de estoque
-    # ====================
-    estoque_com_produtos = estoque_df.merge(produtos_df[["ID ESTOQUE", "NOME PRODUTO", "CATEGORIA"]], on="ID ESTOQUE")
-    ranking_estoque_produtos = estoque_com_produtos.groupby(["NOME PRODUTO", "CATEGORIA"])["QTD ESTOQUE"].sum().reset_index()
-    ranking_estoque_produtos.rename(columns={"QTD ESTOQUE": "TOTAL_ESTOQUE"}, inplace=True)
-    ranking_estoque_produtos.sort_values(by="TOTAL_ESTOQUE", ascending=False, inplace=True)
-    top_estoque_produtos = ranking_estoque_produtos.head(20)
-    top_estoque_produtos.to_csv("questao_10_ranking_estoque_produtos.csv", index=False)
-
-    # Plotar gráfico
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x="TOTAL_ESTOQUE", y="NOME PRODUTO", data=top_estoque_produtos)
-    plt.title("Questão 10 - Top 20 Produtos por Quantidade de Estoque")
-    plt.xlabel("Quantidade de Estoque")
-    plt.ylabel("Produto")
-    plt.tight_layout()
-    plt.savefig("grafico_questao_10.png", dpi=300, bbox_inches='tight')
-    plt.close()
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    with perfil.etapa("graficos"):
+        graficos_pendentes = gerar_graficos(executor)
 
     # ====================
     # Criar Relatório PDF
     # ====================
-    adicionar_secao(
-        "Questão 1 - Valor Total de Venda por Categoria",
-        "Esta métrica mostra o faturamento total por categoria de produto.",
-        "questao_1_valor_total_categoria.csv",
-        "grafico_questao_1.png"
-    )
-
-    adicionar_secao(
-        "Questão 2 - Margem de Lucro por Produto",
-        "Mostra a média de margem calculada como (Valor Item - Valor Unitário) para cada produto.",
-        "questao_2_margem_produtos.csv"
-    )
-
-    adicionar_secao(
-        "Questão 3 - Top 10 Clientes por Quantidade de Produtos Comprados por Mês",
-        "Ranking dos clientes com base na quantidade de produtos comprados por mês.",
-        "questao_3_ranking_clientes.csv",
-        "grafico_questao_3.png"
-    )
-
-    adicionar_secao(
-        "Questão 4 - Top 10 Fornecedores por Quantidade de Estoque Disponível por Mês",
-        "Mostra os fornecedores com maior estoque disponível por mês.",
-        "questao_4_ranking_fornecedores.csv"
-    )
-
-    adicionar_secao(
-        "Questão 5 - Top 10 Produtos por Quantidade de Venda por Mês",
-        "Produtos mais vendidos por mês, com base na quantidade.",
-        "questao_5_ranking_produtos_quantidade.csv",
-        "grafico_questao_5.png"
-    )
-
-    adicionar_secao(
-        "Questão 6 - Top 10 Produtos por Valor de Venda por Mês",
-        "Produtos com maior valor de venda mensal.",
-        "questao_6_ranking_produtos_valor.csv",
-        "grafico_questao_6.png"
-    )
-
-    adicionar_secao(
-        "Questão 7 - Média de Valor de Venda por Categoria por Mês",
-        "Gráfico mostra a evolução da média de valor de venda por categoria ao longo dos meses.",
-        "questao_7_media_valor_categoria.csv",
-        "grafico_questao_7.png"
-    )
-
-    adicionar_secao(
-        "Questão 8 - Média de Margem de Lucro por Categoria por Mês",
-        "Mostra a média de margem de lucro por categoria e mês.",
-        "questao_8_ranking_margem_categoria.csv",
-        "grafico_questao_8.png"
-    )
-
-    adicionar_secao(
-        "Questão 9 - Top 20 Produtos Mais Comprados por Clientes",
-        "Lista dos produtos mais comprados pelos clientes.",
-        "questao_9_lista_produtos_clientes.csv"
-    )
-
-    adicionar_secao(
-        "Questão 10 - Top 20 Produtos por Quantidade de Estoque",
-        "Mostra quais produtos possuem mais unidades em estoque.",
-        "questao_10_ranking_estoque_produtos.csv",
-        "grafico_questao_10.png"
-    )
+    with perfil.etapa("secoes_pdf"):
+        for nome in nomes:
+            info = CONSULTAS[nome]
+            adicionar_secao(info["titulo"], info["descricao"], info["arquivo"], info["imagem"])
 
     # Build the PDF
-    doc.build(elements)
+    with perfil.etapa("pdf"):
+        doc.build(elements)
+    executor.shutdown()
 
     print(f"\n✅ Relatório PDF salvo como '{nome_arquivo_saida}'.")
-    
-criar_relatorio_pdf("relatorio_infomaz.pdf")
\ No newline at end of file
+    return metricas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análise Infomaz: consultas das questões 1 a 10 e relatório PDF")
+    parser.add_argument("consultas", nargs="*", help="consultas a executar (ex.: q3 q7); padrão: todas")
+    parser.add_argument("--listar", action="store_true", help="lista as consultas registradas")
+    parser.add_argument("--workers", type=int, default=None, help="consultas executadas ao mesmo tempo (1 = serial, com memória por consulta)")
+    parser.add_argument("--sem-relatorio", action="store_true", help="gera apenas os CSVs, sem gráficos e PDF")
+    parser.add_argument("--metricas", default=None, help="salva tempo e memória por consulta neste arquivo JSON")
+    parser.add_argument("--saida", default="relatorio_infomaz.pdf")
+    parser.add_argument("--max-linhas", type=int, default=MAX_LINHAS_TABELA, help="linhas de cada tabela no PDF")
+    parser.add_argument("--backend", choices=["pandas", "sqlite"], default="pandas", help="motor das consultas")
+    parser.add_argument("--verificar-sqlite", action="store_true", help="compara as consultas SQL com as do pandas")
+    parser.add_argument("--transacoes", default=None, help="lê as transações em chunks deste CSV, Parquet ou snapshot colunar")
+    parser.add_argument("--tamanho-chunk", type=int, default=TAMANHO_CHUNK, help="linhas por chunk com --transacoes")
+    parser.add_argument("--processos", type=int, default=None, help="processos para chunks e gráficos")
+    args = parser.parse_args()
+
+    if args.listar:
+        for nome, info in CONSULTAS.items():
+            print(f"{nome}: {info['titulo']}")
+    elif args.verificar_sqlite:
+        sys.exit(0 if verificar_sqlite(args.consultas or list(CONSULTAS)) else 1)
+    else:
+        desconhecidas = [c for c in args.consultas if c not in CONSULTAS]
+        if desconhecidas:
+            parser.error(f"consultas desconhecidas: {', '.join(desconhecidas)}")
+        criar_relatorio_pdf(None if args.sem_relatorio else args.saida, consultas=args.consultas or None,
+                            workers_consultas=args.workers, arquivo_metricas=args.metricas,
+                            max_workers=args.processos, transacoes=args.transacoes, tamanho_chunk=args.tamanho_chunk,
+                            max_linhas=args.max_linhas, backend=args.backend)
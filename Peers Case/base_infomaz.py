@@ -0,0 +1,206 @@
+"""
+Snapshot colunar em cache da planilha Case_Infomaz_Base_de_Dados.xlsx.
+
+Na primeira execução cada aba é convertida uma única vez em arrays tipados
+(datas já convertidas, textos codificados como categorias) e salva em
+.cache_infomaz/<hash da planilha>/. Nas execuções seguintes os arrays são
+abertos com memory-map, sem reabrir o Excel. Planilhas muito grandes são lidas
+linha a linha com o openpyxl em modo read-only, sem carregar o arquivo inteiro.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+ABAS = ["Cadastro Produtos", "Cadastro Clientes", "Transações Vendas", "Cadastro de Estoque", "Cadastro Fornecedores"]
+
+COLUNAS_DATA = {"DATA NOTA", "DATA ESTOQUE", "DATA CADASTRO"}
+
+DIRETORIO_CACHE = ".cache_infomaz"
+
+# Acima deste tamanho a planilha é lida em streaming
+LIMITE_LEITURA_COMPLETA_MB = 50
+
+
+# Hash do conteúdo da planilha (chave do snapshot)
+def hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()[:16]
+
+
+# Converte uma coluna para o tipo usado no snapshot
+def tipar_coluna(nome, valores):
+    if nome in COLUNAS_DATA:
+        return pd.to_datetime(valores)
+    serie = pd.Series(valores)
+    if serie.dtype == object or pd.api.types.is_string_dtype(serie):
+        numerica = pd.to_numeric(serie, errors="coerce")
+        if numerica.notna().sum() == serie.notna().sum():
+            return numerica
+        return serie.astype("category")
+    return serie
+
+
+# Lê uma aba linha a linha (modo read-only), em blocos, sem montar o workbook inteiro
+def ler_aba_streaming(caminho, aba, linha_cabecalho=1, tamanho_bloco=100_000):
+    wb = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = wb[aba].iter_rows(values_only=True)
+        for _ in range(linha_cabecalho):
+            next(linhas, None)
+        cabecalho = [c for c in next(linhas) if c is not None]
+        n = len(cabecalho)
+
+        blocos = []
+        bloco = []
+        for linha in linhas:
+            if all(v is None for v in linha[:n]):
+                continue
+            bloco.append(linha[:n])
+            if len(bloco) >= tamanho_bloco:
+                blocos.append(pd.DataFrame(bloco, columns=cabecalho))
+                bloco = []
+        if bloco or not blocos:
+            blocos.append(pd.DataFrame(bloco, columns=cabecalho))
+    finally:
+        wb.close()
+
+    df = pd.concat(blocos, ignore_index=True)
+    return pd.DataFrame({col: tipar_coluna(col, df[col]) for col in df.columns})
+
+
+def ler_aba_completa(xls, aba):
+    df = pd.read_excel(xls, sheet_name=aba, header=1)
+    return pd.DataFrame({col: tipar_coluna(col, df[col]) for col in df.columns})
+
+
+# Grava cada coluna como .npy; categorias vão para o schema
+def salvar_snapshot(df, diretorio):
+    os.makedirs(diretorio, exist_ok=True)
+    schema = []
+    for i, col in enumerate(df.columns):
+        serie = df[col]
+        arquivo = f"{i}.npy"
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(diretorio, arquivo), serie.cat.codes.to_numpy())
+            schema.append({"coluna": col, "arquivo": arquivo, "tipo": "category",
+                           "categorias": [str(c) for c in serie.cat.categories]})
+        else:
+            np.save(os.path.join(diretorio, arquivo), serie.to_numpy())
+            schema.append({"coluna": col, "arquivo": arquivo, "tipo": str(serie.dtype)})
+    with open(os.path.join(diretorio, "schema.json"), "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+
+
+# Abre o snapshot com memory-map. Colunas "ID ..." continuam categóricas, os demais textos viram strings
+def abrir_snapshot(diretorio):
+    with open(os.path.join(diretorio, "schema.json"), encoding="utf-8") as f:
+        schema = json.load(f)
+
+    colunas = {}
+    for item in schema:
+        valores = np.load(os.path.join(diretorio, item["arquivo"]), mmap_mode="r", allow_pickle=False)
+        if item["tipo"] == "category":
+            categorias = pd.Index(item["categorias"])
+            serie = pd.Categorical.from_codes(np.asarray(valores), categories=categorias)
+            if not item["coluna"].startswith("ID "):
+                serie = categorias.take(serie.codes, allow_fill=True, fill_value=np.nan).to_numpy()
+            colunas[item["coluna"]] = serie
+        else:
+            colunas[item["coluna"]] = valores
+    return pd.DataFrame(colunas, copy=False)
+
+
+# Carrega as abas a partir do snapshot (ou o cria, se a planilha mudou)
+def carregar_planilhas(caminho="Case_Infomaz_Base_de_Dados.xlsx", abas=ABAS, diretorio_cache=DIRETORIO_CACHE,
+                       limite_mb=LIMITE_LEITURA_COMPLETA_MB):
+    diretorio = os.path.join(diretorio_cache, hash_arquivo(caminho))
+    streaming = os.path.getsize(caminho) > limite_mb * 1024 * 1024
+    xls = None
+
+    tabelas = {}
+    for aba in abas:
+        diretorio_aba = os.path.join(diretorio, aba.replace(" ", "_"))
+        if not os.path.exists(os.path.join(diretorio_aba, "schema.json")):
+            if streaming:
+                df = ler_aba_streaming(caminho, aba)
+            else:
+                xls = xls or pd.ExcelFile(caminho)
+                df = ler_aba_completa(xls, aba)
+            salvar_snapshot(df, diretorio_aba)
+        tabelas[aba] = abrir_snapshot(diretorio_aba)
+    return tabelas
+
+
+# Média em 2 casas a partir da soma e da contagem. A soma é arredondada em 6 casas
+# antes da divisão: o pandas e o SQLite somam em ordens diferentes, e o último bit
+# da soma mudaria o arredondamento das médias que caem em meio centavo.
+def media_2_casas(soma, contagem):
+    return (soma.astype(float).round(6) / contagem).round(2)
+
+
+# Custo unitário de cada venda pelo registro de estoque mais recente do mesmo
+# ID ESTOQUE com DATA ESTOQUE <= data da venda (as-of join). Os registros são
+# ordenados por (estoque, data) e cada venda é localizada com uma busca binária
+# sobre a chave combinada, sem multiplicar linhas. Sem registro anterior à venda
+# o custo fica NaN.
+def custo_na_data(id_estoque, datas, estoque_df):
+    custo = estoque_df.groupby(["ID ESTOQUE", "DATA ESTOQUE"])["VALOR UNITARIO"].mean()
+    if len(custo) == 0:
+        return np.full(len(datas), np.nan)
+    ids = custo.index.get_level_values(0)
+    estoques = pd.Index(ids.unique())
+    codigo_estoque = estoques.get_indexer(ids)
+    codigo_venda = estoques.get_indexer(id_estoque)
+
+    dias_estoque = custo.index.get_level_values(1).to_numpy().astype("datetime64[D]").astype(np.int64)
+    datas = np.asarray(datas).astype("datetime64[D]")
+    data_valida = ~np.isnat(datas)
+    dias_venda = np.where(data_valida, datas.astype(np.int64), 0)
+
+    inicio = min(dias_estoque.min(), dias_venda.min(initial=dias_estoque.min()))
+    largura = max(dias_estoque.max(), dias_venda.max(initial=dias_estoque.max())) - inicio + 1
+    chave_estoque = codigo_estoque * largura + (dias_estoque - inicio)
+    chave_venda = codigo_venda * largura + (dias_venda - inicio)
+
+    pos = np.searchsorted(chave_estoque, chave_venda, side="right") - 1
+    pos_segura = pos.clip(0)
+    valido = (codigo_venda >= 0) & data_valida & (pos >= 0) & (codigo_estoque[pos_segura] == codigo_venda)
+    return np.where(valido, custo.to_numpy()[pos_segura], np.nan)
+
+
+# Tabela fato de vendas: uma linha por item de nota, já com produto, categoria,
+# cliente, custo unitário do estoque na data da venda, margem e mês. Textos viram categorias e as
+# chaves continuam inteiras, então as agregações não precisam de novos merges.
+def construir_fato(transacoes_df, produtos_df, clientes_df, estoque_df):
+    produtos = produtos_df[["ID PRODUTO", "ID ESTOQUE", "NOME PRODUTO", "CATEGORIA"]].drop_duplicates("ID PRODUTO")
+    clientes = clientes_df[["ID CLIENTE", "NOME CLIENTE"]].drop_duplicates("ID CLIENTE")
+
+    fato = transacoes_df[["ID NOTA", "DATA NOTA", "VALOR NOTA", "VALOR ITEM", "QTD ITEM", "ID PRODUTO", "ID CLIENTE"]].copy()
+
+    # Junções por posição (get_indexer) em vez de merges que copiam a tabela inteira
+    pos_produto = pd.Index(produtos["ID PRODUTO"]).get_indexer(fato["ID PRODUTO"])
+    pos_cliente = pd.Index(clientes["ID CLIENTE"]).get_indexer(fato["ID CLIENTE"])
+
+    def buscar(tabela, coluna, posicoes):
+        valores = tabela[coluna].astype("category")
+        codigos = np.where(posicoes >= 0, valores.cat.codes.to_numpy()[posicoes], -1)
+        return pd.Categorical.from_codes(codigos, categories=valores.cat.categories)
+
+    id_estoque = np.where(pos_produto >= 0, produtos["ID ESTOQUE"].to_numpy()[pos_produto], -1)
+    fato["ID ESTOQUE"] = pd.Series(id_estoque, index=fato.index, dtype="Int64").mask(pos_produto < 0)
+    fato["NOME PRODUTO"] = buscar(produtos, "NOME PRODUTO", pos_produto)
+    fato["CATEGORIA"] = buscar(produtos, "CATEGORIA", pos_produto)
+    fato["NOME CLIENTE"] = buscar(clientes, "NOME CLIENTE", pos_cliente)
+
+    fato["VALOR UNITARIO"] = custo_na_data(id_estoque, fato["DATA NOTA"], estoque_df)
+    fato["MARGEM"] = fato["VALOR ITEM"] - fato["VALOR UNITARIO"]
+    fato["MES_ANO"] = fato["DATA NOTA"].dt.to_period('M')
+    return fato
@@ -0,0 +1,168 @@
+"""
+Benchmark das questões 1 a 10 em bases sintéticas de tamanho crescente.
+
+Para cada escala a base é gerada uma única vez com sintetico_infomaz.py (em
+.cache_infomaz/sintetico) e são medidos:
+
+- carga: leitura dos cadastros e map-reduce das transações em chunks;
+- q1 ... q10: cada questão sobre os agregados da carga, com os demais
+  derivados (ex.: vendas por produto e mês) recalculados a cada execução;
+- coocorrencia: matriz esparsa cliente x produto, pares frequentes, produtos
+  relacionados e recomendações por cliente (coocorrencia_infomaz.py).
+
+Os casos são medidos como etapas de um Perfil próprio (perfil_infomaz.py). O
+tempo é o melhor de --repeticoes execuções. O pico de memória vem de uma
+execução extra com o tracemalloc, para não inflar os tempos; ele mede apenas o
+processo principal (não os processos dos chunks) e não inclui buffers do Arrow.
+Os resultados são comparados com a baseline salva e uma medida que cresce mais
+que --tolerancia é marcada como regressão (código de saída 1).
+
+Uso:
+    python benchmark_infomaz.py pequena media --salvar-baseline
+    python benchmark_infomaz.py pequena media
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from analise_infomaz import ABAS_TABELAS, CONSULTAS, Dados, carregar_tabelas
+from chunks_infomaz import TAMANHO_CHUNK, executar_em_chunks
+from coocorrencia_infomaz import MatrizCompras
+from perfil_infomaz import Perfil
+from sintetico_infomaz import DIRETORIO_SINTETICO, gerar_base
+
+ESCALAS = {
+    "pequena": 100_000,
+    "media": 1_000_000,
+    "grande": 5_000_000,
+}
+
+DIRETORIO_BENCHMARK = os.path.join(".cache_infomaz", "benchmark")
+ARQUIVO_BASELINE = "benchmark_infomaz_baseline.json"
+
+# Diferenças abaixo destes valores são ruído, qualquer que seja a variação relativa
+MIN_SEGUNDOS = 0.05
+MIN_PICO_MB = 1.0
+
+
+# Gera a base sintética da escala, se ainda não existir
+def preparar(escala, tamanho_chunk=TAMANHO_CHUNK):
+    n_transacoes = ESCALAS[escala]
+    diretorio = os.path.join(DIRETORIO_SINTETICO, f"{n_transacoes}_{tamanho_chunk}")
+    planilha = os.path.join(diretorio, "Case_Infomaz_Sintetico.xlsx")
+    transacoes = os.path.join(diretorio, "transacoes.parquet")
+    if not (os.path.exists(planilha) and os.path.exists(transacoes)):
+        print(f"Gerando base sintética com {n_transacoes:,} transações...")
+        gerar_base(n_transacoes, diretorio, tamanho_chunk)
+    return planilha, transacoes
+
+
+# Melhor tempo de N execuções e, opcionalmente, o pico do tracemalloc em mais uma
+def medir(funcao, repeticoes=1, memoria=True):
+    medicao = Perfil()
+    medicao.iniciar(memoria=False)
+    try:
+        for _ in range(repeticoes):
+            with medicao.etapa("execucao"):
+                funcao()
+    finally:
+        medicao.parar()
+    resultado = {"tempo_s": round(min(registro["duracao_s"] for registro in medicao.etapas), 4)}
+
+    if memoria:
+        medicao.iniciar(memoria=True)
+        try:
+            with medicao.etapa("execucao"):
+                funcao()
+        finally:
+            medicao.parar()
+        resultado["pico_memoria_mb"] = round(medicao.etapas[0]["pico_memoria_mb"], 2)
+    return resultado
+
+
+def executar(escalas, repeticoes=1, memoria=True, processos=None, tamanho_chunk=TAMANHO_CHUNK):
+    resultados = {}
+    for escala in escalas:
+        planilha, arquivo_transacoes = preparar(escala, tamanho_chunk)
+        tabelas = carregar_tabelas(planilha, [nome for nome in ABAS_TABELAS if nome != "transacoes_df"])
+
+        carga = {}
+
+        def carregar():
+            _, carga["agregados"], carga["compras_cliente_produto"] = executar_em_chunks(
+                arquivo_transacoes, tabelas["produtos_df"], tabelas["clientes_df"], tabelas["estoque_df"],
+                tamanho_chunk, processos)
+
+        resultados[escala] = {"carga": medir(carregar, repeticoes, memoria)}
+        print(f"{escala:<8} {'carga':<6} {resultados[escala]['carga']}")
+
+        for nome in CONSULTAS:
+            resultados[escala][nome] = medir(lambda: Dados(tabelas, carga).consultar(nome), repeticoes, memoria)
+            print(f"{escala:<8} {nome:<6} {resultados[escala][nome]}")
+
+        def coocorrencia():
+            matriz = MatrizCompras(carga["compras_cliente_produto"])
+            matriz.pares_frequentes(n=1000)
+            matriz.produtos_relacionados()
+            matriz.recomendacoes()
+
+        resultados[escala]["coocorrencia"] = medir(coocorrencia, repeticoes, memoria)
+        print(f"{escala:<8} {'cooc':<6} {resultados[escala]['coocorrencia']}")
+    return resultados
+
+
+# Lista de (escala, caso, medida, baseline, atual) que cresceram além da tolerância
+def regressoes(resultados, baseline, tolerancia):
+    minimos = {"tempo_s": MIN_SEGUNDOS, "pico_memoria_mb": MIN_PICO_MB}
+    encontradas = []
+    for escala, casos in resultados.items():
+        for caso, medidas in casos.items():
+            referencia = baseline.get(escala, {}).get(caso, {})
+            for medida, valor in medidas.items():
+                if medida not in referencia:
+                    continue
+                antes = referencia[medida]
+                if valor > antes * (1 + tolerancia) and valor - antes > minimos[medida]:
+                    encontradas.append((escala, caso, medida, antes, valor))
+    return encontradas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das questões Infomaz em bases sintéticas")
+    parser.add_argument("escalas", nargs="*", default=["pequena"], choices=list(ESCALAS))
+    parser.add_argument("--repeticoes", type=int, default=1, help="execuções cronometradas por caso (vale a melhor)")
+    parser.add_argument("--sem-memoria", action="store_true", help="não faz a execução com tracemalloc")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="crescimento relativo considerado regressão")
+    parser.add_argument("--processos", type=int, default=None, help="processos do map-reduce da carga")
+    parser.add_argument("--tamanho-chunk", type=int, default=TAMANHO_CHUNK, help="linhas por chunk (row group)")
+    parser.add_argument("--baseline", default=ARQUIVO_BASELINE)
+    parser.add_argument("--salvar-baseline", action="store_true", help="grava estes resultados como nova baseline")
+    args = parser.parse_args()
+
+    resultados = executar(args.escalas, args.repeticoes, not args.sem_memoria, args.processos, args.tamanho_chunk)
+    os.makedirs(DIRETORIO_BENCHMARK, exist_ok=True)
+    with open(os.path.join(DIRETORIO_BENCHMARK, "ultimo.json"), "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.salvar_baseline:
+        for escala, casos in resultados.items():
+            baseline.setdefault(escala, {}).update(casos)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"Baseline salva em '{args.baseline}'.")
+    elif not baseline:
+        print(f"Nenhuma baseline em '{args.baseline}'; rode com --salvar-baseline para criar.")
+    else:
+        encontradas = regressoes(resultados, baseline, args.tolerancia)
+        for escala, caso, medida, antes, valor in encontradas:
+            print(f"REGRESSÃO {escala}/{caso} {medida}: {antes} -> {valor} (+{100 * (valor / antes - 1):.0f}%)")
+        if encontradas:
+            sys.exit(1)
+        print(f"Nenhuma regressão acima de {100 * args.tolerancia:.0f}%.")
@@ -0,0 +1,104 @@
+"""
+Execução fora da memória (out-of-core) das questões de vendas.
+
+As transações são lidas em chunks de um CSV, de um arquivo Parquet (um chunk
+por row group) ou de um snapshot colunar do base_infomaz (diretório com um
+.npy por coluna, fatiado via memory-map). Cada chunk vira tabela fato e
+agregados parciais em um pool de processos (map); os parciais são somados no
+processo principal conforme ficam prontos (reduce). No máximo dois chunks por
+processo ficam em voo, então o pico de memória depende do tamanho do chunk e
+não do total de transações.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from agregados_infomaz import AgregadosMensais, agregar_lote
+from base_infomaz import abrir_snapshot, construir_fato
+
+TAMANHO_CHUNK = 1_000_000
+
+COLUNAS_TRANSACOES = ["ID NOTA", "DATA NOTA", "VALOR NOTA", "VALOR ITEM", "QTD ITEM", "ID PRODUTO", "ID CLIENTE"]
+
+# Cadastros (pequenos) enviados uma vez para cada processo do pool
+_cadastros = None
+
+
+def _init_worker(produtos_df, clientes_df, estoque_df):
+    global _cadastros
+    _cadastros = (produtos_df, clientes_df, estoque_df)
+
+
+# Quantidade comprada por (cliente, produto), usada na Questão 9
+def compras_cliente_produto(fato):
+    return fato.groupby(["ID CLIENTE", "ID PRODUTO"])["QTD ITEM"].sum()
+
+
+# Soma duas séries/tabelas de parciais indexadas pelas mesmas chaves
+def somar_parciais(acumulado, parcial):
+    if acumulado is None:
+        return parcial
+    return pd.concat([acumulado, parcial]).groupby(level=list(range(parcial.index.nlevels))).sum()
+
+
+# Tarefas de leitura: fontes colunares são lidas pelo próprio worker, o CSV é lido aqui
+def tarefas(caminho, tamanho_chunk=TAMANHO_CHUNK):
+    if os.path.isdir(caminho):
+        linhas = len(np.load(os.path.join(caminho, "0.npy"), mmap_mode="r"))
+        for inicio in range(0, linhas, tamanho_chunk):
+            yield ("snapshot", caminho, inicio, inicio + tamanho_chunk)
+    elif caminho.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for grupo in range(pq.ParquetFile(caminho).num_row_groups):
+            yield ("parquet", caminho, grupo, None)
+    else:
+        yield from pd.read_csv(caminho, usecols=COLUNAS_TRANSACOES, parse_dates=["DATA NOTA"], chunksize=tamanho_chunk)
+
+
+def ler_chunk(tarefa):
+    if isinstance(tarefa, pd.DataFrame):
+        return tarefa
+    tipo, caminho, inicio, fim = tarefa
+    if tipo == "snapshot":
+        return abrir_snapshot(caminho).iloc[inicio:fim][COLUNAS_TRANSACOES].copy()
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(caminho).read_row_group(inicio, columns=COLUNAS_TRANSACOES).to_pandas()
+
+
+# Map: um chunk -> (linhas, agregados mensais parciais, compras por cliente e produto)
+def processar_chunk(tarefa):
+    chunk = ler_chunk(tarefa)
+    fato = construir_fato(chunk, *_cadastros)
+    return len(chunk), agregar_lote(fato), compras_cliente_produto(fato)
+
+
+# Executa o map-reduce. Retorna (linhas, AgregadosMensais em memória, compras por cliente e produto)
+def executar_em_chunks(caminho, produtos_df, clientes_df, estoque_df, tamanho_chunk=TAMANHO_CHUNK, workers=None):
+    workers = workers or os.cpu_count() or 1
+    agregados = AgregadosMensais(diretorio=None)
+    compras = None
+    linhas = 0
+
+    def reduzir(concluidos):
+        nonlocal compras, linhas
+        for futuro in concluidos:
+            n, parciais, compras_chunk = futuro.result()
+            linhas += n
+            agregados.somar(parciais)
+            compras = somar_parciais(compras, compras_chunk)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(produtos_df, clientes_df, estoque_df)) as pool:
+        pendentes = set()
+        for tarefa in tarefas(caminho, tamanho_chunk):
+            if len(pendentes) >= 2 * workers:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                reduzir(concluidos)
+            pendentes.add(pool.submit(processar_chunk, tarefa))
+        reduzir(wait(pendentes).done)
+
+    agregados.estado["linhas"] = linhas
+    return linhas, agregados, compras
@@ -0,0 +1,240 @@
+"""
+Matriz esparsa cliente x produto e análise de compras em conjunto.
+
+As quantidades por (cliente, produto) da Questão 9 viram uma matriz CSR com
+clientes e produtos codificados como inteiros (pd.factorize). Da versão
+binária B (comprou ou não) saem, só com produtos de matrizes esparsas:
+
+- coocorrência C = Bᵀ·B: clientes que compraram cada par de produtos (a
+  diagonal é o número de clientes de cada produto);
+- similaridade entre produtos (cosseno C_ij / √(C_ii·C_jj) ou Jaccard),
+  calculada sobre as entradas não nulas de C;
+- pares frequentes, com suporte, confiança e lift;
+- "quem comprou também comprou" por cliente: B_cliente·S, sem os produtos já
+  comprados, com S limitada aos vizinhos mais similares de cada produto e os
+  clientes processados em blocos.
+
+Os top N por produto e por cliente saem de uma única ordenação das entradas
+não nulas (linha e valor decrescente), então nenhuma matriz é densificada e a
+memória acompanha o número de entradas, não clientes x produtos.
+
+Uso:
+    python coocorrencia_infomaz.py --min-clientes 3 --pares 500
+    python coocorrencia_infomaz.py --transacoes .cache_infomaz/sintetico/1000000_1000000/transacoes.parquet
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from base_infomaz import construir_fato
+from chunks_infomaz import TAMANHO_CHUNK, compras_cliente_produto, executar_em_chunks
+from perfil_infomaz import perfil
+
+METODOS_SIMILARIDADE = ("cosseno", "jaccard")
+
+# Vizinhos de cada produto usados nas recomendações
+VIZINHOS = 50
+
+# Clientes por bloco no cálculo das recomendações
+TAMANHO_BLOCO_CLIENTES = 20_000
+
+ARQUIVOS_SAIDA = {
+    "pares": "coocorrencia_pares_frequentes.csv",
+    "relacionados": "coocorrencia_produtos_relacionados.csv",
+    "recomendacoes": "coocorrencia_recomendacoes_clientes.csv",
+}
+
+
+# Linhas, colunas e valores das entradas não nulas de uma matriz CSR
+def _entradas(matriz):
+    linhas = np.repeat(np.arange(matriz.shape[0]), np.diff(matriz.indptr))
+    return linhas, matriz.indices, matriz.data
+
+
+# Entradas com as k maiores de cada linha de uma matriz CSR de valores não negativos, ordenadas por
+# linha e valor decrescente, e a posição de cada uma na linha. Com linha - valor / (2·máximo) como
+# chave basta um argsort de uma chave (o lexsort de duas chaves é algumas vezes mais lento).
+def _top_por_linha(matriz, k):
+    linhas, colunas, valores = _entradas(matriz)
+    escala = 2 * valores.max() if len(valores) else 1
+    ordem = np.argsort(linhas - valores / escala, kind="stable")
+    posicao = np.arange(len(ordem)) - matriz.indptr[linhas] + 1
+    manter = ordem[posicao <= k]
+    return linhas[manter], colunas[manter], valores[manter], posicao[posicao <= k]
+
+
+class MatrizCompras:
+    # compras: quantidade por (ID CLIENTE, ID PRODUTO), como em compras_cliente_produto
+    def __init__(self, compras):
+        codigos_cliente, self.clientes = pd.factorize(compras.index.get_level_values("ID CLIENTE"), sort=True)
+        codigos_produto, self.produtos = pd.factorize(compras.index.get_level_values("ID PRODUTO"), sort=True)
+        forma = (len(self.clientes), len(self.produtos))
+
+        self.quantidades = sparse.csr_matrix(
+            (compras.to_numpy(), (codigos_cliente, codigos_produto)), shape=forma)
+        self.quantidades.sum_duplicates()
+        self.quantidades.eliminate_zeros()
+
+        self.binaria = self.quantidades.astype(bool).astype(np.int32)
+        self._coocorrencia = None
+
+    @classmethod
+    def de_fato(cls, fato):
+        return cls(compras_cliente_produto(fato))
+
+    # C = Bᵀ·B (produtos x produtos), calculada uma única vez
+    def coocorrencia(self):
+        if self._coocorrencia is None:
+            with perfil.etapa("coocorrencia"):
+                self._coocorrencia = (self.binaria.T @ self.binaria).tocsr()
+        return self._coocorrencia
+
+    def clientes_por_produto(self):
+        return self.coocorrencia().diagonal()
+
+    # Similaridade entre produtos diferentes; com vizinhos, só os mais similares de cada produto
+    def similaridade(self, metodo="cosseno", vizinhos=None):
+        if metodo not in METODOS_SIMILARIDADE:
+            raise ValueError(f"Similaridade desconhecida: {metodo} (use {', '.join(METODOS_SIMILARIDADE)})")
+        coocorrencia = self.coocorrencia()
+        linhas, colunas, juntos = _entradas(coocorrencia)
+        fora_diagonal = linhas != colunas
+        linhas, colunas, juntos = linhas[fora_diagonal], colunas[fora_diagonal], juntos[fora_diagonal]
+
+        total = self.clientes_por_produto().astype(float)
+        if metodo == "cosseno":
+            valores = juntos / np.sqrt(total[linhas] * total[colunas])
+        else:
+            valores = juntos / (total[linhas] + total[colunas] - juntos)
+
+        similaridade = sparse.csr_matrix((valores, (linhas, colunas)), shape=coocorrencia.shape)
+        if vizinhos is not None:
+            linhas, colunas, valores, _ = _top_por_linha(similaridade, vizinhos)
+            similaridade = sparse.csr_matrix((valores, (linhas, colunas)), shape=coocorrencia.shape)
+        return similaridade
+
+    # Pares de produtos comprados pelos mesmos clientes, do mais frequente ao menos frequente
+    def pares_frequentes(self, min_clientes=2, n=None):
+        linhas, colunas, juntos = _entradas(self.coocorrencia())
+        selecao = (linhas < colunas) & (juntos >= min_clientes)
+        if n is not None and np.count_nonzero(selecao) > n:
+            # Só os pares com pelo menos a n-ésima maior contagem (empates incluídos) chegam ao DataFrame
+            corte = np.partition(juntos[selecao], -n)[-n]
+            selecao &= juntos >= corte
+        a, b, juntos = linhas[selecao], colunas[selecao], juntos[selecao].astype(float)
+
+        total = self.clientes_por_produto().astype(float)
+        n_clientes = self.binaria.shape[0]
+        pares = pd.DataFrame({
+            "ID PRODUTO A": self.produtos[a],
+            "ID PRODUTO B": self.produtos[b],
+            "CLIENTES": juntos.astype(np.int64),
+            "SUPORTE": juntos / n_clientes,
+            "CONFIANCA A->B": juntos / total[a],
+            "CONFIANCA B->A": juntos / total[b],
+            "LIFT": juntos * n_clientes / (total[a] * total[b]),
+        })
+        pares.sort_values(["CLIENTES", "LIFT"], ascending=False, inplace=True, kind="stable")
+        return (pares if n is None else pares.head(n)).reset_index(drop=True)
+
+    # Os n produtos mais similares a cada produto
+    def produtos_relacionados(self, n=5, metodo="cosseno"):
+        linhas, colunas, valores, posicao = _top_por_linha(self.similaridade(metodo), n)
+        return pd.DataFrame({
+            "ID PRODUTO": self.produtos[linhas],
+            "POSICAO": posicao,
+            "ID RELACIONADO": self.produtos[colunas],
+            "SIMILARIDADE": valores.round(4),
+            "CLIENTES EM COMUM": np.asarray(self.coocorrencia()[linhas, colunas]).ravel(),
+        })
+
+    # "Quem comprou também comprou": os n produtos ainda não comprados com maior pontuação por cliente
+    def recomendacoes(self, n=5, metodo="cosseno", vizinhos=VIZINHOS, tamanho_bloco=TAMANHO_BLOCO_CLIENTES):
+        similaridade = self.similaridade(metodo, vizinhos)
+        partes = []
+        for inicio in range(0, self.binaria.shape[0], tamanho_bloco):
+            compras = self.binaria[inicio:inicio + tamanho_bloco]
+            pontuacao = (compras @ similaridade).tocsr()
+            # Zera o que o cliente já comprou
+            pontuacao = (pontuacao - pontuacao.multiply(compras)).tocsr()
+            pontuacao.eliminate_zeros()
+
+            linhas, colunas, valores, posicao = _top_por_linha(pontuacao, n)
+            partes.append(pd.DataFrame({
+                "ID CLIENTE": self.clientes[linhas + inicio],
+                "POSICAO": posicao,
+                "ID PRODUTO": self.produtos[colunas],
+                "PONTUACAO": valores.round(4),
+            }))
+        return pd.concat(partes, ignore_index=True)
+
+
+# Acrescenta o nome do produto (ou cliente) de cada coluna de ID
+def _com_nomes(df, tabelas):
+    nomes_produto = tabelas["produtos_df"].drop_duplicates("ID PRODUTO").set_index("ID PRODUTO")["NOME PRODUTO"]
+    nomes_cliente = tabelas["clientes_df"].drop_duplicates("ID CLIENTE").set_index("ID CLIENTE")["NOME CLIENTE"]
+    df = df.copy()
+    for coluna in list(df.columns):
+        if coluna == "ID CLIENTE":
+            nomes = nomes_cliente
+        elif coluna.startswith("ID PRODUTO") or coluna == "ID RELACIONADO":
+            nomes = nomes_produto
+        else:
+            continue
+        df.insert(df.columns.get_loc(coluna) + 1, coluna.replace("ID", "NOME", 1), df[coluna].map(nomes))
+    return df
+
+
+if __name__ == "__main__":
+    from analise_infomaz import ABAS_TABELAS, carregar_tabelas
+
+    parser = argparse.ArgumentParser(description="Compras em conjunto a partir da matriz esparsa cliente x produto")
+    parser.add_argument("--planilha", default="Case_Infomaz_Base_de_Dados.xlsx")
+    parser.add_argument("--transacoes", default=None, help="lê as transações em chunks deste CSV, Parquet ou snapshot colunar")
+    parser.add_argument("--tamanho-chunk", type=int, default=TAMANHO_CHUNK)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--metodo", choices=METODOS_SIMILARIDADE, default="cosseno")
+    parser.add_argument("--min-clientes", type=int, default=2, help="clientes em comum para um par ser frequente")
+    parser.add_argument("--pares", type=int, default=1000, help="pares frequentes gravados (0 = todos)")
+    parser.add_argument("--n", type=int, default=5, help="relacionados por produto e recomendações por cliente")
+    parser.add_argument("--vizinhos", type=int, default=VIZINHOS, help="vizinhos por produto nas recomendações")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    with perfil.etapa("carregar"):
+        if args.transacoes:
+            tabelas = carregar_tabelas(args.planilha, [nome for nome in ABAS_TABELAS if nome != "transacoes_df"])
+            _, _, compras = executar_em_chunks(args.transacoes, tabelas["produtos_df"], tabelas["clientes_df"],
+                                               tabelas["estoque_df"], args.tamanho_chunk, args.processos)
+        else:
+            tabelas = carregar_tabelas(args.planilha)
+            compras = compras_cliente_produto(construir_fato(tabelas["transacoes_df"], tabelas["produtos_df"],
+                                                             tabelas["clientes_df"], tabelas["estoque_df"]))
+    print(f"Carga: {time.perf_counter() - inicio:.2f}s")
+
+    inicio = time.perf_counter()
+    with perfil.etapa("matriz"):
+        matriz = MatrizCompras(compras)
+    clientes, produtos = matriz.binaria.shape
+    densidade = matriz.binaria.nnz / max(clientes * produtos, 1)
+    print(f"Matriz {clientes} clientes x {produtos} produtos, {matriz.binaria.nnz} entradas "
+          f"({100 * densidade:.3f}% preenchida) em {time.perf_counter() - inicio:.2f}s")
+
+    resultados = {}
+    for nome, calcular in (
+        ("pares", lambda: matriz.pares_frequentes(args.min_clientes, args.pares or None)),
+        ("relacionados", lambda: matriz.produtos_relacionados(args.n, args.metodo)),
+        ("recomendacoes", lambda: matriz.recomendacoes(args.n, args.metodo, args.vizinhos)),
+    ):
+        inicio = time.perf_counter()
+        with perfil.etapa(nome):
+            resultados[nome] = _com_nomes(calcular(), tabelas)
+        resultados[nome].to_csv(ARQUIVOS_SAIDA[nome], index=False)
+        perfil.contar(f"linhas_{nome}", len(resultados[nome]))
+        print(f"{nome}: {len(resultados[nome])} linhas em {time.perf_counter() - inicio:.2f}s -> '{ARQUIVOS_SAIDA[nome]}'")
+
+    print(resultados["pares"].head(10).to_string(index=False))
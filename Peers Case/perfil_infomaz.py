@@ -0,0 +1,183 @@
+"""
+Instrumentação opcional do pipeline: tempo e pico de memória por etapa e contadores.
+
+Desligada por padrão. Com a variável de ambiente PERFIL=1 (ou PERFIL=<arquivo.json>)
+o perfil é gravado; desligado, perfil.etapa() devolve um gerenciador de contexto
+vazio compartilhado e perfil.contar() retorna de imediato, então o custo no código
+instrumentado é uma checagem de atributo por chamada.
+
+Ao final do processo são gravados um trace JSON (etapas com início, duração e pico
+de memória acima do nível na entrada, mais os contadores) e um resumo em texto.
+Etapas podem ser aninhadas ("consultas/q9/fato") e as consultas rodam em threads,
+cada uma com a sua pilha de etapas. O pico vem do tracemalloc e só é exato quando
+uma única thread executa etapas.
+
+Um Perfil separado também pode ser iniciado e parado em volta de um trecho, sem
+gravar trace (é assim que o benchmark_infomaz.py mede os seus casos).
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+
+class _EtapaVazia:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_ETAPA_VAZIA = _EtapaVazia()
+
+
+class _Etapa:
+    def __init__(self, perfil, nome):
+        self.perfil = perfil
+        self.nome = nome
+        self.pico_filhas = 0
+
+    def __enter__(self):
+        pilha = self.perfil._pilha()
+        self.caminho = "/".join([etapa.nome for etapa in pilha] + [self.nome])
+        if self.perfil.memoria:
+            self.memoria_inicial = self.perfil.zerar_pico()
+        pilha.append(self)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duracao = time.perf_counter() - self.inicio
+        pilha = self.perfil._pilha()
+        pilha.pop()
+        registro = {
+            "etapa": self.caminho,
+            "inicio_s": round(self.inicio - self.perfil.inicio, 6),
+            "duracao_s": round(duracao, 6),
+        }
+        if self.perfil.memoria:
+            pico = max(tracemalloc.get_traced_memory()[1], self.pico_filhas)
+            if pilha:
+                pilha[-1].pico_filhas = max(pilha[-1].pico_filhas, pico)
+            registro["pico_memoria_mb"] = round(max(pico - self.memoria_inicial, 0) / 1024 ** 2, 3)
+        with self.perfil._lock:
+            self.perfil.etapas.append(registro)
+        return False
+
+
+class Perfil:
+    def __init__(self):
+        self.ativo = False
+        self.memoria = True
+        self.arquivo = None
+        self.inicio = None
+        self.etapas = []
+        self.contadores = defaultdict(int)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._rastreando = False
+
+    def _pilha(self):
+        if not hasattr(self._local, "pilha"):
+            self._local.pilha = []
+        return self._local.pilha
+
+    # Grava etapas e contadores a partir de agora (liga o tracemalloc se preciso)
+    def iniciar(self, memoria=True):
+        self.ativo = True
+        self.memoria = memoria
+        self.inicio = time.perf_counter()
+        self.etapas = []
+        self.contadores.clear()
+        self._rastreando = memoria and not tracemalloc.is_tracing()
+        if self._rastreando:
+            tracemalloc.start()
+
+    # Para de gravar; etapas e contadores continuam disponíveis
+    def parar(self):
+        self.ativo = False
+        if self._rastreando:
+            tracemalloc.stop()
+            self._rastreando = False
+
+    # Começa a gravar; trace e resumo saem no fim do processo
+    def ativar(self, arquivo=None):
+        if self.ativo:
+            return
+        self.arquivo = arquivo
+        self.iniciar()
+        atexit.register(self.finalizar)
+
+    # Gerenciador de contexto que mede uma etapa (vazio quando desligado)
+    def etapa(self, nome):
+        if not self.ativo:
+            return _ETAPA_VAZIA
+        return _Etapa(self, nome)
+
+    # Zera o pico do tracemalloc para uma nova medição, guardando antes o pico da etapa
+    # aberta (senão ela perderia o que alocou até aqui). Devolve a memória atual
+    def zerar_pico(self):
+        atual, pico = tracemalloc.get_traced_memory()
+        pilha = self._pilha()
+        if self.ativo and pilha:
+            pilha[-1].pico_filhas = max(pilha[-1].pico_filhas, pico)
+        tracemalloc.reset_peak()
+        return atual
+
+    # Soma valor a um contador (linhas, gráficos, bytes...)
+    def contar(self, nome, valor=1):
+        if self.ativo:
+            with self._lock:
+                self.contadores[nome] += valor
+
+    def trace(self):
+        return {
+            "script": os.path.basename(sys.argv[0]),
+            "argumentos": sys.argv[1:],
+            "total_s": round(time.perf_counter() - self.inicio, 6),
+            "etapas": self.etapas,
+            "contadores": dict(self.contadores),
+        }
+
+    # Resumo por etapa: chamadas, tempo, % do total e pico de memória
+    def resumo(self):
+        totais = {}
+        for registro in self.etapas:
+            total = totais.setdefault(registro["etapa"], {"chamadas": 0, "segundos": 0.0, "pico": 0.0})
+            total["chamadas"] += 1
+            total["segundos"] += registro["duracao_s"]
+            total["pico"] = max(total["pico"], registro.get("pico_memoria_mb", 0.0))
+
+        decorrido = time.perf_counter() - self.inicio
+        linhas = [f"{'Etapa':<44} {'Chamadas':>8} {'Segundos':>10} {'% total':>8} {'Pico MB':>9}"]
+        for nome, total in sorted(totais.items(), key=lambda item: -item[1]["segundos"]):
+            linhas.append(f"{nome:<44} {total['chamadas']:>8} {total['segundos']:>10.3f} "
+                          f"{100 * total['segundos'] / decorrido:>7.1f}% {total['pico']:>9.2f}")
+        for nome, valor in sorted(self.contadores.items()):
+            linhas.append(f"{nome}: {valor:,}")
+        linhas.append(f"Total: {decorrido:.3f}s")
+        return "\n".join(linhas)
+
+    def finalizar(self):
+        if not self.ativo:
+            return
+        arquivo = self.arquivo or "perfil_{}_{}.json".format(
+            os.path.splitext(os.path.basename(sys.argv[0]) or "python")[0], datetime.now().strftime("%Y%m%d_%H%M%S"))
+        with open(arquivo, "w", encoding="utf-8") as f:
+            json.dump(self.trace(), f, ensure_ascii=False, indent=2)
+        print(self.resumo())
+        print(f"Perfil salvo em '{arquivo}'.")
+        self.parar()
+
+
+perfil = Perfil()
+
+if os.environ.get("PERFIL", "").lower() not in ("", "0", "false"):
+    perfil.ativar(None if os.environ["PERFIL"].lower() in ("1", "true") else os.environ["PERFIL"])
@@ -0,0 +1,72 @@
+"""
+Ranking por grupo (ex.: top N clientes, produtos ou fornecedores por mês).
+
+Uma única ordenação (np.lexsort por grupo e métricas) define as posições; os
+limites de grupo e de empate são detectados comparando linhas vizinhas, então
+as posições densa, mínima (competição) e ordinal saem por somas acumuladas,
+sem groupby por grupo nem laços em Python.
+"""
+
+import numpy as np
+import pandas as pd
+
+METODOS = ("dense", "min", "ordinal")
+
+
+# Códigos inteiros do grupo, na ordem crescente dos valores do grupo
+def _codigos_grupo(df, grupo):
+    if isinstance(grupo, str):
+        return pd.factorize(df[grupo], sort=True)[0]
+    return df.groupby(list(grupo), sort=True, observed=True, dropna=False).ngroup().to_numpy()
+
+
+# Chave de ordenação de uma métrica (NaN sempre por último)
+def _chave_metrica(valores, ascendente):
+    valores = np.asarray(valores, dtype=float)
+    chave = valores if ascendente else -valores
+    return np.where(np.isnan(valores), np.inf, chave)
+
+
+# Acrescenta a posição de cada linha dentro do seu grupo e mantém só as N primeiras.
+# metrica pode ser uma lista (ex.: ["QTD ITEM", "VALOR ITEM"]): a segunda desempata a primeira.
+# Com "dense" e "min" linhas empatadas recebem a mesma posição e entram juntas no top N;
+# com "ordinal" o empate é resolvido pela ordem original das linhas.
+def ranking_por_grupo(df, grupo, metrica, n=None, metodo="min", ascendente=False, coluna_posicao="POSICAO_RANKING"):
+    if metodo not in METODOS:
+        raise ValueError(f"Método de ranking desconhecido: {metodo} (use {', '.join(METODOS)})")
+    metricas = [metrica] if isinstance(metrica, str) else list(metrica)
+    if isinstance(ascendente, bool):
+        ascendente = [ascendente] * len(metricas)
+
+    codigos = _codigos_grupo(df, grupo)
+    chaves = [_chave_metrica(df[m].to_numpy(), asc) for m, asc in zip(metricas, ascendente)]
+
+    # np.lexsort usa a última chave como principal e é estável (empates mantêm a ordem original)
+    ordem = np.lexsort(chaves[::-1] + [codigos])
+    codigos = codigos[ordem]
+    linhas = np.arange(len(ordem))
+
+    novo_grupo = np.ones(len(ordem), dtype=bool)
+    novo_grupo[1:] = codigos[1:] != codigos[:-1]
+    novo_valor = novo_grupo.copy()
+    for chave in chaves:
+        chave = chave[ordem]
+        novo_valor[1:] |= chave[1:] != chave[:-1]
+
+    inicio_grupo = np.maximum.accumulate(np.where(novo_grupo, linhas, 0))
+    if metodo == "ordinal":
+        posicao = linhas - inicio_grupo + 1
+    elif metodo == "min":
+        inicio_empate = np.maximum.accumulate(np.where(novo_valor, linhas, 0))
+        posicao = inicio_empate - inicio_grupo + 1
+    else:
+        distintos = np.cumsum(novo_valor)
+        posicao = distintos - distintos[inicio_grupo] + 1
+
+    # O corte do top N é feito nas posições, então só as linhas mantidas são copiadas
+    if n is not None:
+        manter = posicao <= n
+        ordem, posicao = ordem[manter], posicao[manter]
+    resultado = df.iloc[ordem].copy()
+    resultado[coluna_posicao] = posicao
+    return resultado.reset_index(drop=True)
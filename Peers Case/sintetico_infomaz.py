@@ -0,0 +1,181 @@
+"""
+Geração de bases sintéticas da Infomaz em escala configurável.
+
+Produtos, clientes, estoque e fornecedores seguem os cadastros da planilha
+original (nomes, categorias e custos servem de modelo) e as transações são
+notas de 1 a 3 itens espalhadas pelo período, com produtos e clientes de
+popularidade desigual. O estoque tem um registro por mês para cada ID ESTOQUE,
+com o custo variando ao longo do tempo, o que exercita o custo na data da venda.
+
+Os cadastros vão para uma planilha no mesmo layout da original (título na
+primeira linha e cabeçalho na segunda). As transações vão para um Parquet com
+um row group por chunk, lido por chunks_infomaz.py; a aba "Transações Vendas"
+só recebe as linhas quando pedido e se couberem no limite do Excel.
+
+Uso:
+    python sintetico_infomaz.py 1000000 --saida .cache_infomaz/sintetico/1000000
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from base_infomaz import carregar_planilhas
+from chunks_infomaz import TAMANHO_CHUNK
+
+DIRETORIO_SINTETICO = os.path.join(".cache_infomaz", "sintetico")
+
+# Linhas de dados que cabem em uma aba (sem título e cabeçalho)
+LIMITE_LINHAS_XLSX = 1_048_576 - 2
+
+TITULOS = {
+    "Cadastro Produtos": ("TABELA 1", "CADASTRO PRODUTOS"),
+    "Cadastro Clientes": ("TABELA 2", "CADASTRO CLIENTES"),
+    "Transações Vendas": ("TABELA 3", "TRANSAÇÕES NOTAS DE VENDAS"),
+    "Cadastro de Estoque": ("TABELA 4", "CADASTRO ESTOQUE"),
+    "Cadastro Fornecedores": ("TABELA 5", "CADASTRO FORNECEDORES"),
+}
+
+
+# Pesos decrescentes (tipo Zipf): poucos produtos e clientes concentram as vendas
+def _popularidade(n, rng, expoente=1.1):
+    pesos = 1 / np.arange(1, n + 1) ** expoente
+    return rng.permutation(pesos / pesos.sum())
+
+
+# Gera as cinco tabelas da base com n_transacoes itens de nota
+def gerar_tabelas(n_transacoes, n_produtos=None, n_clientes=None, n_fornecedores=30, inicio="2023-01-01",
+                  meses=24, semente=0, caminho_modelo="Case_Infomaz_Base_de_Dados.xlsx"):
+    rng = np.random.default_rng(semente)
+    n_produtos = n_produtos or int(np.clip(n_transacoes // 250, 40, 5_000))
+    n_clientes = n_clientes or int(np.clip(n_transacoes // 20, 40, 500_000))
+
+    modelo = carregar_planilhas(caminho_modelo, ["Cadastro Produtos", "Cadastro Clientes", "Cadastro de Estoque"])
+    produtos_modelo = modelo["Cadastro Produtos"].merge(modelo["Cadastro de Estoque"], on="ID ESTOQUE")
+    custo_modelo = (produtos_modelo["VALOR ESTOQUE"] / produtos_modelo["QTD ESTOQUE"]).to_numpy()
+
+    # Produtos: variações dos produtos reais, com o custo em torno do custo original
+    base = np.arange(n_produtos) % len(produtos_modelo)
+    versao = np.arange(n_produtos) // len(produtos_modelo)
+    nomes = produtos_modelo["NOME PRODUTO"].astype(str).to_numpy()[base]
+    produtos = pd.DataFrame({
+        "ID PRODUTO": 1001 + np.arange(n_produtos),
+        "ID ESTOQUE": 5001 + np.arange(n_produtos),
+        "NOME PRODUTO": np.where(versao > 0, [f"{nome} v{v + 1}" for nome, v in zip(nomes, versao)], nomes),
+        "CATEGORIA": produtos_modelo["CATEGORIA"].astype(str).to_numpy()[base],
+    })
+    custo_base = np.round(custo_modelo[base] * rng.lognormal(0, 0.2, n_produtos), 2)
+
+    fornecedores = pd.DataFrame({
+        "ID FORNECEDOR": [f"F{100 + 5 * i}" for i in range(n_fornecedores)],
+        "NOME FORNECEDOR": [f"Fornecedor {i + 1:03d} Ltda" for i in range(n_fornecedores)],
+        "DATA CADASTRO": pd.Timestamp("2018-01-01") + pd.to_timedelta(rng.integers(0, 1800, n_fornecedores), unit="D"),
+    })
+
+    # Estoque: um registro por mês e produto, do mês anterior ao início das vendas em diante
+    datas_estoque = pd.date_range(pd.Timestamp(inicio) - pd.DateOffset(months=1), periods=meses + 1, freq="MS")
+    n_registros = n_produtos * len(datas_estoque)
+    variacao = np.cumprod(rng.normal(1.0, 0.02, (n_produtos, len(datas_estoque))), axis=1).ravel()
+    custo = np.repeat(custo_base, len(datas_estoque)) * variacao
+    qtd = rng.integers(10, 101, n_registros)
+    fornecedor = rng.integers(0, n_fornecedores, n_produtos)
+    estoque = pd.DataFrame({
+        "ID ESTOQUE": np.repeat(produtos["ID ESTOQUE"].to_numpy(), len(datas_estoque)),
+        "VALOR ESTOQUE": np.round(custo * qtd),
+        "QTD ESTOQUE": qtd,
+        "DATA ESTOQUE": np.tile(datas_estoque.to_numpy(), n_produtos),
+        "ID FORNECEDOR": fornecedores["ID FORNECEDOR"].to_numpy()[np.repeat(fornecedor, len(datas_estoque))],
+    })
+
+    # Clientes: combinações de nomes e sobrenomes dos clientes reais
+    partes = modelo["Cadastro Clientes"]["NOME CLIENTE"].astype(str).str.split()
+    primeiros = partes.str[0].unique()
+    sobrenomes = partes.str[-1].unique()
+    clientes = pd.DataFrame({
+        "ID CLIENTE": 2001 + np.arange(n_clientes),
+        "NOME CLIENTE": [f"{primeiros[i % len(primeiros)]} {sobrenomes[(i // len(primeiros)) % len(sobrenomes)]} {i + 1}"
+                         for i in range(n_clientes)],
+        "DATA CADASTRO": pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 1460, n_clientes), unit="D"),
+    })
+
+    # Notas com 1 a 3 itens, ordenadas por data
+    itens = rng.integers(1, 4, n_transacoes)
+    n_notas = int(np.searchsorted(np.cumsum(itens), n_transacoes)) + 1
+    itens = itens[:n_notas]
+    itens[-1] -= itens.sum() - n_transacoes
+    dias = (pd.Timestamp(inicio) + pd.DateOffset(months=meses) - pd.Timestamp(inicio)).days
+    data_nota = pd.Timestamp(inicio) + pd.to_timedelta(np.sort(rng.integers(0, dias, n_notas)), unit="D")
+    cliente_nota = rng.choice(clientes["ID CLIENTE"].to_numpy(), n_notas, p=_popularidade(n_clientes, rng))
+
+    nota = np.repeat(np.arange(n_notas), itens)
+    produto = rng.choice(n_produtos, n_transacoes, p=_popularidade(n_produtos, rng))
+    qtd_item = np.minimum(rng.geometric(0.6, n_transacoes), 10)
+    valor_item = np.round(custo_base[produto] * rng.uniform(1.1, 1.6, n_transacoes), 1)
+    valor_nota = np.bincount(nota, weights=valor_item * qtd_item, minlength=n_notas).round(2)
+
+    transacoes = pd.DataFrame({
+        "ID NOTA": 3001 + nota,
+        "DATA NOTA": data_nota.to_numpy()[nota],
+        "VALOR NOTA": valor_nota[nota],
+        "VALOR ITEM": valor_item,
+        "QTD ITEM": qtd_item,
+        "ID PRODUTO": produtos["ID PRODUTO"].to_numpy()[produto],
+        "ID CLIENTE": cliente_nota[nota],
+    })
+
+    return {
+        "Cadastro Produtos": produtos,
+        "Cadastro Clientes": clientes,
+        "Transações Vendas": transacoes,
+        "Cadastro de Estoque": estoque,
+        "Cadastro Fornecedores": fornecedores,
+    }
+
+
+# Grava a planilha no layout da original. Sem com_transacoes, a aba de transações fica só com o cabeçalho.
+def salvar_planilha(tabelas, caminho, com_transacoes=False):
+    transacoes = tabelas["Transações Vendas"]
+    if com_transacoes and len(transacoes) > LIMITE_LINHAS_XLSX:
+        raise ValueError(f"{len(transacoes)} transações não cabem em uma aba do Excel (máximo {LIMITE_LINHAS_XLSX})")
+    if not com_transacoes:
+        transacoes = transacoes.head(0)
+
+    with pd.ExcelWriter(caminho, engine="openpyxl") as writer:
+        for aba, df in {**tabelas, "Transações Vendas": transacoes}.items():
+            df.to_excel(writer, sheet_name=aba, startrow=1, index=False)
+            planilha = writer.sheets[aba]
+            planilha.cell(row=1, column=1, value=TITULOS[aba][0])
+            planilha.cell(row=1, column=2, value=TITULOS[aba][1])
+    return caminho
+
+
+# Transações em Parquet, um row group por chunk
+def salvar_transacoes(transacoes, caminho, tamanho_chunk=TAMANHO_CHUNK):
+    transacoes.to_parquet(caminho, index=False, row_group_size=tamanho_chunk)
+    return caminho
+
+
+# Gera a base completa em um diretório: planilha com os cadastros e transações em Parquet
+def gerar_base(n_transacoes, diretorio, tamanho_chunk=TAMANHO_CHUNK, com_transacoes=False, semente=0):
+    os.makedirs(diretorio, exist_ok=True)
+    tabelas = gerar_tabelas(n_transacoes, semente=semente)
+    planilha = salvar_planilha(tabelas, os.path.join(diretorio, "Case_Infomaz_Sintetico.xlsx"), com_transacoes)
+    transacoes = salvar_transacoes(tabelas["Transações Vendas"], os.path.join(diretorio, "transacoes.parquet"),
+                                   tamanho_chunk)
+    return planilha, transacoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera uma base sintética da Infomaz")
+    parser.add_argument("transacoes", type=int, help="número de itens de nota")
+    parser.add_argument("--saida", default=None, help=f"diretório de saída (padrão: {DIRETORIO_SINTETICO}/<transacoes>)")
+    parser.add_argument("--tamanho-chunk", type=int, default=TAMANHO_CHUNK, help="linhas por row group do Parquet")
+    parser.add_argument("--com-transacoes", action="store_true", help="também grava as transações na planilha")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    diretorio = args.saida or os.path.join(DIRETORIO_SINTETICO, str(args.transacoes))
+    planilha, transacoes = gerar_base(args.transacoes, diretorio, args.tamanho_chunk, args.com_transacoes, args.semente)
+    print(f"Planilha salva em '{planilha}' e transações em '{transacoes}'.")
@@ -0,0 +1,241 @@
+"""
+Backend SQLite opcional para as questões da Infomaz.
+
+As cinco abas são gravadas uma vez em .cache_infomaz/infomaz.sqlite, com
+índices nas chaves (ID PRODUTO, ID CLIENTE, ID ESTOQUE, ID FORNECEDOR) e em
+DATA NOTA; o banco só é refeito quando a planilha muda (hash guardado na
+tabela meta). A visão "fato" reproduz a tabela fato do pandas, inclusive o
+custo do estoque na data da venda, e as questões 1 a 10 são consultas SQL que
+devolvem as mesmas colunas dos CSVs. Consultas ad hoc podem ser feitas direto
+no arquivo do banco.
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+
+from base_infomaz import DIRETORIO_CACHE, carregar_planilhas, hash_arquivo, media_2_casas
+
+ARQUIVO_BANCO = os.path.join(DIRETORIO_CACHE, "infomaz.sqlite")
+
+# Aba -> tabela do banco
+TABELAS = {
+    "Cadastro Produtos": "produtos",
+    "Cadastro Clientes": "clientes",
+    "Transações Vendas": "transacoes",
+    "Cadastro de Estoque": "estoque",
+    "Cadastro Fornecedores": "fornecedores",
+}
+
+INDICES = {
+    "transacoes": ["ID PRODUTO", "ID CLIENTE", "DATA NOTA"],
+    "produtos": ["ID PRODUTO", "ID ESTOQUE"],
+    "clientes": ["ID CLIENTE"],
+    "estoque": ["ID ESTOQUE", "ID FORNECEDOR"],
+    "fornecedores": ["ID FORNECEDOR"],
+}
+
+VISOES = """
+-- Cadastros sem chaves repetidas (primeira linha de cada chave, como drop_duplicates)
+CREATE VIEW produtos_unicos AS
+    SELECT * FROM produtos WHERE rowid IN (SELECT MIN(rowid) FROM produtos GROUP BY "ID PRODUTO");
+CREATE VIEW clientes_unicos AS
+    SELECT * FROM clientes WHERE rowid IN (SELECT MIN(rowid) FROM clientes GROUP BY "ID CLIENTE");
+
+-- Custo unitário por estoque e data; o índice (estoque, data) atende o as-of da visão fato
+CREATE TABLE custo_estoque AS
+    SELECT "ID ESTOQUE" AS id_estoque, "DATA ESTOQUE" AS data, AVG("VALOR ESTOQUE" * 1.0 / "QTD ESTOQUE") AS valor
+    FROM estoque GROUP BY 1, 2;
+CREATE UNIQUE INDEX idx_custo_estoque ON custo_estoque (id_estoque, data);
+
+CREATE VIEW fato AS
+    SELECT v.*, v."VALOR ITEM" - v."VALOR UNITARIO" AS MARGEM
+    FROM (
+        SELECT t."ID NOTA", t."DATA NOTA", t."VALOR NOTA", t."VALOR ITEM", t."QTD ITEM", t."ID PRODUTO", t."ID CLIENTE",
+               p."ID ESTOQUE", p."NOME PRODUTO", p.CATEGORIA, c."NOME CLIENTE",
+               strftime('%Y-%m', t."DATA NOTA") AS MES_ANO,
+               (SELECT ce.valor FROM custo_estoque ce
+                WHERE ce.id_estoque = p."ID ESTOQUE" AND ce.data <= t."DATA NOTA"
+                ORDER BY ce.data DESC LIMIT 1) AS "VALOR UNITARIO"
+        FROM transacoes t
+        LEFT JOIN produtos_unicos p ON p."ID PRODUTO" = t."ID PRODUTO"
+        LEFT JOIN clientes_unicos c ON c."ID CLIENTE" = t."ID CLIENTE"
+    ) v;
+"""
+
+# Questão -> (SQL, colunas arredondadas, médias, ordenação). Os arredondamentos e os
+# desempates são os mesmos das consultas do pandas, para os CSVs saírem idênticos:
+# - colunas arredondadas: somas de valores em centavos, arredondadas em 2 casas;
+# - médias: coluna -> (soma, contagem), calculadas com media_2_casas como no pandas
+#   (AVG do SQLite divide a soma em outra ordem e erra o meio centavo);
+# - ordenação: (colunas, crescente) aplicada depois das médias, quando a ordem
+#   depende delas.
+CONSULTAS_SQL = {
+    "q1": ("""
+        SELECT CATEGORIA, SUM("VALOR NOTA") AS "VALOR NOTA"
+        FROM fato WHERE CATEGORIA IS NOT NULL
+        GROUP BY CATEGORIA ORDER BY ROUND(SUM("VALOR NOTA"), 2) DESC, CATEGORIA
+    """, ["VALOR NOTA"], {}, None),
+    "q2": ("""
+        SELECT "ID PRODUTO", SUM(MARGEM) AS MARGEM, COUNT(MARGEM) AS N_MARGEM, "NOME PRODUTO" AS NOME_PRODUTO, CATEGORIA
+        FROM fato WHERE MARGEM IS NOT NULL AND CATEGORIA IS NOT NULL
+        GROUP BY "ID PRODUTO"
+    """, [], {"MARGEM": ("MARGEM", "N_MARGEM")}, (["MARGEM", "ID PRODUTO"], [False, True])),
+    "q3": ("""
+        WITH mensal AS (
+            SELECT MES_ANO, "ID CLIENTE", SUM("QTD ITEM") AS "QTD ITEM", "NOME CLIENTE"
+            FROM fato WHERE "NOME CLIENTE" IS NOT NULL GROUP BY MES_ANO, "ID CLIENTE"
+        ), ranking AS (
+            SELECT *, RANK() OVER (PARTITION BY MES_ANO ORDER BY "QTD ITEM" DESC) AS POSICAO_RANKING FROM mensal
+        )
+        SELECT * FROM ranking WHERE POSICAO_RANKING <= 10 ORDER BY MES_ANO, POSICAO_RANKING, "ID CLIENTE"
+    """, [], {}, None),
+    "q4": ("""
+        WITH mensal AS (
+            SELECT strftime('%Y-%m', "DATA ESTOQUE") AS MES_ANO, "ID FORNECEDOR", SUM("QTD ESTOQUE") AS "QTD ESTOQUE"
+            FROM estoque GROUP BY 1, 2
+        ), ranking AS (
+            SELECT m.*, f."NOME FORNECEDOR",
+                   RANK() OVER (PARTITION BY MES_ANO ORDER BY "QTD ESTOQUE" DESC) AS POSICAO_RANKING
+            FROM mensal m JOIN fornecedores f ON f."ID FORNECEDOR" = m."ID FORNECEDOR"
+        )
+        SELECT * FROM ranking WHERE POSICAO_RANKING <= 10 ORDER BY MES_ANO, POSICAO_RANKING, "ID FORNECEDOR"
+    """, [], {}, None),
+    "q5": ("""
+        WITH mensal AS (
+            SELECT MES_ANO, "ID PRODUTO", "NOME PRODUTO", CATEGORIA,
+                   SUM("QTD ITEM") AS "QTD ITEM", ROUND(SUM("VALOR ITEM"), 2) AS valor
+            FROM fato WHERE "NOME PRODUTO" IS NOT NULL GROUP BY MES_ANO, "ID PRODUTO"
+        ), ranking AS (
+            SELECT *, RANK() OVER (PARTITION BY MES_ANO ORDER BY "QTD ITEM" DESC, valor DESC) AS POSICAO_RANKING FROM mensal
+        )
+        SELECT MES_ANO, "ID PRODUTO", "NOME PRODUTO", CATEGORIA, "QTD ITEM", POSICAO_RANKING
+        FROM ranking WHERE POSICAO_RANKING <= 10 ORDER BY MES_ANO, POSICAO_RANKING, "ID PRODUTO"
+    """, [], {}, None),
+    "q6": ("""
+        WITH mensal AS (
+            SELECT MES_ANO, "ID PRODUTO", "NOME PRODUTO", CATEGORIA, ROUND(SUM("VALOR ITEM"), 2) AS TOTAL_VENDIDO
+            FROM fato WHERE "NOME PRODUTO" IS NOT NULL GROUP BY MES_ANO, "ID PRODUTO"
+        ), ranking AS (
+            SELECT *, RANK() OVER (PARTITION BY MES_ANO ORDER BY TOTAL_VENDIDO DESC) AS POSICAO_RANKING FROM mensal
+        )
+        SELECT * FROM ranking WHERE POSICAO_RANKING <= 10 ORDER BY MES_ANO, POSICAO_RANKING, "ID PRODUTO"
+    """, ["TOTAL_VENDIDO"], {}, None),
+    "q7": ("""
+        SELECT CATEGORIA, MES_ANO, SUM("VALOR ITEM") AS MEDIA_VALOR_ITEM, COUNT(*) AS N_ITENS
+        FROM fato WHERE CATEGORIA IS NOT NULL
+        GROUP BY CATEGORIA, MES_ANO ORDER BY CATEGORIA, MES_ANO
+    """, [], {"MEDIA_VALOR_ITEM": ("MEDIA_VALOR_ITEM", "N_ITENS")}, None),
+    "q8": ("""
+        SELECT CATEGORIA, MES_ANO, SUM(MARGEM) AS MEDIA_MARGEM, COUNT(MARGEM) AS N_MARGEM
+        FROM fato WHERE MARGEM IS NOT NULL AND CATEGORIA IS NOT NULL
+        GROUP BY CATEGORIA, MES_ANO ORDER BY CATEGORIA, MES_ANO
+    """, [], {"MEDIA_MARGEM": ("MEDIA_MARGEM", "N_MARGEM")}, None),
+    "q9": ("""
+        SELECT "NOME CLIENTE", "NOME PRODUTO", SUM("QTD ITEM") AS "QTD ITEM"
+        FROM fato WHERE "NOME CLIENTE" IS NOT NULL AND "NOME PRODUTO" IS NOT NULL
+        GROUP BY "NOME CLIENTE", "NOME PRODUTO" ORDER BY "QTD ITEM" DESC, "NOME CLIENTE", "NOME PRODUTO"
+    """, [], {}, None),
+    "q10": ("""
+        SELECT p."NOME PRODUTO", p.CATEGORIA, SUM(e."QTD ESTOQUE") AS TOTAL_ESTOQUE
+        FROM estoque e JOIN produtos p ON p."ID ESTOQUE" = e."ID ESTOQUE"
+        GROUP BY p."NOME PRODUTO", p.CATEGORIA ORDER BY TOTAL_ESTOQUE DESC, p."NOME PRODUTO", p.CATEGORIA LIMIT 20
+    """, [], {}, None),
+}
+
+
+def _para_sql(df):
+    # Categorias viram texto e datas viram 'AAAA-MM-DD HH:MM:SS' (comparáveis como texto)
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return df
+
+
+# Grava as abas no banco, cria índices e visões
+def construir_banco(caminho_excel="Case_Infomaz_Base_de_Dados.xlsx", arquivo_banco=ARQUIVO_BANCO):
+    planilhas = carregar_planilhas(caminho_excel, list(TABELAS))
+    os.makedirs(os.path.dirname(arquivo_banco), exist_ok=True)
+    if os.path.exists(arquivo_banco):
+        os.remove(arquivo_banco)
+
+    con = sqlite3.connect(arquivo_banco)
+    try:
+        for aba, tabela in TABELAS.items():
+            _para_sql(planilhas[aba]).to_sql(tabela, con, index=False)
+            for coluna in INDICES[tabela]:
+                nome_indice = f"idx_{tabela}_{coluna.lower().replace(' ', '_')}"
+                con.execute(f'CREATE INDEX {nome_indice} ON {tabela} ("{coluna}")')
+        con.executescript(VISOES)
+        con.execute("CREATE TABLE meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        con.execute("INSERT INTO meta VALUES ('hash_planilha', ?)", (hash_arquivo(caminho_excel),))
+        con.commit()
+    finally:
+        con.close()
+
+
+class BancoInfomaz:
+    # Abre o banco, refazendo-o se a planilha mudou
+    def __init__(self, caminho_excel="Case_Infomaz_Base_de_Dados.xlsx", arquivo_banco=ARQUIVO_BANCO):
+        self.arquivo_banco = arquivo_banco
+        if self._hash_gravado() != hash_arquivo(caminho_excel):
+            construir_banco(caminho_excel, arquivo_banco)
+
+    def _hash_gravado(self):
+        if not os.path.exists(self.arquivo_banco):
+            return None
+        con = sqlite3.connect(self.arquivo_banco)
+        try:
+            linha = con.execute("SELECT valor FROM meta WHERE chave = 'hash_planilha'").fetchone()
+            return linha[0] if linha else None
+        except sqlite3.DatabaseError:
+            return None
+        finally:
+            con.close()
+
+    # Consulta ad hoc (uma conexão por chamada, então pode ser usada por várias threads)
+    def sql(self, consulta, parametros=()):
+        con = sqlite3.connect(self.arquivo_banco)
+        try:
+            return pd.read_sql_query(consulta, con, params=parametros)
+        finally:
+            con.close()
+
+    # Resultado de uma questão registrada (q1 ... q10)
+    def consultar(self, nome):
+        consulta, arredondar, medias, ordenacao = CONSULTAS_SQL[nome]
+        resultado = self.sql(consulta)
+        for coluna in arredondar:
+            resultado[coluna] = resultado[coluna].round(2)
+        for coluna, (soma, contagem) in medias.items():
+            resultado[coluna] = media_2_casas(resultado[soma], resultado[contagem])
+            resultado = resultado.drop(columns=contagem)
+        if ordenacao:
+            colunas, crescente = ordenacao
+            resultado = resultado.sort_values(colunas, ascending=crescente, ignore_index=True)
+        return resultado
+
+
+# Compara o resultado do SQL com o do pandas pelo CSV que cada um gravaria: os dois
+# backends arredondam e desempatam da mesma forma, então os arquivos devem ser idênticos
+def comparar_resultados(esperado, obtido):
+    if list(esperado.columns) != list(obtido.columns):
+        return f"colunas diferentes: {list(esperado.columns)} x {list(obtido.columns)}"
+    if len(esperado) != len(obtido):
+        return f"{len(esperado)} linhas no pandas x {len(obtido)} no SQLite"
+
+    linhas_esperadas = esperado.to_csv(index=False).splitlines()
+    linhas_obtidas = obtido.to_csv(index=False).splitlines()
+    for numero, (linha_esperada, linha_obtida) in enumerate(zip(linhas_esperadas, linhas_obtidas)):
+        if linha_esperada != linha_obtida:
+            return f"linha {numero} diferente: {linha_esperada!r} x {linha_obtida!r}"
+    return None
+
+
+if __name__ == "__main__":
+    construir_banco()
+    print(f"Banco SQLite criado em '{ARQUIVO_BANCO}'.")